@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+
+# Benchmark of the optimizers: every optimizer runs on every landscape for a
+# grid of dims and population sizes, with repeated seeds, e.g.
+#
+#   python -m Walkers.bench -o pso gwo -l Ackley Rastring -d 2 10 -n 20 50 -s 5 -f bench.json
+#
+# For every run it reports the time per generation, the evaluations per
+# second, the peak memory in bytes (tracemalloc, measured in a separate run of the
+# first seed so it does not slow down the timings) and the error of the best
+# score against the known minimum of the landscape. The runs are written as
+# json or csv; with a baseline file the median times per generation are
+# compared and the regressions make the command fail. A run which raises is
+# recorded with its exception and NaN metrics, the sweep goes on and the
+# command fails at the end.
+
+import sys
+import csv
+import json
+import time
+import inspect
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+
+from . import landscape
+from .optimizers import optimizers as _optimizers
+from .results import Results
+from .__version__ import __version__
+
+keys = ('optimizer', 'objfname', 'dtype', 'dim', 'n_population')
+
+fields = ('optimizer', 'objfname', 'dim', 'n_population', 'max_iters', 'seed', 'dtype',
+          'n_iters', 'n_evals', 'time', 'time_per_iter', 'evals_per_sec', 'peak_memory',
+          'best', 'error', 'failure')
+
+def get_optimizers():
+  return {name : func for name, func in inspect.getmembers(_optimizers, inspect.isfunction)}
+
+def get_landscapes():
+  return {cls(dim=2).__name__ : cls for _, cls in inspect.getmembers(landscape, inspect.isclass)
+          if issubclass(cls, landscape.ObjectiveFunction) and cls is not landscape.ObjectiveFunction}
+
+def _make(cls, dim):
+  # the 2D landscapes can not be built with other dims
+  try:
+    return cls(dim=dim)
+  except AssertionError:
+    return None
+
+def _score(objfunc, best, dim):
+  # some optimizers return the best position instead of the score
+  if np.ndim(best) == 0:
+    return float(best)
+  best = np.atleast_2d(np.asarray(best, dtype=float))
+  if best.shape[-1] != dim:
+    return np.nan
+  return float(np.min(objfunc.evaluate_batch(best)))
+
+def _minimum(objfunc, dim):
+  # value of the global minimum (one or more points), NaN if unknown
+  minimum = objfunc.get_minimum()
+  if minimum is None:
+    return np.nan
+  minimum = np.atleast_2d(np.asarray(minimum))
+  if minimum.dtype == object or minimum.shape[-1] != dim:
+    return np.nan
+  return float(np.min(objfunc.evaluate_batch(minimum.astype(float))))
+
+def run(optimizer, objfunc, dim, n_population, max_iters, seed = 0, dtype = 'float64', memory = False, **params):
+  # single benchmark run as a record of fields
+  lower_bound, upper_bound = objfunc.get_boundary()
+  args = dict(objfunc=objfunc, lower_bound=lower_bound, upper_bound=upper_bound, dim=dim,
+              n_population=n_population, max_iters=max_iters, seed=seed, verbose=False, **params)
+  if np.dtype(dtype) != np.float64:
+    args['dtype'] = dtype
+
+  peak = np.nan
+  if memory:
+    tracemalloc.start()
+    try:
+      optimizer(**args)
+      peak = tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+
+  tic = time.perf_counter()
+  sol = optimizer(**args)
+  elapsed = time.perf_counter() - tic
+
+  n_iters = sol.n_iters or max_iters
+  best = _score(objfunc, sol.best, dim)
+  return {'optimizer'     : sol.optimizer,
+          'objfname'      : objfunc.__name__,
+          'dim'           : dim,
+          'n_population'  : n_population,
+          'max_iters'     : max_iters,
+          'seed'          : seed,
+          'dtype'         : np.dtype(dtype).name,
+          'n_iters'       : n_iters,
+          'n_evals'       : sol.n_evals,
+          'time'          : elapsed,
+          'time_per_iter' : elapsed / n_iters,
+          'evals_per_sec' : sol.n_evals / elapsed if elapsed > 0. else np.nan,
+          'peak_memory'   : peak,
+          'best'          : best,
+          'error'         : abs(best - _minimum(objfunc, dim)),
+          'failure'       : ''
+          }
+
+def _failed(name, objfunc, dim, n_population, max_iters, seed, dtype, exc):
+  # record of a run which raised exc: the metrics are NaN
+  record = {k : np.nan for k in fields}
+  record.update({'optimizer'    : name,
+                 'objfname'     : objfunc.__name__,
+                 'dim'          : dim,
+                 'n_population' : n_population,
+                 'max_iters'    : max_iters,
+                 'seed'         : seed,
+                 'dtype'        : np.dtype(dtype).name,
+                 'failure'      : '{}: {}'.format(type(exc).__name__, exc)
+                 })
+  return record
+
+def sweep(optimizers, landscapes, dims, populations, max_iters, seeds, dtype = 'float64', memory = True, verbose = True, **params):
+  # records of all the combinations (the 2D landscapes are skipped for the
+  # other dims); the peak memory is measured on the first seed only and the
+  # failed runs are recorded with their exception (see failures)
+  all_optimizers, all_landscapes = get_optimizers(), get_landscapes()
+  total = len(optimizers) * len(landscapes) * len(dims) * len(populations)
+  done = 0
+
+  for name in optimizers:
+    for function in landscapes:
+      for dim in dims:
+        objfunc = _make(all_landscapes[function], dim)
+        for n_population in populations:
+          done += 1
+          if objfunc is None:
+            continue
+          if verbose:
+            print('[%d/%d] %s %s dim=%d n_population=%d'%(done, total, name, function, dim, n_population), file=sys.stderr, flush=True)
+          for i, seed in enumerate(seeds):
+            try:
+              yield run(all_optimizers[name], objfunc, dim, n_population, max_iters,
+                        seed=seed, dtype=dtype, memory=memory and i == 0, **params)
+            except Exception as exc:
+              record = _failed(name, objfunc, dim, n_population, max_iters, seed, dtype, exc)
+              if verbose:
+                print('  seed %s failed: %s'%(seed, record['failure']), file=sys.stderr, flush=True)
+              yield record
+
+def failures(records):
+  return [r for r in records if r.get('failure')]
+
+def summary(records, values = ('time_per_iter', 'evals_per_sec', 'peak_memory', 'error'), stat = 'median'):
+  # one row for each configuration with the statistic of every value over
+  # the seeds (the NaN values are ignored)
+  table = Results({k : [r[k] for r in records] for k in fields})
+  result = None
+  for value in values:
+    res = table.summary(by=keys, value=value, stats=(stat, ) if result else ('count', stat))
+    if result is None:
+      result = res
+    else:
+      result.data['{}_{}'.format(value, stat)] = res['{}_{}'.format(value, stat)]
+  return result
+
+def compare(records, baseline, tolerance = .2, value = 'time_per_iter'):
+  # configurations whose median value grew more than tolerance (relative)
+  # with respect to the baseline records
+  current, previous = summary(records, values=(value, )), summary(baseline, values=(value, ))
+  name = '{}_median'.format(value)
+  reference = {tuple(r[k] for k in keys) : r[name] for r in previous.to_records()}
+  regressions = []
+  for r in current.to_records():
+    ref = reference.get(tuple(r[k] for k in keys))
+    if ref is None or not ref > 0.:
+      continue
+    change = r[name] / ref - 1.
+    if change > tolerance:
+      regressions.append(dict({k : r[k] for k in keys}, baseline=ref, current=r[name], change=change))
+  return regressions
+
+def _clean(value):
+  # json has no NaN: they are written as null
+  if isinstance(value, (float, np.floating)) and np.isnan(value):
+    return None
+  return value.item() if isinstance(value, np.generic) else value
+
+def dump(records, path):
+  records = [{k : _clean(r[k]) for k in fields} for r in records]
+  if path.endswith('.csv'):
+    with open(path, 'w', newline='') as fp:
+      writer = csv.DictWriter(fp, fieldnames=fields)
+      writer.writeheader()
+      writer.writerows(records)
+    return
+
+  meta = {'version'  : __version__,
+          'python'   : platform.python_version(),
+          'numpy'    : np.__version__,
+          'platform' : platform.platform(),
+          'date'     : time.strftime('%Y-%m-%d %H:%M:%S')
+          }
+  with open(path, 'w') as fp:
+    json.dump({'meta' : meta, 'records' : records}, fp, indent=2)
+
+def load(path):
+  if path.endswith('.csv'):
+    with open(path, 'r', newline='') as fp:
+      records = list(csv.DictReader(fp))
+    for r in records:
+      for k in ('dim', 'n_population', 'max_iters', 'seed'):
+        r[k] = int(r[k])
+      for k in ('n_iters', 'n_evals'):
+        r[k] = int(r[k]) if r[k] != '' else np.nan
+      for k in ('time', 'time_per_iter', 'evals_per_sec', 'peak_memory', 'best', 'error'):
+        r[k] = float(r[k]) if r[k] != '' else np.nan
+      r.setdefault('failure', '')
+    return records
+
+  with open(path, 'r') as fp:
+    records = json.load(fp)['records']
+  for r in records:
+    for k, v in r.items():
+      r[k] = np.nan if v is None else v
+    r.setdefault('failure', '')
+  return records
+
+
+def main(argv = None):
+
+  optimizers, landscapes = get_optimizers(), get_landscapes()
+
+  description = 'Walkers benchmark of the optimizers'
+  parser = argparse.ArgumentParser(description = description)
+  parser.add_argument('-o', required=False, dest='optimizers',  action='store', nargs='+', help='Optimizers to test (default all)',  default=sorted(optimizers), choices=sorted(optimizers))
+  parser.add_argument('-l', required=False, dest='landscapes',  action='store', nargs='+', help='Landscapes to test (default all)',  default=sorted(landscapes), choices=sorted(landscapes))
+  parser.add_argument('-d', required=False, dest='dims',        action='store', nargs='+', help='Dimensions of the problem',         default=[2, 10], type=int)
+  parser.add_argument('-n', required=False, dest='populations', action='store', nargs='+', help='Population sizes',                  default=[20, 50], type=int)
+  parser.add_argument('-i', required=False, dest='max_iters',   action='store', help='Max number of iterations',                   default=100, type=int)
+  parser.add_argument('-s', required=False, dest='seeds',       action='store', help='Number of seeds of every configuration',     default=3, type=int)
+  parser.add_argument('-t', required=False, dest='dtype',       action='store', help='Precision of the walkers',                   default='float64', choices=['float64', 'float32'])
+  parser.add_argument('-f', required=False, dest='output',      action='store', help='Output file (.json or .csv)',                default=None)
+  parser.add_argument('-b', required=False, dest='baseline',    action='store', help='Baseline file to compare with',              default=None)
+  parser.add_argument('-r', required=False, dest='tolerance',   action='store', help='Relative slowdown reported as a regression', default=.2, type=float)
+  parser.add_argument('-m', required=False, dest='memory',      action='store_false', help='Disable the peak memory measurement')
+  parser.add_argument('-q', required=False, dest='verbose',     action='store_false', help='Disable the progress messages')
+  args = parser.parse_args(argv)
+
+  records = list(sweep(args.optimizers, args.landscapes, args.dims, args.populations, args.max_iters,
+                       seeds=range(args.seeds), dtype=args.dtype, memory=args.memory, verbose=args.verbose))
+
+  if not records:
+    print('No valid configuration! The 2D landscapes can be tested only with dim = 2')
+    return 1
+
+  print(summary(records))
+
+  if args.output is not None:
+    dump(records, args.output)
+
+  status = 0
+  for r in failures(records):
+    print('Failure: {optimizer} {objfname} {dtype} dim={dim} n_population={n_population} seed={seed}: '
+          '{failure}'.format(**r))
+    status = 1
+
+  if args.baseline is not None:
+    regressions = compare(records, load(args.baseline), tolerance=args.tolerance)
+    for r in regressions:
+      print('Regression: {optimizer} {objfname} {dtype} dim={dim} n_population={n_population}: '
+            '{baseline:.3g} -> {current:.3g} sec/iter ({change:+.0%})'.format(**r))
+    if regressions:
+      status = 1
+
+  return status
+
+
+if __name__ == '__main__':
+
+  sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+
+import os
+from itertools import repeat
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+
+def _evaluate_chunk(objfunc, chunk):
+  # module-level function so it can be pickled by process pools
+  batch = getattr(objfunc, 'evaluate_batch', None)
+  if batch is not None:
+    return np.asarray(batch(chunk))
+  return np.asarray([objfunc.evaluate(x) for x in chunk])
+
+class Evaluator(object):
+
+  def __init__(self, objfunc, n_jobs = 1, executor = None, cache = None, profiler = None):
+    self.objfunc = objfunc
+    # optional Profiler of the evaluations
+    self.profiler = profiler if profiler is not None and profiler.enabled else None
+    # number of objective function calls (cache hits excluded)
+    self.n_evals = 0
+
+    # objective functions which are not derived from ObjectiveFunction
+    # (e.g. the tuning wrappers) could provide only the evaluate method
+    self._batch = getattr(objfunc, 'evaluate_batch', None)
+
+    # n_jobs <= 0 means all the available cores
+    self.n_jobs = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+    self._owner = executor is None and self.n_jobs > 1
+    self.executor = ProcessPoolExecutor(max_workers=self.n_jobs) if self._owner else executor
+    self.n_workers = self.n_jobs if self.n_jobs > 1 else (os.cpu_count() or 1)
+
+    # cache can be None/False, True (default cache), the maximum number of
+    # cached positions or a FitnessCache shared between runs
+    if cache is None or cache is False:
+      self.cache = None
+    elif cache is True:
+      self.cache = FitnessCache()
+    elif isinstance(cache, FitnessCache):
+      self.cache = cache
+    else:
+      self.cache = FitnessCache(maxsize=int(cache))
+
+  def __call__(self, pos, axis=1):
+    # axis follows the np.apply_along_axis convention: axis=1 for
+    # (n_population, dim) arrays and axis=0 for (dim, n_population) ones
+    pop = pos if axis == 1 else pos.T
+    return self.evaluate(pop)
+
+  def evaluate(self, pop):
+    if self.profiler is not None:
+      with self.profiler.phase('evaluate'):
+        return self._lookup(pop)
+    return self._lookup(pop)
+
+  def _lookup(self, pop):
+    if not len(pop):
+      return np.empty(shape=(0,), dtype=float)
+    if self.cache is None:
+      return self._evaluate(pop)
+
+    fitness, missing, keys = self.cache.lookup(pop)
+    if missing:
+      # duplicated positions in the same population are evaluated once
+      unique = OrderedDict()
+      for i in missing:
+        unique.setdefault(keys[i], i)
+      first = list(unique.values())
+      values = self._evaluate(pop[first])
+      self.cache.store(unique.keys(), values)
+      values = dict(zip(unique.keys(), values))
+      fitness[missing] = [values[keys[i]] for i in missing]
+    return fitness
+
+  def update(self, fitness, pos, dirty, axis=1):
+    # re-evaluate only the walkers flagged in the dirty mask: the other ones
+    # keep their fitness
+    fitness = np.array(fitness, dtype=float)
+    dirty = np.asarray(dirty, dtype=bool)
+    if dirty.any():
+      pop = pos if axis == 1 else pos.T
+      fitness[dirty] = self.evaluate(pop[dirty])
+    return fitness
+
+  def _evaluate(self, pop):
+    self.n_evals += len(pop)
+    if self.executor is not None:
+      return self.map(pop)
+    if self._batch is not None:
+      return np.asarray(self._batch(pop))
+    return np.apply_along_axis(self.objfunc.evaluate, 1, pop)
+
+  def map(self, pop):
+    # a few chunks per worker balance uneven evaluation times; executor.map
+    # returns the chunks in submission order so the fitness vector follows
+    # the population order whatever the completion order is
+    n_chunks = min(len(pop), 4 * self.n_workers)
+    chunks = np.array_split(np.ascontiguousarray(pop), n_chunks)
+    return np.concatenate(list(self.executor.map(_evaluate_chunk, repeat(self.objfunc), chunks)))
+
+  def steady_state(self, proposals, update):
+    return SteadyState(self, proposals, update)
+
+  def close(self):
+    # only the pools created by the evaluator are shut down here
+    if self._owner:
+      self.executor.shutdown(wait=True)
+      self.executor = None
+      self._owner = False
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
+
+
+class SteadyState(object):
+
+  # Asynchronous steady-state evaluation: every walker has always one
+  # position in flight and, as soon as its fitness arrives, update(i, x, f)
+  # is called in the main thread and must return the next position of the
+  # walker i, which is immediately re-submitted. Without executor the walkers
+  # are evaluated one at a time in round-robin order.
+
+  def __init__(self, evaluator, proposals, update):
+    self.evaluator = evaluator
+    self.update    = update
+
+    if evaluator.executor is None:
+      self.pending = deque((i, np.array(x)) for i, x in enumerate(proposals))
+    else:
+      self.pending = dict()
+      # positions already in the cache do not need a worker
+      self.ready   = deque()
+      for i, x in enumerate(proposals):
+        self.submit(i, np.array(x))
+
+  def submit(self, i, x):
+    cache = self.evaluator.cache
+    if cache is not None:
+      f, missing, _ = cache.lookup(x[np.newaxis])
+      if not missing:
+        self.ready.append((i, x, f[0]))
+        return
+    future = self.evaluator.executor.submit(_evaluate_chunk, self.evaluator.objfunc, x[np.newaxis])
+    self.pending[future] = (i, x)
+
+  def step(self, n):
+    # process (at least) n completed evaluations
+    completed = 0
+
+    if self.evaluator.executor is None:
+      for _ in range(n):
+        i, x = self.pending.popleft()
+        f = self.evaluator.evaluate(x[np.newaxis])[0]
+        self.pending.append((i, np.array(self.update(i, x, f))))
+      return n
+
+    cache = self.evaluator.cache
+    # walkers already served by the cache in this call: their next cached
+    # positions wait for the next call, so a stalled walker (e.g. one with
+    # zero velocity) can not fill the generation with repeated cache hits
+    served = set()
+    while completed < n:
+      # the finished evaluations are collected before the cache hits, so the
+      # walkers in flight are never starved; the wait blocks only if no
+      # cache hit can be served
+      done = ()
+      if self.pending:
+        idle = all(i in served for i, _, _ in self.ready)
+        if self.evaluator.profiler is not None:
+          with self.evaluator.profiler.phase('evaluate'):
+            done, _ = wait(self.pending, timeout=None if idle else 0, return_when=FIRST_COMPLETED)
+        else:
+          done, _ = wait(self.pending, timeout=None if idle else 0, return_when=FIRST_COMPLETED)
+      for future in done:
+        i, x = self.pending.pop(future)
+        f = future.result()[0]
+        self.evaluator.n_evals += 1
+        if cache is not None:
+          cache.store(cache.keys(x[np.newaxis]), [f])
+        completed += 1
+        self.submit(i, np.array(self.update(i, x, f)))
+      if done:
+        continue
+
+      # first cache hit of a walker not yet served in this call
+      for _ in range(len(self.ready)):
+        if self.ready[0][0] not in served:
+          break
+        self.ready.rotate(-1)
+      else:
+        # nothing in flight and only deferred cache hits
+        break
+      i, x, f = self.ready.popleft()
+      served.add(i)
+      completed += 1
+      self.submit(i, np.array(self.update(i, x, f)))
+    return completed
+
+  def close(self):
+    # the evaluations still in flight are discarded
+    if isinstance(self.pending, dict):
+      for future in self.pending:
+        future.cancel()
+      self.ready.clear()
+    self.pending.clear()
+
+
+class FitnessCache(object):
+
+  # LRU cache of the fitness values keyed on the walker positions. By default
+  # (tol = 0) only identical positions match, so the cache does not change
+  # the results; with tol > 0 the positions are quantized with the resolution
+  # tol and the nearby walkers share the same fitness (approximate cache).
+  # The same cache can be shared between runs on the same objective.
+
+  def __init__(self, maxsize = 2**16, tol = 0.):
+    if maxsize <= 0:
+      raise ValueError('Wrong cache size! It must be positive')
+
+    self.maxsize   = maxsize
+    self.tol       = tol
+    self.hits      = 0
+    self.misses    = 0
+    self.evictions = 0
+    self._data     = OrderedDict()
+
+  def keys(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    # + 0. maps -0. to 0.
+    q = np.round(pop / self.tol) + 0. if self.tol else pop + 0.
+    q = np.ascontiguousarray(q)
+    return [row.tobytes() for row in q]
+
+  def lookup(self, pop):
+    # return the cached fitness (nan for the missing positions), the list of
+    # missing indices and the keys of the whole population
+    keys = self.keys(pop)
+    fitness = np.full(shape=(len(keys),), fill_value=np.nan, dtype=float)
+    missing = []
+    for i, key in enumerate(keys):
+      value = self._data.get(key)
+      if value is None:
+        missing.append(i)
+      else:
+        self._data.move_to_end(key)
+        fitness[i] = value
+    self.hits   += len(keys) - len(missing)
+    self.misses += len(missing)
+    return fitness, missing, keys
+
+  def store(self, keys, fitness):
+    for key, value in zip(keys, fitness):
+      self._data[key] = value
+      self._data.move_to_end(key)
+    while len(self._data) > self.maxsize:
+      self._data.popitem(last=False)
+      self.evictions += 1
+
+  def clear(self):
+    self._data.clear()
+    self.hits, self.misses, self.evictions = 0, 0, 0
+
+  @property
+  def hit_rate(self):
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.
+
+  def info(self):
+    return {'hits' : self.hits,
+            'misses' : self.misses,
+            'evictions' : self.evictions,
+            'size' : len(self._data),
+            'maxsize' : self.maxsize,
+            'hit_rate' : self.hit_rate
+            }
+
+  def __len__(self):
+    return len(self._data)
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
+
+  def __str__(self):
+    fmt_str  = 'Fitness cache <size=%d, maxsize=%d>\n'%(len(self._data), self.maxsize)
+    fmt_str += 'Hits: %d, Misses: %d, Evictions: %d (hit rate %.3f)\n'%(self.hits, self.misses, self.evictions, self.hit_rate)
+    return fmt_str
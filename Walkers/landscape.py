@@ -4,6 +4,8 @@ import numpy as np
 # Reference: https://www.sfu.ca/~ssurjano/optimization.html
 
 class ObjectiveFunction(object):
+  # the walkers are evaluated in double precision whatever their dtype, since
+  # some landscapes overflow in float32 (e.g. the exp of CrossInTray)
   def __init__(self, name, dim, lower_bound, upper_bound):
     self.__name__ = name
     self.dim = dim
@@ -12,6 +14,12 @@ class ObjectiveFunction(object):
 
   def evaluate(self, arr):
     pass
+  def evaluate_batch(self, pop):
+    # fallback for functions which implement only the single walker evaluation
+    pop = np.asarray(pop, dtype=float)
+    if not len(pop):
+      return np.empty(shape=(0,), dtype=pop.dtype)
+    return np.apply_along_axis(self.evaluate, 1, pop)
   def get_minimum(self):
     pass
   def get_boundary(self):
@@ -27,6 +35,11 @@ class AckleyFunction(ObjectiveFunction):
     assert(len(arr) == self.dim)
     return -self.a * np.exp(-self.b * np.sqrt(sum(arr*arr) / self.dim)) - np.exp(sum(np.cos(self.c * arr) / self.dim)) + self.a + 2.718281828459045 # np.exp(1)
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    return -self.a * np.exp(-self.b * np.sqrt(np.sum(pop*pop, axis=1) / self.dim)) - np.exp(np.sum(np.cos(self.c * pop) / self.dim, axis=1)) + self.a + 2.718281828459045 # np.exp(1)
+
   def get_minimum(self):
     return np.repeat(0., repeats=self.dim)
 
@@ -44,6 +57,12 @@ class BoothFunction(ObjectiveFunction):
     x, y = arr
     return (x + 2. * y - 7.)**2 + (2. * x + y - 5.)**2
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return (x + 2. * y - 7.)**2 + (2. * x + y - 5.)**2
+
   def get_minimum(self):
     return np.array([1., 3.])
 
@@ -63,6 +82,12 @@ class BukinN6Function(ObjectiveFunction):
     x, y = arr
     return 100. * np.sqrt(abs(y - 1e-2*x*x)) + 1e-2 * abs(y + 10.)
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return 100. * np.sqrt(abs(y - 1e-2*x*x)) + 1e-2 * abs(y + 10.)
+
   def get_minimum(self):
     return np.array([-10., 1.])
 
@@ -81,6 +106,12 @@ class CrossInTrayFunction(ObjectiveFunction):
     x, y = arr
     return -1e-4 * (abs(np.sin(x)*np.sin(y)*np.exp(abs(100. - np.sqrt(sum(arr*arr)) / np.pi)) ) + 1.)**1e-1
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return -1e-4 * (abs(np.sin(x)*np.sin(y)*np.exp(abs(100. - np.sqrt(np.sum(pop*pop, axis=1)) / np.pi)) ) + 1.)**1e-1
+
   def get_minimum(self):
     return np.array([ (1.3491, -1.3491), (1.3491, 1.3491), (-1.3491, 1.3491), (-1.3491, -1.3491) ])
 
@@ -98,6 +129,12 @@ class DixonPriceFunction(ObjectiveFunction):
     idx = np.arange(2., self.dim + 1.)
     return (arr[0] - 1.)**2 + sum(idx * (2. * arr[1:]**2 - arr[:-1]) ** 2)
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    idx = np.arange(2., self.dim + 1., dtype=pop.dtype)
+    return (pop[:, 0] - 1.)**2 + np.sum(idx * (2. * pop[:, 1:]**2 - pop[:, :-1]) ** 2, axis=1)
+
   def get_minimum(self):
     idx = 2.**(np.arange(1., self.dim + 1.))
     return 2.**(-(idx - 2)/idx)
@@ -118,6 +155,12 @@ class DropWaveFunction(ObjectiveFunction):
     a2 = sum(arr * arr)
     return - (1. + np.cos(12. * np.sqrt(a2))) / (.5 * a2 + 2.)
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    a2 = np.sum(pop * pop, axis=1)
+    return - (1. + np.cos(12. * np.sqrt(a2))) / (.5 * a2 + 2.)
+
   def get_minimum(self):
     return np.repeat(0., repeats=self.dim)
 
@@ -136,6 +179,12 @@ class EggholderFunction(ObjectiveFunction):
     x, y = arr
     return -(y + 47.)*np.sin(np.sqrt(abs(y + .5*x + 47.))) - x * np.sin(np.sqrt(abs(x - (y + 47.))))
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return -(y + 47.)*np.sin(np.sqrt(abs(y + .5*x + 47.))) - x * np.sin(np.sqrt(abs(x - (y + 47.))))
+
   def get_minimum(self):
     return np.array([512, 404.2319])
 
@@ -168,6 +217,11 @@ class GrieWankFunction(ObjectiveFunction):
     assert(len(arr) == self.dim)
     return np.sum(arr * arr * .00025) - np.prod(np.cos(arr / np.sqrt(np.arange(1, self.dim + 1)))) + 1.
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    return np.sum(pop * pop * .00025, axis=1) - np.prod(np.cos(pop / np.sqrt(np.arange(1, self.dim + 1, dtype=pop.dtype))), axis=1) + 1.
+
   def get_minimum(self):
     return np.repeat(0., repeats=self.dim)
 
@@ -185,6 +239,12 @@ class HolderTableFunction(ObjectiveFunction):
     x, y = arr
     return - abs(np.sin(x)*np.cos(y)*np.exp(abs(1. - np.sqrt(sum(arr*arr)) / np.pi)))
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return - abs(np.sin(x)*np.cos(y)*np.exp(abs(1. - np.sqrt(np.sum(pop*pop, axis=1)) / np.pi)))
+
   def get_minimum(self):
     return np.array([ (8.05502, 9.66459), (8.05502, -9.66459), (-8.05502, 9.66459), (-8.05502, -9.66459) ])
 
@@ -203,6 +263,12 @@ class MatyasFunction(ObjectiveFunction):
     x, y = arr
     return .26 * sum(arr*arr) - .48*x*y
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return .26 * np.sum(pop*pop, axis=1) - .48*x*y
+
   def get_minimum(self):
     return np.zeros(shape=(self.dim,), dtype=float)
 
@@ -222,6 +288,12 @@ class McCormickFunction(ObjectiveFunction):
     x, y = arr
     return np.sin(sum(arr)) + (x - y)**2 - 1.5*x + 2.5*y + 1.
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return np.sin(np.sum(pop, axis=1)) + (x - y)**2 - 1.5*x + 2.5*y + 1.
+
   def get_minimum(self):
     return np.array([-.54719, -1.54719])
 
@@ -266,6 +338,15 @@ class LevyFunction(ObjectiveFunction):
            (1. + 10. * np.sin(np.pi * w[:-1] + 1.)**2) ) + \
            (w[-1] - 1.)**2 * (1. + np.sin(2.*np.pi * w[-1])**2)
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    w = 1. + (pop - 1.) * .25
+    return np.sin(np.pi * w[:, 0])**2 +  \
+           np.sum( (w[:, :-1] - 1.)**2 * \
+           (1. + 10. * np.sin(np.pi * w[:, :-1] + 1.)**2), axis=1 ) + \
+           (w[:, -1] - 1.)**2 * (1. + np.sin(2.*np.pi * w[:, -1])**2)
+
   def get_minimum(self):
     return np.ones(shape=(self.dim,), dtype=float)
 
@@ -284,6 +365,12 @@ class LevyN13Function(ObjectiveFunction):
     x, y = arr
     return np.sin(3. * np.pi * x)**2 + (x - 1.)**2 * (1. + np.sin(3. * np.pi * y)**2) + (y - 1.)**2 * (1. + np.sin(2. * np.pi * y)**2)
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return np.sin(3. * np.pi * x)**2 + (x - 1.)**2 * (1. + np.sin(3. * np.pi * y)**2) + (y - 1.)**2 * (1. + np.sin(2. * np.pi * y)**2)
+
   def get_minimum(self):
     return np.repeat(1., repeats=self.dim)
 
@@ -318,6 +405,11 @@ class RastringFunction(ObjectiveFunction):
     assert(len(arr) == self.dim)
     return 10. * self.dim + sum(arr*arr - 10. * np.cos(2*np.pi*arr))
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    return 10. * self.dim + np.sum(pop*pop - 10. * np.cos(2*np.pi*pop), axis=1)
+
   def get_minimum(self):
     return np.zeros(shape=(self.dim,), dtype=float)
 
@@ -334,6 +426,11 @@ class RosenbrockFunction(ObjectiveFunction):
     assert(len(arr) == self.dim)
     return sum( 100. * (arr[1:] - arr[:-1]*arr[:-1])**2 + (arr[:-1] - 1.)**2)
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    return np.sum( 100. * (pop[:, 1:] - pop[:, :-1]*pop[:, :-1])**2 + (pop[:, :-1] - 1.)**2, axis=1)
+
   def get_minimum(self):
     return np.ones(shape=(self.dim,), dtype=float)
 
@@ -352,6 +449,12 @@ class SchafferN2Function(ObjectiveFunction):
     x, y = arr
     return .5 * (np.sin(x*x - y*y) - .5) / (1. + 1e-3*(x*x + y*y))**2
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return .5 * (np.sin(x*x - y*y) - .5) / (1. + 1e-3*(x*x + y*y))**2
+
   def get_minimum(self):
     return np.zeros(shape=(self.dim,), dtype=float)
 
@@ -370,6 +473,12 @@ class SchafferN4Function(ObjectiveFunction):
     x, y = arr
     return .5 + (np.cos(np.sin(abs(x*x - y*y))) - .5) / (1. + 1e-3*(x*x + y*y))**2
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return .5 + (np.cos(np.sin(abs(x*x - y*y))) - .5) / (1. + 1e-3*(x*x + y*y))**2
+
   def get_minimum(self):
     return np.repeat(None, repeats=self.dim)#np.zeros(shape=(self.dim,), dtype=float)
 
@@ -386,6 +495,11 @@ class SchwefelFunction(ObjectiveFunction):
     assert(len(arr) == self.dim)
     return 418.9829 * self.dim - np.sum(arr * np.sin(np.sqrt(abs(arr))))
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    return 418.9829 * self.dim - np.sum(pop * np.sin(np.sqrt(abs(pop))), axis=1)
+
   def get_minimum(self):
     return np.repeat(420.9687, repeats=self.dim)
 
@@ -405,6 +519,14 @@ class ShubertFunction(ObjectiveFunction):
 
     return np.sum(idx * np.cos( (idx + 1.)*x + idx )) * np.sum(idx * np.cos( (idx + 1.)*y + idx ))
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    idx = np.arange(1., 6., dtype=pop.dtype)
+
+    return np.sum(idx * np.cos( (idx + 1.)*x[:, None] + idx ), axis=1) * np.sum(idx * np.cos( (idx + 1.)*y[:, None] + idx ), axis=1)
+
   def get_minimum(self):
     return np.repeat(None, repeats=self.dim)#np.zeros(shape=(self.dim,), dtype=float)
 
@@ -424,6 +546,12 @@ class SixHumpCamelFunction(ObjectiveFunction):
     x, y = arr
     return x**2 * (4. - 2.1 * x**2 + x**4 / 3.) + x*y + (-4. + 4.*y**2)*y**2
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return x**2 * (4. - 2.1 * x**2 + x**4 / 3.) + x*y + (-4. + 4.*y**2)*y**2
+
   def get_minimum(self):
     return np.array([(.0898, -.7126), (-.0898, .7126)])
 
@@ -442,6 +570,12 @@ class ThreeHumpCamelFunction(ObjectiveFunction):
     x, y = arr
     return 2. * x**2 - 1.05 * x**4 + x**6 / 6. + x * y + y**2
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    x, y = pop.T
+    return 2. * x**2 - 1.05 * x**4 + x**6 / 6. + x * y + y**2
+
   def get_minimum(self):
     return np.zeros(shape=(self.dim,), dtype=float)
 
@@ -459,6 +593,12 @@ class ZakharovFunction(ObjectiveFunction):
     idx = np.arange(1., self.dim + 1.)
     return sum(arr*arr) + sum(.5 * idx * arr)**2 + sum(.5 * idx * arr)**4
 
+  def evaluate_batch(self, pop):
+    pop = np.asarray(pop, dtype=float)
+    assert(pop.shape[1] == self.dim)
+    idx = np.arange(1., self.dim + 1., dtype=pop.dtype)
+    return np.sum(pop*pop, axis=1) + np.sum(.5 * idx * pop, axis=1)**2 + np.sum(.5 * idx * pop, axis=1)**4
+
   def get_minimum(self):
     return np.zeros(shape=(self.dim,), dtype=float)
 
@@ -491,8 +631,7 @@ if __name__ == '__main__':
   x = np.linspace(lb, ub, Nstep)
   x, y = np.meshgrid(x, x)
   z = np.asarray([[i, j] for i, j in zip(x.ravel(), y.ravel())])
-  z = list(map(func.evaluate, z))
-  z = np.asarray(z).reshape((Nstep, Nstep))
+  z = func.evaluate_batch(z).reshape((Nstep, Nstep))
   m_z = np.min(z)
   M_z = np.max(z)
 
@@ -2,99 +2,314 @@
 
 # References : https://stackoverflow.com/questions/34222272/computing-mean-square-displacement-using-python-and-fft
 
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from scipy import fft
+
+def _batch(x):
+  x = np.asarray(x, dtype=float)
+  return x[np.newaxis] if x.ndim == 2 else x
+
+def _ntau(nt0, stat_min):
+  ntau = nt0 - stat_min
+  if ntau <= 0:
+    raise ValueError('Wrong stat_min! It must be smaller than the number of steps')
+  return ntau
+
+def _prefix(x):
+  # prefix sums along the time axis, starting from 0
+  out = np.zeros(shape=(x.shape[0], x.shape[1] + 1) + x.shape[2:], dtype=float)
+  np.cumsum(x, axis=1, out=out[:, 1:])
+  return out
+
+def _blocks(nw, n, nx, max_memory):
+  # walkers whose complex spectra fit in max_memory bytes
+  size = int(max(1, max_memory // ((n // 2 + 1) * nx * 16)))
+  return [slice(lo, min(lo + size, nw)) for lo in range(0, nw, size)]
+
+def _correlation(X, n, ntau):
+  # autocorrelation (convention B) summed over the dimensions: the power
+  # spectra are summed before a single inverse transform per walker
+  Xf = X.view(float)
+  power = np.einsum('wkd,wkd->wk', Xf, Xf)
+  return fft.irfft(power, n=n, axis=1)[:, :ntau]
+
+def _time_averages(coords, stat_min, max_memory, msd = True, vacf = True, ntau = None):
+  # TAMSD(m) = S1(m) - 2 S2(m) with S2 the autocorrelation of the positions
+  # and S1(m) = sum_t (D(t) + D(t + m)) / (N - m), D = |x|^2, given by the
+  # prefix sums of D. The velocity spectrum is obtained from the position
+  # one, since v(t) = x(t + 1) - x(t):
+  #   V(k) = (X(k) - x(0)) w^-k - X(k) + x(N - 1) w^(k (N - 1)),  w = exp(-2 pi i / n)
+  coords = _batch(coords)
+  nw, nt0, nx = coords.shape
+  ntau_x = _ntau(nt0, stat_min) if ntau is None else ntau
+  ntau_v = _ntau(nt0 - 1, stat_min) if vacf else 0
+  n = fft.next_fast_len(2 * nt0, real=True)
+
+  tamsd  = np.empty(shape=(nw, ntau_x), dtype=float) if msd else None
+  tavacf = np.empty(shape=(nw, ntau_v), dtype=float) if vacf else None
+  m = np.arange(ntau_x)
+
+  if vacf:
+    k = np.arange(n // 2 + 1)
+    shift = np.exp(2j * np.pi * k / n)[:, np.newaxis]
+    last  = np.exp(-2j * np.pi * k * (nt0 - 1) / n)[:, np.newaxis]
+
+  for blk in _blocks(nw, n, nx, max_memory):
+    # positions relative to the starting points (the MSD and the velocity
+    # are translation invariant) to reduce the cancellation errors
+    x = coords[blk] - coords[blk, :1]
+    X = fft.rfft(x, n=n, axis=1)
+
+    if msd:
+      D = np.einsum('wtd,wtd->wt', x, x)
+      C = _prefix(D)
+      S1 = (C[:, nt0 - ntau_x + 1 : nt0 + 1][:, ::-1] + C[:, -1:] - C[:, :ntau_x]) / (nt0 - m)
+      S2 = _correlation(X, n, ntau_x) / (nt0 - m)
+      tamsd[blk] = S1 - 2. * S2
+
+    if vacf:
+      V = np.multiply(X, shift - 1.)
+      V += x[:, -1, np.newaxis, :] * last
+      tavacf[blk] = _correlation(V, n, ntau_v) / (nt0 - 1 - np.arange(ntau_v))
+
+  return tamsd, tavacf
+
+def _window_velocity(velocity, stat_min):
+  # tav[tau - 1] = < x(t + tau) - x(t) >_t / tau in closed form: with the
+  # prefix sums P of the velocity (P = x - x(0)) and Q of P the sums over t
+  # are differences of Q
+  nw, nt0, nx = velocity.shape
+  ntau = _ntau(nt0, stat_min)
+  Q = _prefix(_prefix(velocity))
+  tau = np.arange(1, ntau + 1)
+  # Q[nt0 + 1 - tau] as a reversed slice (no fancy-indexing copy)
+  window = Q[:, -1:] - Q[:, 1 : ntau + 1]
+  window -= Q[:, nt0 + 1 - ntau : nt0 + 1][:, ::-1]
+  window /= ((nt0 + 1 - tau) * tau)[:, np.newaxis]
+  return window
+
+def _chunk_measures(coords, stat_min, max_memory, keep_walkers):
+  # sums over the walkers of a chunk of all the measures (module-level
+  # function, so it can be run by process pools); the per-walker time
+  # averages are returned only if keep_walkers
+  coords = _batch(coords)
+  nw, nt0, nx = coords.shape
+  ntau_x, ntau_v = _ntau(nt0, stat_min), _ntau(nt0 - 1, stat_min)
+  velocity = np.diff(coords, axis=1)
+
+  tamsd, tavacf = _time_averages(coords, stat_min, max_memory, msd=True, vacf=True)
+  tav  = _window_velocity(velocity, stat_min)
+  disp = coords[:, :ntau_x] - coords[:, :1]
+
+  sums = {'n_walkers' : nw,
+          'tamsd'  : tamsd.sum(axis=0),
+          'tavacf' : tavacf.sum(axis=0),
+          'tav'    : tav.sum(axis=0),
+          'eamsd'  : np.einsum('wtd,wtd->t', disp, disp),
+          'eavacf' : np.einsum('wd,wtd->t', velocity[:, 0], velocity[:, :ntau_v]),
+          'eav'    : np.cumsum(velocity[:, :ntau_v].sum(axis=0), axis=0) / np.arange(1, ntau_v + 1)[:, np.newaxis]
+          }
+  walkers = {'velocity' : velocity, 'tamsd' : tamsd, 'tavacf' : tavacf, 'tav' : tav} if keep_walkers else None
+  return sums, walkers
+
 
 class Measures(object):
 
-  def __init__(self, coords, stat_min = 10):
-    self.npt, self.dim = coords.shape
+  # Statistics of an ensemble of walkers, with coords of shape
+  # (n_walkers, n_steps, dim) (a single walker can be given as (n_steps, dim)).
+  # The lags go from 0 to n_steps - stat_min, so that every time average is
+  # computed on at least stat_min samples:
+  #  - tamsd  : time averaged MSD of every walker (n_walkers, ntau)
+  #  - etamsd : ensemble average of the tamsd (ntau, )
+  #  - eamsd  : ensemble averaged MSD from the starting points (ntau, )
+  #  - tavacf, etavacf, eavacf : the same for the velocity autocorrelation
+  #  - tav, etav, eav : mean velocity over windows of 1 ... ntau steps
+  #                     (the velocity lags start from 1)
+  # The time averages are computed with zero-padded real FFTs along the time
+  # axis, batched over walkers and dimensions; the walkers are processed in
+  # blocks of at most max_memory bytes of spectra.
+  #
+  # coords can also be a memory-mapped array or an iterable of walker chunks
+  # (n_chunk_walkers, n_steps, dim), e.g. TrajectoryRecorder.walkers: the
+  # chunks are reduced one at a time (by n_jobs worker processes if
+  # n_jobs > 1), so the memory is bounded by the chunk size. The per-walker
+  # arrays (velocity, tamsd, tavacf, tav) are kept only if keep_walkers,
+  # which by default is True for in-memory arrays only.
+
+  def __init__(self, coords, stat_min = 10, max_memory = 2**28, n_jobs = 1, keep_walkers = None):
+    self.stat_min   = stat_min
+    self.max_memory = max_memory
+    # n_jobs <= 0 means all the available cores
+    self.n_jobs     = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+
+    if keep_walkers is None:
+      keep_walkers = isinstance(coords, (np.ndarray, list)) and not isinstance(coords, np.memmap)
+
+    self.compute_all(coords, stat_min, keep_walkers)
 
   def compute_velocity(self, coords):
-    self.velocity = np.apply_along_axis(np.diff, 1, coords)
+    self.velocity = np.diff(coords, axis=1)
+
+  def compute_all(self, coords, stat_min, keep_walkers = True):
+    # single pass over the walkers: the spectrum of the coordinates gives both
+    # the TAMSD and (by the shift theorem) the TAVACF; the chunks are reduced
+    # in the order of the walkers
+    totals, walkers = None, []
+    for sums, chunk in self._map(self._chunks(coords), stat_min, keep_walkers):
+      if totals is None:
+        totals = sums
+      else:
+        for key in totals:
+          totals[key] = totals[key] + sums[key]
+      if keep_walkers:
+        walkers.append(chunk)
+
+    if totals is None:
+      raise ValueError('Wrong coords! No walkers found')
+
+    nw = totals['n_walkers']
+    self.n_walkers, self.npt, self.dim = nw, self._shape[0], self._shape[1]
+    self.etamsd  = totals['tamsd']  / nw
+    self.etavacf = totals['tavacf'] / nw
+    self.etav    = totals['tav']    / nw
+    self.eamsd   = totals['eamsd']  / nw
+    self.eavacf  = totals['eavacf'] / nw
+    self.eav     = totals['eav']    / nw
+
+    for key in ('velocity', 'tamsd', 'tavacf', 'tav'):
+      setattr(self, key, np.concatenate([w[key] for w in walkers]) if keep_walkers else None)
+
+  def _chunks(self, coords):
+    # walker chunks of an array (in memory or memory-mapped) or of an
+    # iterable of chunks, checking that all have the same shape
+    self._shape = None
+    if hasattr(coords, 'ndim') or isinstance(coords, list):
+      coords = coords if hasattr(coords, 'ndim') else np.asarray(coords, dtype=float)
+      if coords.ndim == 2:
+        coords = coords[np.newaxis]
+      if coords.ndim != 3:
+        raise ValueError('Wrong coords shape! It must be (n_walkers, n_steps, dim)')
+      nw, nt0, nx = coords.shape
+      n = fft.next_fast_len(2 * nt0, real=True)
+      size = _blocks(1, n, nx, self.max_memory)[0].stop
+      array = coords
+      coords = (array[lo : lo + size] for lo in range(0, nw, size))
+
+    for chunk in coords:
+      chunk = _batch(chunk)
+      if chunk.ndim != 3:
+        raise ValueError('Wrong chunk shape! It must be (n_walkers, n_steps, dim)')
+      if self._shape is None:
+        self._shape = chunk.shape[1:]
+      elif chunk.shape[1:] != self._shape:
+        raise ValueError('Wrong chunk shape! All the chunks must have the same number of steps and dims')
+      yield chunk
+
+  def _map(self, chunks, stat_min, keep_walkers):
+    if self.n_jobs == 1:
+      for chunk in chunks:
+        yield _chunk_measures(chunk, stat_min, self.max_memory, keep_walkers)
+      return
+
+    # at most two chunks per worker in flight, so the memory stays bounded
+    # also with iterators; the results are collected in submission order
+    with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+      pending = deque()
+      for chunk in chunks:
+        pending.append(executor.submit(_chunk_measures, chunk, stat_min, self.max_memory, keep_walkers))
+        if len(pending) >= 2 * self.n_jobs:
+          yield pending.popleft().result()
+      while pending:
+        yield pending.popleft().result()
 
   def compute_etavacf(self, velocity, stat_min):
-    nt0, nx = velocity.shape
-    ntau    = nt0 - stat_min
-    self.etavacf = None # TODO
+    self.compute_tavacf(velocity, stat_min)
+    self.etavacf = self.tavacf.mean(axis=0)
 
   def compute_tavacf(self, velocity, stat_min):
-    nt0, nx = velocity.shape
-    ntau    = nt0 - stat_min
-    self.tavacf = None # TODO
+    velocity = _batch(velocity)
+    nw, nt0, nx = velocity.shape
+    ntau = _ntau(nt0, stat_min)
+    n = fft.next_fast_len(2 * nt0, real=True)
+
+    self.tavacf = np.empty(shape=(nw, ntau), dtype=float)
+    for blk in _blocks(nw, n, nx, self.max_memory):
+      V = fft.rfft(velocity[blk], n=n, axis=1)
+      self.tavacf[blk] = _correlation(V, n, ntau) / (nt0 - np.arange(ntau))
 
   def compute_eavacf(self, velocity, stat_min):
-    nt0, nx = velocity.shape
-    ntau    = nt0 - stat_min
-    self.eavacf = None # TODO
+    velocity = _batch(velocity)
+    nw, nt0, nx = velocity.shape
+    ntau = _ntau(nt0, stat_min)
+    self.eavacf = np.einsum('wd,wtd->t', velocity[:, 0], velocity[:, :ntau]) / nw
 
   def compute_etamsd(self, coords, stat_min):
-    nt0, nx = coords.shape
-    ntau    = nt0 - stat_min
-    self.etamsd = None # TODO
+    self.compute_tamsd(coords, stat_min)
+    self.etamsd = self.tamsd.mean(axis=0)
 
   def compute_eamsd(self, coords, stat_min):
-    nt0, nx = coords.shape
-    ntau    = nt0 - stat_min
-    self.eamsd = None # TODO
+    coords = _batch(coords)
+    nw, nt0, nx = coords.shape
+    ntau = _ntau(nt0, stat_min)
+    disp = coords[:, :ntau] - coords[:, :1]
+    self.eamsd = np.einsum('wtd,wtd->t', disp, disp) / nw
 
   def compute_tamsd(self, coords, stat_min):
-    nt0, nx = coords.shape
-    ntau    = nt0 - stat_min
-    self.tamsd = None # TODO
+    self.tamsd, _ = _time_averages(coords, stat_min, self.max_memory, msd=True, vacf=False)
 
   def compute_etav(self, velocity, stat_min):
-    nt0, nx = velocity.shape
-    ntau    = nt0 - stat_min
-    self.etav = None # TODO
+    self.compute_tav(velocity, stat_min)
+    self.etav = self.tav.mean(axis=0)
 
   def compute_tav(self, velocity, stat_min):
-    nt0, nx = velocity.shape
-    ntau    = nt0 - stat_min
-    self.tav = None # TODO
+    self.tav = _window_velocity(_batch(velocity), stat_min)
 
   def compute_eav(self, velocity, stat_min):
-    nt0, nx = velocity.shape
-    ntau    = nt0 - stat_min
-    self.eav = None # TODO
+    velocity = _batch(velocity)
+    nw, nt0, nx = velocity.shape
+    ntau = _ntau(nt0, stat_min)
+    tau = np.arange(1, ntau + 1)
+    self.eav = np.cumsum(velocity[:, :ntau].sum(axis=0), axis=0) / (nw * tau[:, np.newaxis])
 
   def autocorrFFT(self, x):
-    N = len(x)
-    F = np.fft.fft(x, n=2*N)  #2*N because of zero-padding
-    PSD = F * F.conjugate()
-    res = np.fft.ifft(PSD)
-    res = (res[:N]).real   #now we have the autocorrelation in convention B
-    n   = np.linspace(1./N, 1, num=N) #divide res(m) by (N-m)
-    return res * n #this is the autocorrelation in convention A
+    # autocorrelation (convention A) along the first axis of x, or along the
+    # time axis of a (n_walkers, n_steps) batch
+    x = np.asarray(x, dtype=float)
+    N = x.shape[-1] if x.ndim > 1 else len(x)
+    n = fft.next_fast_len(2 * N, real=True) # zero-padding
+    F = fft.rfft(x, n=n, axis=-1)
+    res = fft.irfft(F.real**2 + F.imag**2, n=n, axis=-1)[..., :N]
+    return res / (N - np.arange(N)) # divide res(m) by (N-m)
 
   def msd_fft(self, r):
-    N  = len(r)
-    D  = np.square(r).sum(axis=1)
-    D  = np.append(D,0)
-    S2 = sum([self.autocorrFFT(r[:, i]) for i in range(r.shape[1])])
-    Q  = 2.*D.sum()
-    S1 = np.empty(shape=(N,))
-    for m in range(N):
-      norm  = 1. / (N - m)
-      Q     = Q - D[m - 1] - D[N - m]
-      S1[m] = Q * norm
-    return S1 - 2.*S2
+    # time averaged MSD of a (n_steps, dim) trajectory or of a
+    # (n_walkers, n_steps, dim) batch, for all the lags
+    r = np.asarray(r, dtype=float)
+    batch = _batch(r)
+    msd, _ = _time_averages(batch, 0, self.max_memory, msd=True, vacf=False, ntau=batch.shape[1])
+    return msd if r.ndim == 3 else msd[0]
 
   def __repr__(self):
     class_name = self.__class__.__name__
     return '<%s Class>'%(class_name)
 
   def __str__(self):
+    # the per-walker measures are not available for the out-of-core inputs
+    fmt = lambda x : 'not stored' if x is None else ', '.join(map(str, x))
     fmt_str  = 'Statistical Measures\n'
-    fmt_str += 'Velocity: %s'%(', '.join(map(str, self.velocity)))
-    fmt_str += 'Ensemble time average velocity autocorrelation function: %s\n'%(', '.join(map(str, self.etavacf)))
-    fmt_str += 'Time average velocity autocorrelation function: %s\n'%(', '.join(map(str, self.tavacf)))
-    fmt_str += 'Ensemble average velocity autocorrelation function: %s\n'%(', '.join(map(str, self.eavacf)))
-    fmt_str += 'Ensemble time average mean square displacement: %s\n'%(', '.join(map(str, self.etamsd)))
-    fmt_str += 'Ensemble average mean square displacement: %s\n'%(', '.join(map(str, self.eamsd)))
-    fmt_str += 'Time average mean square displacement: %s\n'%(', '.join(map(str, self.tamsd)))
-    fmt_str += 'Ensemble time average velocity: %s\n'%(', '.join(map(str, self.etav)))
-    fmt_str += 'Time average velocity: %s\n'%(', '.join(map(str, self.tav)))
-    fmt_str += 'Ensemble average velocity: %s\n'%(', '.join(map(str, self.eav)))
+    fmt_str += 'Velocity: %s\n'%(fmt(self.velocity))
+    fmt_str += 'Ensemble time average velocity autocorrelation function: %s\n'%(fmt(self.etavacf))
+    fmt_str += 'Time average velocity autocorrelation function: %s\n'%(fmt(self.tavacf))
+    fmt_str += 'Ensemble average velocity autocorrelation function: %s\n'%(fmt(self.eavacf))
+    fmt_str += 'Ensemble time average mean square displacement: %s\n'%(fmt(self.etamsd))
+    fmt_str += 'Ensemble average mean square displacement: %s\n'%(fmt(self.eamsd))
+    fmt_str += 'Time average mean square displacement: %s\n'%(fmt(self.tamsd))
+    fmt_str += 'Ensemble time average velocity: %s\n'%(fmt(self.etav))
+    fmt_str += 'Time average velocity: %s\n'%(fmt(self.tav))
+    fmt_str += 'Ensemble average velocity: %s\n'%(fmt(self.eav))
     return fmt_str
 
 
@@ -107,3 +322,5 @@ if __name__ == '__main__':
   coords = np.random.uniform(low=0., high=1., size=(N, dim))
   stat_min = 10
 
+  measures = Measures(coords, stat_min=stat_min)
+  print(measures.etamsd[:10])
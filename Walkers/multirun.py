@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+
+# Batched multi-run engine: R independent runs of the same optimizer are
+# stacked in (R, dim, n_population) arrays, so that every generation is a
+# single vectorized update and a single fitness evaluation of the
+# R * n_population walkers.
+# Every run draws its random numbers from its own RandomStream in the same
+# order of the sequential optimizer, so run r reproduces the Solution of
+# the corresponding optimizer called with seed=seeds[r].
+
+import numpy as np
+import time
+import sys
+import warnings
+from .solution import Solution
+from .evaluator import Evaluator
+from .walks import levy_flight
+from .rng import as_stream
+
+def _draw(rngs, method, *args, **kwargs):
+  # stack the same draw of every run
+  return np.stack([getattr(rng, method)(*args, **kwargs) for rng in rngs])
+
+def _fitness(evaluate, pos, n_evals):
+  # evaluate the (R, dim, n_population) walkers in one call; n_evals[r]
+  # counts the objective function calls of the run r. The cache hits are
+  # known only by the evaluator, so with a cache the runs are evaluated one
+  # by one to count their calls
+  R, dim, n = pos.shape
+  if evaluate.cache is None:
+    n_evals += n
+    return evaluate(pos.transpose(0, 2, 1).reshape(R * n, dim)).reshape(R, n)
+
+  fitness = np.empty(shape=(R, n), dtype=float)
+  for r in range(R):
+    calls = evaluate.n_evals
+    fitness[r] = evaluate(pos[r], axis=0)
+    n_evals[r] += evaluate.n_evals - calls
+  return fitness
+
+def _update(evaluate, fitness, pos, dirty, n_evals):
+  # re-evaluate only the walkers flagged in the (R, n_population) dirty mask,
+  # counting the calls of every run as in _fitness
+  R, dim, n = pos.shape
+  if evaluate.cache is None:
+    n_evals += dirty.sum(axis=1)
+    return evaluate.update(fitness.ravel(), pos.transpose(0, 2, 1).reshape(R * n, dim), dirty.ravel()).reshape(R, n)
+
+  out = np.empty(shape=(R, n), dtype=float)
+  for r in range(R):
+    calls = evaluate.n_evals
+    out[r] = evaluate.update(fitness[r], pos[r], dirty[r], axis=0)
+    n_evals[r] += evaluate.n_evals - calls
+  return out
+
+def _select(pos, idx):
+  # column idx[r] of every run as (R, dim, 1) array
+  return pos[np.arange(len(idx)), :, idx][..., np.newaxis]
+
+def _progress(t, max_iters, score, start_time):
+  sys.stdout.write('\r')
+  sys.stdout.write("It %-5d: [%-25s] %.3f %.3f sec"
+                   %(t,
+                     '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
+                     np.min(score),
+                     time.time() - start_time))
+
+def _solutions(name, objfunc, dim, n_population, max_iters, start_time, n_evals, walk, best, pos):
+  R = len(best)
+  end_time = time.time()
+  solutions = []
+
+  for r in range(R):
+    sol = Solution(dim          = dim,
+                   n_population = n_population,
+                   max_iters    = max_iters,
+                   optimizer    = name,
+                   objfname     = objfunc.__name__,
+                   start_time   = start_time
+                   )
+    # the runs share the same wall-clock time
+    sol.end_time    = end_time
+    sol.execution_time = end_time - start_time
+    sol.n_iters     = walk.shape[1]
+    sol.n_evals     = int(n_evals[r])
+    sol.stop_reason = 'max_iters'
+    sol.walk        = walk[r]
+    sol.best        = best[r]
+    sol.population  = pos[r].T
+    solutions.append(sol)
+
+  return solutions
+
+def _start(name, objfunc, seeds, verbose):
+  seeds = list(seeds)
+  if not seeds:
+    raise ValueError('Wrong number of runs! At least one seed is required')
+
+  if verbose:
+    print (name + " is optimizing \"" + objfunc.__name__ + "\" (%d runs)"%(len(seeds)))
+
+  return [as_stream(seed) for seed in seeds]
+
+
+def pso(objfunc,
+        lower_bound,
+        upper_bound,
+        dim,          # Number of dimensions
+        n_population, # Population size
+        max_iters,    # Number of generations
+        Vmax = 6.,    #
+        wmax = .9,    #
+        wmin = .2,    #
+        c1   = 2.,    #
+        c2   = 2.,    #
+        seeds = range(30), # one run for each seed
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None  # fitness cache (True, max size or FitnessCache)
+        ):
+
+  rngs = _start("PSO", objfunc, seeds, verbose)
+  R = len(rngs)
+
+  walk = np.empty(shape=(R, max_iters, dim), dtype=float)
+  pos = _draw(rngs, 'uniform', low=lower_bound, high=upper_bound, size=(dim, n_population))
+
+  vel = np.zeros(shape=(R, dim, n_population))
+  wt = np.linspace(wmax, wmin, num=max_iters)
+  p_score = np.full(shape=(R, n_population), fill_value=np.inf)
+  p_best = np.zeros(shape=(R, dim, n_population), dtype=float)
+  g_score = np.full(shape=(R,), fill_value=np.inf)
+  g_best  = np.zeros(shape=(R, dim, 1))
+
+  if wmin > wmax:
+    warnings.warn('wmin greater than wmax! Automatically swapped')
+    wmin, wmax = wmax, wmin
+
+  start_time = time.time()
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache)
+  n_evals = np.zeros(shape=(R,), dtype=int)
+
+  for t, w in enumerate(wt):
+    pos = np.clip(pos, lower_bound, upper_bound)
+    fitness = _fitness(evaluate, pos, n_evals)
+    idx = fitness < p_score
+    p_best  = np.where(idx[:, np.newaxis, :], pos, p_best)
+    p_score = np.where(idx, fitness, p_score)
+
+    idx = np.argmin(fitness, axis=1)
+    fbest = fitness[np.arange(R), idx]
+    upd = fbest < g_score
+    g_score[upd] = fbest[upd]
+    g_best[upd]  = _select(pos, idx)[upd]
+
+    r1 = _draw(rngs, 'uniform', low=0., high=1., size=(dim, n_population))
+    r2 = _draw(rngs, 'uniform', low=0., high=1., size=(dim, n_population))
+
+    vel = w * vel + c1 * r1 * (p_best - pos) + c2 * r2 * (g_best - pos)
+    vel = np.clip(vel, -Vmax, Vmax)
+    pos += vel
+
+    walk[:, t] = g_best[..., 0]
+    if verbose:
+      _progress(t, max_iters, g_score, start_time)
+  if verbose:
+    sys.stdout.write('\n')
+
+  evaluate.close()
+
+  return _solutions("PSO", objfunc, dim, n_population, max_iters, start_time, n_evals, walk, g_score, pos)
+
+
+def gwo(objfunc,
+        lower_bound,
+        upper_bound,
+        dim,          # Number of dimensions
+        n_population, # Population size
+        max_iters,    # Number of generations
+        seeds = range(30), # one run for each seed
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None  # fitness cache (True, max size or FitnessCache)
+        ):
+
+  rngs = _start("GWO", objfunc, seeds, verbose)
+  R = len(rngs)
+
+  alpha_score, beta_score, delta_score = [np.full(shape=(R,), fill_value=np.inf) for _ in range(3)]
+  alpha_pos, beta_pos, delta_pos = [np.zeros(shape=(R, dim, 1), dtype=float) for _ in range(3)]
+  walk = np.empty(shape=(R, max_iters, dim), dtype=float)
+
+  pos = _draw(rngs, 'uniform', low=lower_bound, high=upper_bound, size=(dim, n_population))
+
+  start_time = time.time()
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache)
+  n_evals = np.zeros(shape=(R,), dtype=int)
+
+  def hunt(leader, a):
+    r1 = _draw(rngs, 'uniform', low=0., high=1., size=(dim, n_population))
+    r2 = _draw(rngs, 'uniform', low=0., high=1., size=(dim, n_population))
+    A  = 2. * a * r1 - a
+    C  = 2. * r2
+    return leader - abs(C * leader - pos) * A
+
+  at = np.linspace(2, 0, num=max_iters)
+  for t, a in enumerate(at):
+    pos = np.clip(pos, lower_bound, upper_bound)
+    fitness = _fitness(evaluate, pos, n_evals)
+
+    # update alpha, beta and delta (in the same order of gwo)
+    minpos = np.argmin(fitness, axis=1)
+    fmin   = fitness[np.arange(R), minpos]
+    x      = _select(pos, minpos)
+
+    upd = fmin < alpha_score
+    alpha_score[upd] = fmin[upd]
+    alpha_pos[upd]   = x[upd]
+    upd = (fmin > alpha_score) & (fmin < beta_score)
+    beta_score[upd] = fmin[upd]
+    beta_pos[upd]   = x[upd]
+    upd = (fmin > alpha_score) & (fmin > beta_score) & (fmin < delta_score)
+    delta_score[upd] = fmin[upd]
+    delta_pos[upd]   = x[upd]
+
+    D_alpha = hunt(alpha_pos, a)
+    D_beta  = hunt(beta_pos, a)
+    D_delta = hunt(delta_pos, a)
+    pos = (D_alpha + D_beta + D_delta) / 3
+
+    walk[:, t] = alpha_pos[..., 0]
+    if verbose:
+      _progress(t, max_iters, alpha_score, start_time)
+  if verbose:
+    sys.stdout.write('\n')
+
+  evaluate.close()
+
+  return _solutions("GWO", objfunc, dim, n_population, max_iters, start_time, n_evals, walk, alpha_score, pos)
+
+
+def woa(objfunc,
+        lower_bound,
+        upper_bound,
+        dim,          # Number of dimensions
+        n_population, # Population size
+        max_iters,    # Number of generations
+        b = 1.,       # defines shape of the spiral
+        seeds = range(30), # one run for each seed
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None  # fitness cache (True, max size or FitnessCache)
+        ):
+
+  rngs = _start("WOA", objfunc, seeds, verbose)
+  R = len(rngs)
+
+  walk = np.empty(shape=(R, max_iters, dim), dtype=float)
+  pos = _draw(rngs, 'uniform', low=lower_bound, high=upper_bound, size=(dim, n_population))
+
+  at = np.linspace(2, 0, num=max_iters)
+  a2t = np.linspace(-1, -2, num=max_iters)
+  leader_score = np.full(shape=(R,), fill_value=np.inf)
+  leader_pos = np.zeros(shape=(R, dim, 1), dtype=float)
+
+  start_time = time.time()
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache)
+  n_evals = np.zeros(shape=(R,), dtype=int)
+
+  for (t, a), a2 in zip(enumerate(at), a2t):
+    pos = np.clip(pos, lower_bound, upper_bound)
+    fitness = _fitness(evaluate, pos, n_evals)
+
+    idx = np.argmin(fitness, axis=1)
+    fmin = fitness[np.arange(R), idx]
+    upd = fmin < leader_score
+    leader_score[upd] = fmin[upd]
+    leader_pos[upd]   = _select(pos, idx)[upd]
+
+    r1 = _draw(rngs, 'uniform', low=0., high=1., size=(n_population,))
+    r2 = _draw(rngs, 'uniform', low=0., high=1., size=(n_population,))
+
+    A = 2. * a * r1 - a
+    C = 2. * r2
+    p = _draw(rngs, 'uniform', low=0., high=1., size=(n_population,)) < .5
+
+    A_condition = abs(A) >= 1.
+
+    # search for prey: only the runs with at least an exploring whale draw
+    # the random companions (as in woa)
+    idx = np.logical_and(p, A_condition)
+    runs = np.flatnonzero(idx.any(axis=1))
+    if runs.size:
+      l_idx = np.floor(n_population *
+                       _draw([rngs[r] for r in runs], 'uniform', low=0., high=1., size=(n_population,))
+                       ).astype(int)
+      rr = runs[:, np.newaxis]
+      prey = pos[rr, :, l_idx].transpose(0, 2, 1)
+      prey = prey - np.take_along_axis(A[runs], l_idx, axis=1)[:, np.newaxis, :] * abs(C[runs][:, np.newaxis, :] * prey - prey)
+      pos[rr, :, l_idx] = prey.transpose(0, 2, 1)
+
+    # encircling prey
+    idx = np.logical_and(p, ~A_condition)[:, np.newaxis, :]
+    pos = np.where(idx, leader_pos - A[:, np.newaxis, :] * abs(C[:, np.newaxis, :] * leader_pos - pos), pos)
+
+    # spiral update
+    p = ~p[:, np.newaxis, :]
+    l = (a2 - 1.) * _draw(rngs, 'uniform', low=0., high=1., size=(n_population,))[:, np.newaxis, :] + 1.
+    dist2leader = abs(leader_pos - pos)
+    pos = np.where(p, dist2leader * np.exp(b * l) * np.cos(2. * l * np.pi) + leader_pos, pos)
+
+    walk[:, t] = leader_pos[..., 0]
+    if verbose:
+      _progress(t, max_iters, leader_score, start_time)
+  if verbose:
+    sys.stdout.write('\n')
+
+  evaluate.close()
+
+  return _solutions("WOA", objfunc, dim, n_population, max_iters, start_time, n_evals, walk, leader_score, pos)
+
+
+def cs( objfunc,
+        lower_bound,
+        upper_bound,
+        dim,          # Number of dimensions
+        n_population, # Population size
+        max_iters,    # Number of generations
+        pa = .25,     # discovery rate of alien eggs/solution
+        beta = 1.5,
+        seeds = range(30), # one run for each seed
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None  # fitness cache (True, max size or FitnessCache)
+        ):
+
+  assert(beta < 2. and beta > 1.)
+
+  rngs = _start("CS", objfunc, seeds, verbose)
+  R = len(rngs)
+
+  walk = np.empty(shape=(R, max_iters, dim), dtype=float)
+  sigma = levy_flight(beta)
+  beta_inv = 1. / beta
+
+  pos = _draw(rngs, 'uniform', low=lower_bound, high=upper_bound, size=(dim, n_population))
+
+  start_time = time.time()
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache)
+  n_evals = np.zeros(shape=(R,), dtype=int)
+
+  fitness = _fitness(evaluate, pos, n_evals)
+  best = np.argmin(fitness, axis=1)
+  fmin = fitness[np.arange(R), best]
+  best = _select(pos, best)
+
+  for t in range(max_iters):
+    # Levy flights around the best nest of each run
+    u = _draw(rngs, 'randn', dim, n_population) * sigma
+    v = _draw(rngs, 'randn', dim, n_population)
+    step = u / abs(v)**(beta_inv)
+    stepsize = 1e-2 * (step * (pos - best))
+    s = pos + stepsize * _draw(rngs, 'randn', dim, n_population)
+    new_pos = np.clip(s, lower_bound, upper_bound)
+
+    fit_new = _fitness(evaluate, new_pos, n_evals)
+    idx = fit_new <= fitness
+    fitness = np.where(idx, fit_new, fitness)
+    pos = np.where(idx[:, np.newaxis, :], new_pos, pos)
+
+    # discovery of the alien eggs
+    rng = _draw(rngs, 'uniform', low=0., high=1., size=(dim, n_population)) > pa
+    alien = _draw(rngs, 'uniform', low=0., high=1., size=(dim, n_population))
+    perm1 = _draw(rngs, 'permutation', n_population)[:, np.newaxis, :]
+    perm2 = _draw(rngs, 'permutation', n_population)[:, np.newaxis, :]
+    new_pos = np.where(rng, new_pos + alien * (np.take_along_axis(new_pos, perm1, axis=2) -
+                                               np.take_along_axis(new_pos, perm2, axis=2)), new_pos)
+
+    # only the nests moved by the discovery step are re-evaluated
+    fit_new = _update(evaluate, fit_new, new_pos, rng.any(axis=1), n_evals)
+    idx = fit_new <= fitness
+    fitness = np.where(idx, fit_new, fitness)
+    pos = np.where(idx[:, np.newaxis, :], new_pos, pos)
+
+    tmp_best = np.argmin(fit_new, axis=1)
+    ftmp = fit_new[np.arange(R), tmp_best]
+    upd = ftmp < fmin
+    fmin[upd] = ftmp[upd]
+    best[upd] = _select(new_pos, tmp_best)[upd]
+
+    walk[:, t] = best[..., 0]
+    if verbose:
+      _progress(t, max_iters, fmin, start_time)
+  if verbose:
+    sys.stdout.write('\n')
+
+  evaluate.close()
+
+  return _solutions("CS", objfunc, dim, n_population, max_iters, start_time, n_evals, walk, fmin, pos)
+
+
+if __name__ == "__main__":
+
+  from .landscape import AckleyFunction
+
+  n_population = 50
+  max_iters = 500
+  lower_bound = -32
+  upper_bound = 32
+  dim = 30
+  score_func = AckleyFunction(dim=dim)
+
+  solutions = pso(objfunc = score_func,
+                  lower_bound = lower_bound,
+                  upper_bound = upper_bound,
+                  dim = dim,
+                  n_population = n_population,
+                  max_iters = max_iters,
+                  seeds = range(10))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+# Python bindings to the C++ optimizers (cpp/src/*.hpp).
+# The compiled library (Walkers/_walkers*) is built by setup.py or by
+# cmake -DPYWRAP=ON and it is loaded with ctypes: when it is missing, or
+# the kernel has not been verified, every function falls back to the pure
+# Python optimizer.
+
+import os
+import glob
+import time
+import ctypes
+import inspect
+from functools import wraps
+import numpy as np
+
+from .solution import Solution
+from .landscape import ObjectiveFunction
+from .optimizers.bat import bat as _bat
+from .optimizers.bbo import bbo as _bbo
+from .optimizers.cfa import cfa as _cfa
+from .optimizers.cs import cs as _cs
+from .optimizers.gwo import gwo as _gwo
+from .optimizers.pso import pso as _pso
+from .optimizers.ssa import ssa as _ssa
+from .optimizers.woa import woa as _woa
+
+_objective = ctypes.CFUNCTYPE(ctypes.c_float, ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+_float_p   = ctypes.POINTER(ctypes.c_float)
+
+def _load():
+  here = os.path.dirname(os.path.abspath(__file__))
+  for path in sorted(glob.glob(os.path.join(here, '_walkers*'))):
+    try:
+      lib = ctypes.CDLL(path)
+    except OSError:
+      continue
+    lib.walkers_optimize.restype  = ctypes.c_int
+    lib.walkers_optimize.argtypes = [ctypes.c_char_p, ctypes.c_char_p, _objective,
+                                     ctypes.c_float, ctypes.c_float,
+                                     ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                     _float_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int,
+                                     _float_p, _float_p, _float_p, ctypes.POINTER(ctypes.c_longlong),
+                                     ctypes.POINTER(ctypes.c_int)]
+    return lib
+  return None
+
+_lib = _load()
+available = _lib is not None
+
+# C++ kernels whose results have been checked against the Python
+# optimizers (same number of evaluations, comparable best scores over seeds,
+# landscapes and dimensions): the other ones always run the Python version.
+# The kernels draw the random numbers serially from std::mt19937, so the
+# results depend on the seed but not on n_jobs, and they differ from the
+# numpy ones of the Python optimizers.
+verified = ('bat', 'bbo', 'cfa', 'cs', 'gwo', 'pso', 'ssa', 'woa')
+
+# built-in landscapes whose C++ twin matches the Python function (Ackley,
+# CrossInTray, DixonPrice, HolderTable, Levy and SixHumpCamel differ, and
+# Rastring and Schwefel differ for dim > 2)
+verified_landscapes = ('Booth', 'BukinN6', 'DropWave', 'Eggholder', 'GrieWank', 'LevyN13',
+                       'Matyas', 'McCormick', 'Rosenbrock', 'SchafferN2', 'SchafferN4',
+                       'Shubert', 'ThreeHumpCamel', 'Zakharov')
+
+# arguments handled by the C++ kernels: any other argument of the Python
+# optimizers set to a non-default value falls back to the Python version
+_common = ('objfunc', 'lower_bound', 'upper_bound', 'dim', 'n_population', 'max_iters', 'seed', 'pos', 'verbose', 'n_jobs')
+
+def _is_default(value, default):
+  if value is default:
+    return True
+  return np.isscalar(value) and np.isscalar(default) and value == default
+
+def _builtin(objfunc):
+  # only the landscape functions shipped with the package have a C++ twin
+  if isinstance(objfunc, ObjectiveFunction) and type(objfunc).__module__ == ObjectiveFunction.__module__ \
+     and objfunc.__name__ in verified_landscapes:
+    return objfunc.__name__.encode()
+  return None
+
+def _native(pyfunc, params):
+  signature = inspect.signature(pyfunc)
+  name = pyfunc.__name__
+
+  @wraps(pyfunc)
+  def optimizer(*args, **kwargs):
+    bound = signature.bind(*args, **kwargs)
+    python_only = [k for k, v in bound.arguments.items()
+                   if k not in _common + params and not _is_default(v, signature.parameters[k].default)]
+
+    # the C++ kernels take only integer seeds (not RandomStream/SeedSequence)
+    seed = bound.arguments.get('seed', 0)
+    if not available or name not in verified or python_only or bound.arguments.get('pos') is not None or not isinstance(seed, (int, np.integer)):
+      return pyfunc(*args, **kwargs)
+
+    bound.apply_defaults()
+    arg = bound.arguments
+    objfunc = arg['objfunc']
+    dim, max_iters = int(arg['dim']), int(arg['max_iters'])
+    n_jobs = int(arg['n_jobs'])
+
+    hyperparams = np.zeros(shape=(max(len(params), 1),), dtype=np.float32)
+    hyperparams[:len(params)] = [arg[p] for p in params]
+    walk = np.empty(shape=(max_iters, dim), dtype=np.float32)
+    best = ctypes.c_float(0.)
+    population = np.empty(shape=(int(arg['n_population']), dim), dtype=np.float32)
+    n_evals = ctypes.c_longlong(0)
+    n_iters = ctypes.c_int(0)
+
+    errors = []
+    def evaluate(x, d):
+      # the exceptions can not cross the C++ boundary
+      try:
+        return float(objfunc.evaluate(np.ctypeslib.as_array(x, shape=(d,)).astype(float)))
+      except Exception as e:
+        errors.append(e)
+        return np.inf
+
+    if arg['verbose']:
+      print (name.upper() + " is optimizing \"" + objfunc.__name__ + "\"")
+
+    sol = Solution(dim          = dim,
+                   n_population = arg['n_population'],
+                   max_iters    = max_iters,
+                   optimizer    = name.upper(),
+                   objfname     = objfunc.__name__,
+                   start_time   = time.time()
+                   )
+
+    landscape = _builtin(objfunc)
+    callback  = _objective() if landscape else _objective(evaluate)
+    run = lambda landscape, callback : _lib.walkers_optimize(name.encode(), landscape, callback,
+                                                             arg['lower_bound'], arg['upper_bound'],
+                                                             dim, arg['n_population'], max_iters,
+                                                             hyperparams.ctypes.data_as(_float_p),
+                                                             int(arg['seed']), int(arg['verbose']),
+                                                             n_jobs if n_jobs > 0 else (os.cpu_count() or 1),
+                                                             walk.ctypes.data_as(_float_p), ctypes.byref(best),
+                                                             population.ctypes.data_as(_float_p), ctypes.byref(n_evals),
+                                                             ctypes.byref(n_iters))
+    ret = run(landscape, callback)
+    if ret == -2:
+      # landscape without C++ implementation: evaluate it in Python
+      ret = run(None, _objective(evaluate))
+
+    if errors:
+      raise errors[0]
+    if ret:
+      raise ValueError('Native optimizer {} failed with code {:d}'.format(name, ret))
+
+    if arg['verbose']:
+      print ('')
+
+    sol.end_time   = time.time()
+    sol.execution_time = sol.end_time - sol.start_time
+    sol.n_iters    = n_iters.value
+    sol.n_evals    = n_evals.value
+    sol.stop_reason = 'max_iters'
+    sol.walk       = walk[:n_iters.value].astype(float)
+    sol.best       = best.value
+    sol.population = population.astype(float)
+
+    return sol
+
+  return optimizer
+
+bat = _native(_bat, ('A', 'r', 'Qmin', 'Qmax', 'step'))
+bbo = _native(_bbo, ('pmutate', 'elite'))
+cfa = _native(_cfa, ())
+cs  = _native(_cs,  ('pa', 'beta'))
+gwo = _native(_gwo, ())
+pso = _native(_pso, ('Vmax', 'wmax', 'wmin', 'c1', 'c2'))
+ssa = _native(_ssa, ())
+woa = _native(_woa, ('b',))
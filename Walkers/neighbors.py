@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+def find_neighbors(pos, k = None, cutoff = None, sources = None):
+  # Neighbours of every walker among the walkers pos[sources] (all the walkers
+  # by default): the k nearest ones and/or the ones within the cutoff radius.
+  # The neighbours are returned as CSR arrays (indptr, indices, distances),
+  # sorted by walker index and without the walker itself: the neighbours of
+  # the walker i are indices[indptr[i] : indptr[i + 1]]
+
+  if k is None and cutoff is None:
+    raise ValueError('Wrong neighbourhood! At least one of k and cutoff must be given')
+  if k is not None and k <= 0:
+    raise ValueError('Wrong number of neighbours! It must be positive')
+
+  n = len(pos)
+  sources = np.arange(n) if sources is None else np.asarray(sources, dtype=int)
+  tree = cKDTree(pos[sources])
+  radius = np.inf if cutoff is None else cutoff
+
+  if k is not None:
+    # one more neighbour, since the walker itself can be among the sources
+    kk = min(k + 1, len(sources))
+    distances, idx = tree.query(pos, k=kk, distance_upper_bound=radius)
+    distances, idx = distances.reshape(n, kk), idx.reshape(n, kk)
+
+    # missing neighbours (outside the cutoff) have idx == len(sources)
+    valid = idx < len(sources)
+    indices = np.where(valid, sources[np.minimum(idx, len(sources) - 1)], n)
+    valid &= indices != np.arange(n)[:, np.newaxis]
+    valid &= np.cumsum(valid, axis=1) <= k
+    indices[~valid] = n
+
+    order = np.argsort(indices, axis=1, kind='stable')
+    indices   = np.take_along_axis(indices, order, axis=1)
+    distances = np.take_along_axis(distances, order, axis=1)
+    valid     = np.take_along_axis(valid, order, axis=1)
+
+    counts    = valid.sum(axis=1)
+    indices   = indices[valid]
+    distances = distances[valid]
+
+  else:
+    lists = tree.query_ball_point(pos, r=radius)
+    counts = np.asarray([len(l) for l in lists], dtype=int)
+    rows = np.repeat(np.arange(n), counts)
+    indices = sources[np.concatenate(lists).astype(int)] if counts.sum() else np.empty(shape=(0,), dtype=int)
+
+    valid = indices != rows
+    rows, indices = rows[valid], indices[valid]
+    order = np.lexsort((indices, rows))
+    rows, indices = rows[order], indices[order]
+
+    counts = np.bincount(rows, minlength=n)
+    distances = np.linalg.norm(pos[indices] - pos[rows], axis=1)
+
+  indptr = np.concatenate(([0], np.cumsum(counts)))
+  return indptr, indices, distances
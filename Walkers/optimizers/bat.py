@@ -9,6 +9,11 @@ import time
 import sys
 import warnings
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def bat(objfunc,
         lower_bound,
@@ -23,23 +28,32 @@ def bat(objfunc,
         step = 1e-3,  # scale of normal random generator
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  Qt = np.random.uniform(low=Qmin, high=Qmax, size=(max_iters, n_population))
-  v  = np.zeros(shape=(dim, n_population), dtype=float) # velocities
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  v  = np.zeros(shape=(dim, n_population), dtype=dtype) # velocities
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
     # Initialize the population/solutions
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(dim, n_population))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(dim, n_population),
+                         dtype=dtype)
   else:
-    pos = pos.T
+    pos = np.array(pos.T, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     d, n = pos.shape
@@ -58,31 +72,41 @@ def bat(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "BAT",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  fitness = np.apply_along_axis(objfunc.evaluate, 0, pos)
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  fitness = evaluate(pos, axis=0)
   best = np.argmin(fitness)
   fmin = fitness[best]
   best = np.array(pos[:, best], ndmin=2)
 
-  rngt = np.random.uniform(low=0., high=1., size=(max_iters,
-                                                  n_population))
-  rngt = rngt > r
-  dim_rngt = np.sum(rngt, axis=1)
-  rng2t = np.random.uniform(low=0., high=1., size=(max_iters,
-                                                   n_population))
-  rng2t = rng2t < A
+  profile.switch('update')
   # main loop
-  for (t, Q), rng, rng2, dim_rng in zip(enumerate(Qt), rngt, rng2t, dim_rngt):
+  for t in range(max_iters):
+    # the random numbers of each iteration are drawn from the (buffered)
+    # stream, so the memory does not grow with max_iters
+    Q    = random.uniform(low=Qmin, high=Qmax, size=(n_population,), dtype=dtype)
+    rng  = random.uniform(low=0., high=1., size=(n_population,)) > r
+    rng2 = random.uniform(low=0., high=1., size=(n_population,)) < A
+    dim_rng = np.sum(rng)
+
     v += Q * (pos - best.T)
     S  = pos + v
 
     # Pulse rate
-    S[:, rng] = best.T + step * np.random.randn(dim, dim_rng)
+    S[:, rng] = best.T + step * random.randn(dim, dim_rng, dtype=dtype)
 
-    # Evaluate new solutions
-    fit_new = np.apply_along_axis(objfunc.evaluate, 0, S)
+    # Evaluate new solutions (only the ones which can be accepted)
+    fit_new = np.full(shape=(n_population,), fill_value=np.inf, dtype=float)
+    fit_new = evaluate.update(fit_new, S, rng2, axis=0)
 
     # Update if the solution improves
     upd = np.logical_and(rng2, fit_new <= fitness)
@@ -98,6 +122,9 @@ def bat(objfunc,
     best = np.array(pos[:, best], ndmin=2)
     # Update convergence curve
     walk[t] = best
+    if recorder is not None:
+      recorder(t, pos.T, fitness, best)
+    profile.iteration(t, fmin, pos.T, fitness)
     if verbose:
       sys.stdout.write('\r')
       sys.stdout.write("It %-5d: |%-25s| %.3f %.3f sec"
@@ -105,12 +132,23 @@ def bat(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fmin
   sol.population = pos.T
 
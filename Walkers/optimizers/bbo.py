@@ -5,8 +5,12 @@
 import numpy as np
 import time
 import sys
-from bisect import bisect_left
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def bbo(objfunc,
         lower_bound,
@@ -18,19 +22,31 @@ def bbo(objfunc,
         elite = 2,      #
         seed = 0,
         pos = None,     # initial population
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        asynchronous = False, # steady-state (asynchronous) update of the walkers
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(n_population, dim))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(n_population, dim),
+                         dtype=dtype)
   else:
+    pos = np.array(pos, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     n, d = pos.shape
@@ -55,55 +71,100 @@ def bbo(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "BBO",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
   # compute objective function for each particle
-  fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
+  fitness = evaluate(pos)
   idx     = np.argsort(fitness)
   pos     = pos[idx, :]
   fitness = fitness[idx]
 
+  if asynchronous:
+    # steady-state biogeography: the candidate of the slot i immigrates its
+    # features from the habitats ranked by fitness and, as soon as its
+    # fitness arrives, it replaces the worst habitat if it is better
+    def propose(i):
+      migrate = random.uniform(low=0., high=1., size=(dim,)) < lambda1t[i, 0]
+      rng = random.uniform(low=0., high=smu, size=(dim,))
+      rng = np.maximum(np.searchsorted(cmu, rng) - 1, 0)
+      candidate = np.where(migrate, pos[rng, np.arange(dim)], pos[i])
+      mut = pmutate > random.uniform(low=0., high=1., size=(dim,))
+      candidate[mut] = random.uniform(low=lower_bound, high=upper_bound, size=(dim,), dtype=dtype)[mut]
+      return candidate
+
+    def update(i, x, f):
+      if f < fitness[-1]:
+        # insertion keeps the population sorted by fitness
+        j = np.searchsorted(fitness, f)
+        pos[j + 1:]     = pos[j : -1]
+        fitness[j + 1:] = fitness[j : -1]
+        pos[j]     = x
+        fitness[j] = f
+      return propose(i)
+
+    stream = evaluate.steady_state([propose(i) for i in range(n_population)], update)
+
+  profile.switch('update')
   # main loop
   for t in range(max_iters):
-    elite_pos = pos[:elite, :]
-    elite_cos = fitness[:elite]
-
-    migrate = np.random.uniform(low=0., high=1., size=(n_population, dim))
-    migrate = migrate < lambda1t
-
-    new_pos = pos
-    # Performing Roulette Wheel
-    rng = np.random.uniform(low=0., high=smu, size=(dim*n_population,))
-    rng = np.asarray([bisect_left(cmu, r) - 1 for r in rng], dtype=int)
-    rng[rng < 0] = 0
-    rng = rng.reshape((n_population, dim))
-
-    new_pos[migrate] = pos[migrate][rng[migrate]]
-
-    migrate = ~migrate
-    new_pos[migrate] = pos[migrate]
-
-    # Performing Mutation
-    mut = np.random.uniform(low=0., high=1., size=(n_population, dim))
-    mut = pmutate > mut
-    new_pos[mut] = np.random.uniform(low=lower_bound,
-                                     high=upper_bound,
-                                     size=(n_population, dim))[mut]
-    # compute objective function for each individual
-    fitness = np.apply_along_axis(objfunc.evaluate, 1, new_pos)
-    pos = new_pos
-
-    idx = np.argsort(fitness)
-    pos[idx[-elite:], :]  = elite_pos
-    fitness[idx[-elite:]] = elite_cos
-
-    idx = np.argsort(fitness)
-    pos = pos[idx, :]
-    fitness = fitness[idx]
+    if asynchronous:
+      # a generation is made by n_population completed evaluations
+      stream.step(n_population)
+    else:
+      # copies, since pos is overwritten below
+      elite_pos = pos[:elite, :].copy()
+      elite_cos = fitness[:elite].copy()
+
+      migrate = random.uniform(low=0., high=1., size=(n_population, dim))
+      migrate = migrate < lambda1t
+
+      # Performing Roulette Wheel
+      rng = random.uniform(low=0., high=smu, size=(n_population, dim))
+      rng = np.maximum(np.searchsorted(cmu, rng) - 1, 0)
+
+      new_pos = pos.copy()
+      # feature d of the walker i immigrates from the habitat rng[i, d]
+      new_pos[migrate] = pos[rng, np.arange(dim)][migrate]
+
+      # Performing Mutation
+      mut = random.uniform(low=0., high=1., size=(n_population, dim))
+      mut = pmutate > mut
+      new_pos[mut] = random.uniform(low=lower_bound,
+                                    high=upper_bound,
+                                    size=(n_population, dim),
+                                    dtype=dtype)[mut]
+      # compute objective function for each individual
+      fitness = evaluate(new_pos)
+
+      # the elites replace the worst habitats: a single sort of the new
+      # population merged with the (already sorted) elites
+      with profile.phase('sort'):
+        idx = np.argsort(fitness)[:n_population - elite]
+        slots = np.searchsorted(fitness[idx], elite_cos) + np.arange(elite)
+      keep = np.ones(shape=(n_population,), dtype=bool)
+      keep[slots] = False
+
+      pos = np.empty_like(new_pos)
+      pos[slots] = elite_pos
+      pos[keep]  = new_pos[idx]
+      fitness, new_fit = np.empty_like(fitness), fitness
+      fitness[slots] = elite_cos
+      fitness[keep]  = new_fit[idx]
 
     # Update convergence curve
-    walk[t] = pos[idx[0]]
+    walk[t] = pos[0]
+    if recorder is not None:
+      recorder(t, pos, fitness, pos[0])
+    profile.iteration(t, fitness[0], pos, fitness)
     if verbose:
       sys.stdout.write('\r')
       sys.stdout.write("It %-5d: [%-25s] %.3f %.3f sec"
@@ -111,12 +172,25 @@ def bbo(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fitness[0],
                          time.time() - sol.start_time))
+
+    if stop(fitness[0]):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  if asynchronous:
+    stream.close()
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fitness[0]
   sol.population = pos
 
@@ -6,6 +6,11 @@ import numpy as np
 import time
 import sys
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def cfa(objfunc,
         lower_bound,
@@ -15,19 +20,30 @@ def cfa(objfunc,
         max_iters,    # Number of generations
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(n_population, dim))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(n_population, dim),
+                         dtype=dtype)
   else:
+    pos = np.array(pos, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     n, d = pos.shape
@@ -49,18 +65,27 @@ def cfa(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "CFA",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  fitness = evaluate(pos)
   best = np.argmin(fitness)
   fmin = fitness[best]
-  best = pos[best, :]
+  best = pos[best, :].copy()
 
-  Rt = np.random.uniform(low=-1.,  high=2., size=(max_iters,))
-  Vt = np.random.uniform(low=-1.5, high=1.5, size=(max_iters,))
-  Wt = np.random.uniform(low=-1., high=1., size=(max_iters,))
+  Rt = random.uniform(low=-1.,  high=2., size=(max_iters,), dtype=dtype)
+  Vt = random.uniform(low=-1.5, high=1.5, size=(max_iters,), dtype=dtype)
+  Wt = random.uniform(low=-1., high=1., size=(max_iters,), dtype=dtype)
 
+  profile.switch('update')
   # main loop
   for (t, R), V, W in zip(enumerate(Rt), Vt, Wt):
     avg_best = np.mean(best)
@@ -68,17 +93,22 @@ def cfa(objfunc,
     pos[:m, :]      = R * pos[:m, :] + (best - pos[:m, :]) # * 1.
     pos[g21:g22, :] = V * (best - pos[g21:g22, :]) + best # * 1.
     pos[g31:g32, :] = W * (best - avg_best) + best # * 1.
-    pos[g41:, :]    = np.random.uniform(low=lower_bound,
-                                        high=upper_bound,
-                                        size=(n_population - g41, dim))
+    pos[g41:, :]    = random.uniform(low=lower_bound,
+                                     high=upper_bound,
+                                     size=(n_population - g41, dim),
+                                     dtype=dtype)
 
-    fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
+    fitness = evaluate(pos)
     best = np.argmin(fitness)
     fmin = fitness[best]
-    best = pos[best, :]
+    # copy, since pos is updated in place in the next iteration
+    best = pos[best, :].copy()
 
     # Update convergence curve
     walk[t] = best
+    if recorder is not None:
+      recorder(t, pos, fitness, best)
+    profile.iteration(t, fmin, pos, fitness)
     if verbose:
       sys.stdout.write('\r')
       sys.stdout.write("It %-5d: [%-25s] %.3f %.3f sec"
@@ -86,12 +116,23 @@ def cfa(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fmin
   sol.population = pos
 
@@ -4,14 +4,15 @@
 #           https://www.cs.tufts.edu/comp/150GA/homeworks/hw3/_reading7%20Cuckoo%20search.pdf
 
 import numpy as np
-from scipy.special import gamma
 import time
 import sys
 from ..solution import Solution
-
-levy_flight = lambda beta : ( gamma(1. + beta)      * np.sin(np.pi * beta * .5) / \
-                             (gamma((1. + beta)*.5) * beta * 2.**( (beta - 1.) * .5)) \
-                             )**(1. / beta)
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
+from ..walks import levy_flight
 
 def cs( objfunc,
         lower_bound,
@@ -23,24 +24,35 @@ def cs( objfunc,
         beta = 1.5,
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        asynchronous = False, # steady-state (asynchronous) update of the walkers
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
   assert(beta < 2. and beta > 1.)
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
-  sigma = levy_flight(beta)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
+  sigma = dtype.type(levy_flight(beta))
   beta_inv = 1. / beta
 
   if pos == None:
     # RInitialize pos randomely
-    pos = np.random.uniform(low=lower_bound,
+    pos = random.uniform(low=lower_bound,
                              high=upper_bound,
-                             size=(dim, n_population))
+                             size=(dim, n_population),
+                             dtype=dtype)
   else:
-    pos = pos.T
+    pos = np.array(pos.T, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     d, n = pos.shape
@@ -55,54 +67,101 @@ def cs( objfunc,
                  max_iters    = max_iters,
                  optimizer    = "CS",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  fitness = np.apply_along_axis(objfunc.evaluate, 0, pos)
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  fitness = evaluate(pos, axis=0)
   best = np.argmin(fitness)
   fmin = fitness[best]
   best = np.array(pos[:, best], ndmin=2).T
 
+  if asynchronous:
+    # each nest alternates a Levy flight around the best solution and a
+    # discovery move, and it is re-submitted as soon as its fitness arrives
+    discovery = np.zeros(shape=(n_population,), dtype=bool)
+
+    def propose(i):
+      if discovery[i]:
+        rng = random.uniform(low=0., high=1., size=(dim,)) > pa
+        j, k = random.randint(low=0, high=n_population, size=(2,))
+        s = pos[:, i] + rng * random.uniform(low=0., high=1., size=(dim,), dtype=dtype) * (pos[:, j] - pos[:, k])
+      else:
+        u = random.randn(dim, dtype=dtype) * sigma
+        v = random.randn(dim, dtype=dtype)
+        step = u / abs(v)**(beta_inv)
+        s = pos[:, i] + 1e-2 * (step * (pos[:, i] - best[:, 0])) * random.randn(dim, dtype=dtype)
+      discovery[i] = ~discovery[i]
+      return np.clip(s, lower_bound, upper_bound)
+
+    def update(i, x, f):
+      nonlocal fmin, best
+      if f <= fitness[i]:
+        fitness[i] = f
+        pos[:, i]  = x
+      if f < fmin:
+        fmin = f
+        best = np.array(x, ndmin=2).T
+      return propose(i)
+
+    stream = evaluate.steady_state([propose(i) for i in range(n_population)], update)
+
+  profile.switch('update')
   # main loop
   for t in range(max_iters):
-    # Generate new solutions (but keep the current best)
-    # get_cukoos function
-    u = np.random.randn(dim, n_population) * sigma
-    v = np.random.randn(dim, n_population)
-    step = u / abs(v)**(beta_inv)
-    stepsize = 1e-2 * (step * (pos - best))
-    s = pos + stepsize * np.random.randn(dim, n_population)
-    new_pos = np.clip(s, lower_bound, upper_bound)
-
-    # Evaluate new solutions and find best
-    # get_best_pos function
-    fit_new  = np.apply_along_axis(objfunc.evaluate, 0, new_pos)
-    idx = fit_new <= fitness
-    fitness[idx] = fit_new[idx]
-    pos[:, idx] = new_pos[:, idx]
-
-    rng = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    rng = rng > pa
-    new_pos[rng] += np.random.uniform(low=0., high=1., size=(dim, n_population))[rng] * \
-                     (                                                                   \
-                      new_pos[:, np.random.permutation(n_population)] -                 \
-                      new_pos[:, np.random.permutation(n_population)]                   \
-                     )[rng]
-
-    # Evaluate new solutions and find best
-    # get_best_pos function
-    fit_new  = np.apply_along_axis(objfunc.evaluate, 0, new_pos)
-    idx = fit_new <= fitness
-    fitness[idx] = fit_new[idx]
-    pos[:, idx] = new_pos[:, idx]
-
-    tmp_best = np.argmin(fit_new)
-    if fit_new[tmp_best] < fmin: # to check
-      fmin = fit_new[tmp_best]
-      best = np.array(new_pos[:, tmp_best], ndmin=2).T
+    if asynchronous:
+      # a generation is made by n_population completed evaluations
+      stream.step(n_population)
+    else:
+      # Generate new solutions (but keep the current best)
+      # get_cukoos function
+      u = random.randn(dim, n_population, dtype=dtype) * sigma
+      v = random.randn(dim, n_population, dtype=dtype)
+      step = u / abs(v)**(beta_inv)
+      stepsize = 1e-2 * (step * (pos - best))
+      s = pos + stepsize * random.randn(dim, n_population, dtype=dtype)
+      new_pos = np.clip(s, lower_bound, upper_bound)
+
+      # Evaluate new solutions and find best
+      # get_best_pos function
+      fit_new  = evaluate(new_pos, axis=0)
+      idx = fit_new <= fitness
+      fitness[idx] = fit_new[idx]
+      pos[:, idx] = new_pos[:, idx]
+
+      rng = random.uniform(low=0., high=1., size=(dim, n_population))
+      rng = rng > pa
+      new_pos[rng] += random.uniform(low=0., high=1., size=(dim, n_population), dtype=dtype)[rng] * \
+                       (                                                                   \
+                        new_pos[:, random.permutation(n_population)] -                 \
+                        new_pos[:, random.permutation(n_population)]                   \
+                       )[rng]
+
+      # Evaluate new solutions and find best (only the nests
+      # moved by the discovery step)
+      # get_best_pos function
+      fit_new  = evaluate.update(fit_new, new_pos, rng.any(axis=0), axis=0)
+      idx = fit_new <= fitness
+      fitness[idx] = fit_new[idx]
+      pos[:, idx] = new_pos[:, idx]
+
+      tmp_best = np.argmin(fit_new)
+      if fit_new[tmp_best] < fmin: # to check
+        fmin = fit_new[tmp_best]
+        best = np.array(new_pos[:, tmp_best], ndmin=2).T
 
     # Update convergence curve
     walk[t] = best.T
+    if recorder is not None:
+      recorder(t, pos.T, fitness, best)
+    profile.iteration(t, fmin, pos.T, fitness)
     if verbose:
       sys.stdout.write('\r')
       sys.stdout.write("It %-5d: [%-25s] %.3f %.3f sec"
@@ -110,12 +169,25 @@ def cs( objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  if asynchronous:
+    stream.close()
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fmin
   sol.population = pos.T
 
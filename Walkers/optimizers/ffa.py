@@ -9,9 +9,30 @@ import time
 import sys
 import warnings
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
+from ..neighbors import find_neighbors
 
 new_alpha = lambda alpha, max_iters : (1e-4/.9)**(1. / max_iters) * alpha
 
+def attract(x, y, b, r):
+  # closed form of the sequence of moves x = x * (1 - b[k]) + y[k] * b[k] + r[k]
+  # w[k] is the product of the (1 - b) factors of the following moves
+  s = np.cumprod((1. - b)[::-1])[::-1]
+  w = np.append(s[1:], np.ones_like(s[:1]))
+  return x * s[0] + w @ (b[:, np.newaxis] * y + r)
+
+def attract_block(pos, lo, mask, beta, rng):
+  # synchronous moves of the rows lo : lo + len(mask), all computed from the
+  # same positions pos: attract applied to every row as matrix products
+  c = np.where(mask, 1. - beta, 1.)
+  s = np.cumprod(c[:, ::-1], axis=1)[:, ::-1]
+  w = np.where(mask, np.concatenate((s[:, 1:], np.ones(shape=(len(c), 1), dtype=c.dtype)), axis=1), 0.)
+  return pos[lo : lo + len(c)] * s[:, :1] + (w * beta) @ pos + np.einsum('ij,ijk->ik', w, rng)
+
 def ffa( objfunc,
         lower_bound,
         upper_bound,
@@ -24,24 +45,42 @@ def ffa( objfunc,
         gamma = 1.,   # Absorption coefficient
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        synchronous = False, # move all the fireflies from the positions at the start of the iteration
+        max_memory = 2**27,  # bytes of the random moves drawn at once
+        neighbors = None, # interact only with the k nearest fireflies
+        cutoff = None,    # interact only with the fireflies within the cutoff radius
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
+    pos = random.uniform(low=lower_bound,
                            high=upper_bound,
-                           size=(n_population, dim))
+                           size=(n_population, dim),
+                           dtype=dtype)
   else:
+    pos = np.array(pos, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     n, d = pos.shape
     if d != dim or n != n_population:
       raise Warning('Wrong dimension shape of old generation! Number of population or dims incompatible')
 
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
   domain = abs(upper_bound - lower_bound)
+  # the (n_population, n_population, dim) random moves are drawn in blocks
+  # of rows, following the same random stream
+  block = int(max(1, max_memory // (n_population * dim * dtype.itemsize)))
 
   if betamin > beta0:
     warnings.warn('Beta-min greater than Beta-0! Automatically swapped')
@@ -55,31 +94,76 @@ def ffa( objfunc,
                  max_iters    = max_iters,
                  optimizer    = "FFA",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  profile.switch('update')
   # main loop
   for t in range(max_iters):
     # This line of reducing alpha is optional
     alpha = new_alpha(alpha, max_iters)
     # Evaluate new solutions (for all n fireflies)
-    fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
+    fitness = evaluate(pos)
 
     best = np.argmin(fitness)
     fmin = fitness[best]
-    best = pos[best]
-
-    r = squareform(pdist(pos, "euclidean"))
-    lightn, light0 = np.meshgrid(fitness, fitness)
-    ii, jj = (light0 > lightn).nonzero()
-    # The attractiveness parameter beta=exp(-gamma*r)
-    beta = (beta0 - betamin) * np.exp(-gamma * r * r) + betamin
-
-    rng = np.random.uniform(low=-.5 * domain * alpha,
-                            high=.5 * domain * alpha,
-                            size=(n_population, n_population, dim))
-    for i, j, b, r in zip(ii, jj, beta[ii, jj], rng[ii, jj]):
-      pos[i, :] = pos[i, :] * (1. - b) + pos[j, :] * b + r
+    # copy, since the fireflies are moved in place below
+    best = pos[best].copy()
+    if recorder is not None:
+      recorder(t, pos, fitness, best)
+    profile.iteration(t, fmin, pos, fitness)
+
+    origin = pos.copy() if synchronous else pos
+
+    if neighbors is not None or cutoff is not None:
+      # truncated interactions: the neighbours are found with a KD-tree and
+      # the random moves are drawn only for the interacting pairs
+      with profile.phase('distance'):
+        indptr, idx, r = find_neighbors(pos, k=neighbors, cutoff=cutoff)
+      r = r.astype(dtype, copy=False)
+      for i in range(n_population):
+        jj, rr = idx[indptr[i] : indptr[i + 1]], r[indptr[i] : indptr[i + 1]]
+        brighter = fitness[jj] < fitness[i]
+        jj, rr = jj[brighter], rr[brighter]
+        if jj.size:
+          beta = (beta0 - betamin) * np.exp(-gamma * rr * rr) + betamin
+          rng = random.uniform(low=-.5 * domain * alpha,
+                               high=.5 * domain * alpha,
+                               size=(jj.size, dim),
+                               dtype=dtype)
+          pos[i] = attract(pos[i], origin[jj], beta, rng)
+
+    else:
+      with profile.phase('distance'):
+        r = squareform(pdist(pos, "euclidean")).astype(dtype, copy=False)
+      # firefly i moves towards every brighter firefly j
+      brighter = fitness[:, np.newaxis] > fitness
+      # The attractiveness parameter beta=exp(-gamma*r)
+      beta = (beta0 - betamin) * np.exp(-gamma * r * r) + betamin
+
+      for lo in range(0, n_population, block):
+        hi = min(lo + block, n_population)
+        rng = random.uniform(low=-.5 * domain * alpha,
+                             high=.5 * domain * alpha,
+                             size=(hi - lo, n_population, dim),
+                             dtype=dtype)
+        if synchronous:
+          pos[lo : hi] = attract_block(origin, lo, brighter[lo : hi], beta[lo : hi], rng)
+        else:
+          # the rows are moved in order and firefly i sees the already moved
+          # positions of the fireflies j < i
+          for i in range(lo, hi):
+            jj, = brighter[i].nonzero()
+            if jj.size:
+              pos[i] = attract(pos[i], pos[jj], beta[i, jj], rng[i - lo, jj])
 
     # Update convergence curve
     walk[t] = best
@@ -90,12 +174,23 @@ def ffa( objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fmin
   sol.population = pos
 
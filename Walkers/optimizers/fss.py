@@ -7,6 +7,11 @@ import numpy as np
 import time
 import sys
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def fss(objfunc,
         lower_bound,
@@ -22,20 +27,30 @@ def fss(objfunc,
         w_scale=2.,     #
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(dim, n_population))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(dim, n_population),
+                         dtype=dtype)
   else:
-    pos = pos.T
+    pos = np.array(pos.T, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     d, n = pos.shape
@@ -57,19 +72,30 @@ def fss(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "FSS",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  fitness = np.apply_along_axis(objfunc.evaluate, 0, pos)
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
 
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  fitness = evaluate(pos, axis=0)
+  # positions at which the fitness has been evaluated
+  evaluated = pos.copy()
+
+  profile.switch('update')
   # main loop
   for (t, step), volitive in zip(enumerate(steps), volitives):
 
     # individual_movement
-    new_pos = pos + step * np.random.uniform(low=-1., high=1., size=(dim, n_population))
+    new_pos = pos + step * random.uniform(low=-1., high=1., size=(dim, n_population), dtype=dtype)
     new_pos = np.clip(new_pos, lower_bound, upper_bound)
 
-    new_fit = np.apply_along_axis(objfunc.evaluate, 0, new_pos)
+    new_fit = evaluate(new_pos, axis=0)
 
     idx, = np.nonzero(new_fit < fitness)
 
@@ -77,6 +103,8 @@ def fss(objfunc,
       delta_fit = abs(new_fit[idx] - fitness[idx])
       delta_pos = new_pos[:, idx] - pos[:, idx]
       pos[:, idx] = new_pos[:, idx]
+      fitness[idx] = new_fit[idx]
+      evaluated[:, idx] = new_pos[:, idx]
 
     # feeding
       M = max(delta_fit)
@@ -93,24 +121,33 @@ def fss(objfunc,
       pos += cost_eval_enhanced.reshape((-1, 1))
       pos = np.clip(pos, lower_bound, upper_bound)
 
-    # collective_volitive_movement
-      tot_w = sum(weight)
-      barycenter = np.sum(pos * weight, axis=1).reshape((-1, 1))
-      barycenter /= tot_w
+    # collective_volitive_movement (also when no fish has improved)
+    tot_w = sum(weight)
+    barycenter = np.sum(pos * weight, axis=1).reshape((-1, 1))
+    barycenter /= tot_w
 
-    if tot_w > curr_w: pos -= (pos - barycenter) * volitive * np.random.uniform(low=0., high=1., size=(dim, n_population))
-    else:              pos += (pos - barycenter) * volitive * np.random.uniform(low=0., high=1., size=(dim, n_population))
+    if tot_w > curr_w: pos -= (pos - barycenter) * volitive * random.uniform(low=0., high=1., size=(dim, n_population), dtype=dtype)
+    else:              pos += (pos - barycenter) * volitive * random.uniform(low=0., high=1., size=(dim, n_population), dtype=dtype)
 
     curr_w = tot_w
 
     pos = np.clip(pos, lower_bound, upper_bound)
-    fitness = np.apply_along_axis(objfunc.evaluate, 0, pos)
+    # re-evaluate only the fishes moved by the collective movements. NOTE: the
+    # volitive movement shifts every fish not pinned at the bounds, so fss gets
+    # (almost) no saving: every iteration costs about 2 n_population
+    # evaluations (individual movement + collective movements), as in the
+    # original algorithm
+    fitness = evaluate.update(fitness, pos, np.any(pos != evaluated, axis=0), axis=0)
+    evaluated = pos.copy()
     best = np.argmin(fitness)
     fmin = fitness[best]
     best = pos[:, best]
 
     # Update convergence curve
     walk[t] = best
+    if recorder is not None:
+      recorder(t, pos.T, fitness, best)
+    profile.iteration(t, fmin, pos.T, fitness)
     if verbose:
       sys.stdout.write('\r')
       sys.stdout.write("It %-5d: [%-25s] %.3f %.3f sec"
@@ -118,12 +155,23 @@ def fss(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fmin
   sol.population = pos.T
 
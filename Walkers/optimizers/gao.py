@@ -5,6 +5,11 @@ import time
 import sys
 import warnings
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def gao(objfunc,
         lower_bound,
@@ -16,19 +21,31 @@ def gao(objfunc,
         mutation_rate = .3,
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        asynchronous = False, # steady-state (asynchronous) update of the walkers
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(n_population, dim))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(n_population, dim),
+                         dtype=dtype)
   else:
+    pos = np.array(pos, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     n, d = pos.shape
@@ -41,15 +58,7 @@ def gao(objfunc,
     elite = 1
 
 
-  new_gen  = np.zeros(shape=(n_population, dim), dtype=float)
-  rngcross = np.random.choice(a = range(elite),
-                              size=(max_iters, n_population - elite, 2))
-  rngmut   = np.random.uniform(low=0.,
-                               high=1.,
-                               size=(max_iters, n_population, dim))
-  rngmut   = rngmut < mutation_rate
-  rngswap  = np.random.choice(a=[True, False],
-                               size=(max_iters, n_population - elite, dim))
+  new_gen  = np.zeros(shape=(n_population, dim), dtype=dtype)
 
   if verbose:
     print ("GAO is optimizing \"" + objfunc.__name__ + "\"")
@@ -59,32 +68,90 @@ def gao(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "GAO",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  # main loop
-  for (t, cross), mut, swap in zip(enumerate(rngcross), rngmut, rngswap):
-
-    fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
-    rank    = np.argsort(fitness)
-
-    pos    = pos[rank]
-    best   = pos[0]
-    fmin   = fitness[rank[0]]
-
-    # cross over
-    new_gen[:elite] = pos[:elite]
-    new_gen[elite:][swap] = pos[cross[:,0]][swap]
-    swap = ~swap
-    new_gen[elite:][swap] = pos[cross[:,1]][swap]
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
 
-    # mutation
-    new_gen[mut]   += np.random.uniform(low=lower_bound,
-                                        high=upper_bound,
-                                        size=(n_population, dim)
-                                        )[mut]
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
 
-    pos    = np.clip(new_gen, lower_bound, upper_bound)
+  if asynchronous:
+    # steady-state genetic algorithm: every offspring is bred from the
+    # current elite and, as soon as its fitness arrives, it replaces the
+    # worst individual of the population if it is better
+    fitness = evaluate(pos)
+    rank    = np.argsort(fitness)
+    pos     = pos[rank]
+    fitness = fitness[rank]
+
+    def propose(i):
+      cross = random.choice(a = range(elite), size=(2,))
+      swap  = random.choice(a=[True, False], size=(dim,))
+      child = np.where(swap, pos[cross[0]], pos[cross[1]])
+      mut   = random.uniform(low=0., high=1., size=(dim,)) < mutation_rate
+      child[mut] += random.uniform(low=lower_bound, high=upper_bound, size=(dim,), dtype=dtype)[mut]
+      return np.clip(child, lower_bound, upper_bound)
+
+    def update(i, x, f):
+      if f < fitness[-1]:
+        # insertion keeps the population sorted by fitness
+        j = np.searchsorted(fitness, f)
+        pos[j + 1:]     = pos[j : -1]
+        fitness[j + 1:] = fitness[j : -1]
+        pos[j]     = x
+        fitness[j] = f
+      return propose(i)
+
+    stream = evaluate.steady_state([propose(i) for i in range(n_population)], update)
+
+  profile.switch('update')
+  # main loop
+  for t in range(max_iters):
+
+    if asynchronous:
+      # a generation is made by n_population completed evaluations
+      stream.step(n_population)
+      best = pos[0]
+      fmin = fitness[0]
+      if recorder is not None:
+        recorder(t, pos, fitness, best)
+      profile.iteration(t, fmin, pos, fitness)
+    else:
+      # the random numbers of each generation are drawn from the (buffered)
+      # stream, so the memory does not grow with max_iters
+      cross = random.randint(low=0, high=elite, size=(n_population - elite, 2))
+      swap  = random.random(size=(n_population - elite, dim)) < .5
+      mut   = random.uniform(low=0., high=1., size=(n_population, dim)) < mutation_rate
+
+      fitness = evaluate(pos)
+      with profile.phase('sort'):
+        rank  = np.argsort(fitness)
+
+      pos    = pos[rank]
+      best   = pos[0]
+      fmin   = fitness[rank[0]]
+      if recorder is not None:
+        recorder(t, pos, fitness[rank], best)
+      profile.iteration(t, fmin, pos, fitness[rank])
+
+      # cross over
+      new_gen[:elite] = pos[:elite]
+      new_gen[elite:][swap] = pos[cross[:,0]][swap]
+      swap = ~swap
+      new_gen[elite:][swap] = pos[cross[:,1]][swap]
+
+      # mutation
+      new_gen[mut]   += random.uniform(low=lower_bound,
+                                       high=upper_bound,
+                                       size=(n_population, dim),
+                                       dtype=dtype
+                                       )[mut]
+
+      pos    = np.clip(new_gen, lower_bound, upper_bound)
 
     walk[t] = best
     if verbose:
@@ -94,12 +161,25 @@ def gao(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  if asynchronous:
+    stream.close()
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = best
   sol.population = pos
 
@@ -8,7 +8,46 @@ import numpy as np
 import time
 import sys
 from ..solution import Solution
-from scipy.spatial.distance import pdist, squareform
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
+from scipy.spatial.distance import cdist
+from ..neighbors import find_neighbors
+
+def gfield(pos, M, kbest, rpower, max_memory, random, neighbors = None, cutoff = None):
+  # force exerted on every agent by the kbest heaviest agents, with a random
+  # weight for each (attractor, agent, dimension) triplet; the attractors are
+  # processed in blocks of at most max_memory bytes of (k, n, dim) tensors and
+  # the random weights follow the order of the attractors
+  n, dim = pos.shape
+  epsil = np.finfo(pos.dtype).eps
+  heavy = np.argsort(M)[::-1][:kbest]
+  block = int(max(1, max_memory // (n * dim * pos.itemsize)))
+  force = np.zeros(shape=(n, dim), dtype=pos.dtype)
+
+  if neighbors is not None or cutoff is not None:
+    if not len(heavy):
+      # kbest can round to zero in the last iterations of small populations
+      return force
+    # truncated interactions: every agent feels only the attractors among its
+    # k nearest ones and/or within the cutoff radius (KD-tree query)
+    indptr, z, R = find_neighbors(pos, k=neighbors, cutoff=cutoff, sources=heavy)
+    i = np.repeat(np.arange(n), np.diff(indptr))
+    w = random.uniform(low=0., high=1., size=(len(i), dim), dtype=pos.dtype)
+    w *= (pos[z] - pos[i]) * (M[z] / (R**rpower + epsil)).astype(pos.dtype, copy=False)[:, np.newaxis]
+    np.add.at(force, i, w)
+    return force
+
+  for lo in range(0, len(heavy), block):
+    z = heavy[lo : lo + block]
+    R = cdist(pos[z], pos, metric='euclidean')
+    w = random.uniform(low=0., high=1., size=(len(z), n, dim), dtype=pos.dtype)
+    w *= pos[z, np.newaxis, :] - pos
+    force += np.einsum('kn,knd->nd', (M[z, np.newaxis] / (R**rpower + epsil)).astype(pos.dtype, copy=False), w)
+
+  return force
 
 def gsa(objfunc,
         lower_bound,
@@ -22,20 +61,34 @@ def gsa(objfunc,
         G0 = 100,     #
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        max_memory = 2**27, # bytes of the force tensors computed at once
+        neighbors = None, # interact only with the k nearest attractors
+        cutoff = None,    # interact only with the attractors within the cutoff radius
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
-  vel  = np.zeros(shape=(n_population, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
+  vel  = np.zeros(shape=(n_population, dim), dtype=dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(n_population, dim))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(n_population, dim),
+                         dtype=dtype)
   else:
+    pos = np.array(pos, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     n, d = pos.shape
@@ -43,7 +96,7 @@ def gsa(objfunc,
       raise Warning('Wrong dimension shape of old generation! Number of population or dims incompatible')
 
   # Calculating Gravitational Constant
-  Gt = G0 * np.exp(-alpha * np.arange(0, max_iters) / max_iters)
+  Gt = (G0 * np.exp(-alpha * np.arange(0, max_iters) / max_iters)).astype(dtype)
 
   if elitist == 1.: kbest = np.round(n_population * (2. + (1. - np.linspace(0, 1., max_iters)) * (100. - 2.)) / 100.).astype(int)
   else:             kbest = np.repeat(n_population, repeats=max_iters)
@@ -56,14 +109,24 @@ def gsa(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "GSA",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  fitness = evaluate(pos)
+  # positions at which the fitness has been evaluated
+  evaluated = pos.copy()
   fmax = max(fitness)
   fmin = min(fitness)
-  epsil = np.finfo(float).eps
 
+  profile.switch('update')
   for (t, G), k in zip(enumerate(Gt), kbest):
     pos = np.clip(pos, lower_bound, upper_bound)
 
@@ -73,27 +136,25 @@ def gsa(objfunc,
     M /= sum(M)
 
     ## Calculating Gfield
-    ds = np.argsort(M)[::-1]
-    distance = squareform(pdist(pos[ds, :], metric="euclidean"))
-    force = np.zeros(shape=(n_population, dim), dtype=float)
-    for z in ds[:k]:
-      R = np.array(distance[:, z], ndmin=2).T
-      force += np.random.uniform(low=0., high=1., size=(n_population, dim)) * \
-               M[z] * (pos[z, :] - pos) / (R**rpower + epsil)
-
-    acc = force * G
+    with profile.phase('distance'):
+      acc = gfield(pos, M, k, rpower, max_memory, random, neighbors, cutoff) * G
 
     # Calculating Position
-    vel  = np.random.uniform(low=0., high=1., size=(n_population, dim)) * vel + acc
+    vel  = random.uniform(low=0., high=1., size=(n_population, dim), dtype=dtype) * vel + acc
     pos += vel
 
-    fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
+    # re-evaluate only the agents which moved
+    fitness = evaluate.update(fitness, pos, np.any(pos != evaluated, axis=1))
+    evaluated = pos.copy()
     fmax = max(fitness)
     best = np.argmin(fitness)
     fmin = fitness[best]
     best = pos[best]
     # Update convergence curve
     walk[t] = best
+    if recorder is not None:
+      recorder(t, pos, fitness, best)
+    profile.iteration(t, fmin, pos, fitness)
     if verbose:
       sys.stdout.write('\r')
       sys.stdout.write("It %-5d: [%-25s] %.3f %.3f sec"
@@ -101,12 +162,23 @@ def gsa(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fmin
   sol.population = pos
 
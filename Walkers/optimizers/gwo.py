@@ -7,6 +7,11 @@ import numpy as np
 import time
 import sys
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def gwo(objfunc,
         lower_bound,
@@ -16,25 +21,36 @@ def gwo(objfunc,
         max_iters,    # Number of generations
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
   alpha_score, beta_score, delta_score = np.inf, np.inf, np.inf
-  alpha_pos, beta_pos, delta_pos = np.zeros(shape=(dim, n_population), dtype=float), \
-                                   np.zeros(shape=(dim, n_population), dtype=float), \
-                                   np.zeros(shape=(dim, n_population), dtype=float)
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  alpha_pos, beta_pos, delta_pos = np.zeros(shape=(dim, n_population), dtype=dtype), \
+                                   np.zeros(shape=(dim, n_population), dtype=dtype), \
+                                   np.zeros(shape=(dim, n_population), dtype=dtype)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
     # Initialize the population/solutions
-    pos = np.random.uniform(low=lower_bound,
+    pos = random.uniform(low=lower_bound,
                                   high=upper_bound,
-                                  size=(dim, n_population))
+                                  size=(dim, n_population),
+                                  dtype=dtype)
   else:
-    pos = pos.T
+    # copy, since the population is updated in place
+    pos = np.array(pos.T, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     d, n = pos.shape
@@ -49,16 +65,44 @@ def gwo(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "GWO",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  at = np.linspace(2, 0, num=max_iters)
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  # workspace of the in-place updates, allocated once per run
+  r1  = np.empty(shape=(dim, n_population), dtype=dtype)
+  r2  = np.empty(shape=(dim, n_population), dtype=dtype)
+  D   = np.empty(shape=(dim, n_population), dtype=dtype)
+  acc = np.empty(shape=(dim, n_population), dtype=dtype)
+
+  def hunt(leader, a, out):
+    # out = leader - abs(C * leader - pos) * A
+    random.uniform(low=0., high=1., out=r1)
+    random.uniform(low=0., high=1., out=r2)
+    np.multiply(r1, 2. * a, out=r1)
+    np.subtract(r1, a, out=r1)
+    np.multiply(r2, 2., out=r2)
+    np.multiply(r2, leader, out=r2)
+    np.subtract(r2, pos, out=r2)
+    np.abs(r2, out=r2)
+    np.multiply(r2, r1, out=r2)
+    return np.subtract(leader, r2, out=out)
+
+  at = np.linspace(2, 0, num=max_iters, dtype=dtype)
+  profile.switch('update')
   # main loop
   for t, a in enumerate(at):
     # Return back the search agents that go beyond the boundaries of the search space
-    pos = np.clip(pos, lower_bound, upper_bound)
+    np.clip(pos, lower_bound, upper_bound, out=pos)
     # compute objective function for each search agent
-    fitness = np.apply_along_axis(objfunc.evaluate, 0, pos)
+    fitness = evaluate(pos, axis=0)
 
     # update alpha, beta and delta
     minpos   = np.argmin(fitness)
@@ -75,25 +119,15 @@ def gwo(objfunc,
         delta_score = fitness[minpos]
         delta_pos   = np.array(pos[:, minpos], ndmin=2).T
 
-    r1 = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    r2 = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    A  = 2. * a * r1 - a
-    C  = 2. * r2
-    D_alpha = alpha_pos - abs(C * alpha_pos - pos) * A
+    if recorder is not None:
+      recorder(t, pos.T, fitness, alpha_pos)
+    profile.iteration(t, alpha_score, pos.T, fitness)
 
-    r1 = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    r2 = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    A  = 2. * a * r1 - a
-    C  = 2. * r2
-    D_beta = beta_pos - abs(C * beta_pos - pos) * A
-
-    r1 = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    r2 = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    A  = 2. * a * r1 - a
-    C  = 2. * r2
-    D_delta = delta_pos - abs(C * delta_pos - pos) * A
-
-    pos = (D_alpha + D_beta + D_delta) / 3
+    # pos = (D_alpha + D_beta + D_delta) / 3
+    hunt(alpha_pos, a, out=acc)
+    acc += hunt(beta_pos, a, out=D)
+    acc += hunt(delta_pos, a, out=D)
+    np.divide(acc, 3, out=pos)
 
     walk[t] = alpha_pos.T
     if verbose:
@@ -103,12 +137,23 @@ def gwo(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          alpha_score,
                          time.time() - sol.start_time))
+
+    if stop(alpha_score):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = alpha_score
   sol.population = pos.T
 
@@ -7,6 +7,11 @@ import time
 import sys
 import warnings
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def pso(objfunc,
         lower_bound,
@@ -21,32 +26,48 @@ def pso(objfunc,
         c2   = 2.,    #
         seed = 0,
         pos  = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        asynchronous = False, # steady-state (asynchronous) update of the walkers
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(dim, n_population))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(dim, n_population),
+                         dtype=dtype)
   else:
-    pos = pos.T
+    # copy, since the population is updated in place
+    pos = np.array(pos.T, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     d, n = pos.shape
     if d != dim or n != n_population:
       raise Warning('Wrong dimension shape of old generation! Number of population or dims incompatible')
 
-  vel = np.zeros(shape=(dim, n_population))
-  wt = np.linspace(wmax, wmin, num=max_iters)
+  vel = np.zeros(shape=(dim, n_population), dtype=dtype)
+  wt = np.linspace(wmax, wmin, num=max_iters, dtype=dtype)
   p_score = np.repeat(np.inf, repeats=n_population)
-  p_best = np.zeros(shape=(dim, n_population), dtype=float)
+  p_best = np.zeros(shape=(dim, n_population), dtype=dtype)
   g_score = np.inf
-  g_best  = np.zeros(shape=(1, dim))
+  g_best  = np.zeros(shape=(1, dim), dtype=dtype)
+  # workspace of the in-place updates, allocated once per run
+  r1  = np.empty(shape=(dim, n_population), dtype=dtype)
+  r2  = np.empty(shape=(dim, n_population), dtype=dtype)
+  tmp = np.empty(shape=(dim, n_population), dtype=dtype)
 
   if wmin > wmax:
     warnings.warn('wmin greater than wmax! Automatically swapped')
@@ -60,31 +81,81 @@ def pso(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "PSO",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  # main loop
-  for t, w in enumerate(wt):
-    # Check if moths go out of the search spaceand bring it back
-    pos = np.clip(pos, lower_bound, upper_bound)
-    # evaluate moths
-    fitness = np.apply_along_axis(objfunc.evaluate, 0, pos)
-    idx = fitness < p_score
-    p_best[:, idx]  = pos[:, idx]
-    p_score[idx] = fitness[idx]
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
 
-    idx = np.argmin(fitness)
-    if fitness[idx] < g_score:
-      g_score = fitness[idx]
-      g_best  = np.array(pos[:, idx], ndmin=2).T
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
 
-    # update the W of PSO
-    r1 = np.random.uniform(low=0., high=1., size=(dim, n_population))
-    r2 = np.random.uniform(low=0., high=1., size=(dim, n_population))
+  if asynchronous:
+    # each particle is moved and re-submitted as soon as its fitness
+    # arrives, using the global best known at that time
+    def update(i, x, f):
+      nonlocal g_score, g_best
+      if f < p_score[i]:
+        p_best[:, i] = x
+        p_score[i]   = f
+      if f < g_score:
+        g_score = f
+        g_best  = np.array(x, ndmin=2).T
 
-    vel = w * vel + c1 * r1 * (p_best - pos) + c2 * r2 * (g_best - pos)
-    vel = np.clip(vel, -Vmax, Vmax)
-    pos += vel
+      r1 = random.uniform(low=0., high=1., size=(dim,), dtype=dtype)
+      r2 = random.uniform(low=0., high=1., size=(dim,), dtype=dtype)
+
+      vel[:, i] = np.clip(w * vel[:, i] + c1 * r1 * (p_best[:, i] - x) + c2 * r2 * (g_best[:, 0] - x), -Vmax, Vmax)
+      pos[:, i] = np.clip(x + vel[:, i], lower_bound, upper_bound)
+      return pos[:, i]
+
+    pos = np.clip(pos, lower_bound, upper_bound)
+    stream = evaluate.steady_state(pos.T, update)
+
+  profile.switch('update')
+  # main loop
+  for t, w in enumerate(wt):
+    if asynchronous:
+      # a generation is made by n_population completed evaluations
+      stream.step(n_population)
+      if recorder is not None:
+        recorder(t, pos.T, None, g_best)
+      profile.iteration(t, g_score, pos.T, None)
+    else:
+      # Check if moths go out of the search spaceand bring it back
+      np.clip(pos, lower_bound, upper_bound, out=pos)
+      # evaluate moths
+      fitness = evaluate(pos, axis=0)
+      idx = fitness < p_score
+      p_best[:, idx]  = pos[:, idx]
+      p_score[idx] = fitness[idx]
+
+      idx = np.argmin(fitness)
+      if fitness[idx] < g_score:
+        g_score = fitness[idx]
+        g_best  = np.array(pos[:, idx], ndmin=2).T
+      if recorder is not None:
+        recorder(t, pos.T, fitness, g_best)
+      profile.iteration(t, g_score, pos.T, fitness)
+
+      # update the W of PSO
+      random.uniform(low=0., high=1., out=r1)
+      random.uniform(low=0., high=1., out=r2)
+
+      # vel = w * vel + c1 * r1 * (p_best - pos) + c2 * r2 * (g_best - pos)
+      vel *= w
+      r1  *= c1
+      np.subtract(p_best, pos, out=tmp)
+      tmp *= r1
+      vel += tmp
+      r2  *= c2
+      np.subtract(g_best, pos, out=tmp)
+      tmp *= r2
+      vel += tmp
+      np.clip(vel, -Vmax, Vmax, out=vel)
+      pos += vel
 
     # Update convergence curve
     walk[t] = g_best.T
@@ -95,12 +166,25 @@ def pso(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          g_score,
                          time.time() - sol.start_time))
+
+    if stop(g_score):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  if asynchronous:
+    stream.close()
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = g_score
   sol.population = pos.T
 
@@ -8,6 +8,11 @@ import numpy as np
 import time
 import sys
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def ssa(objfunc,
         lower_bound,
@@ -17,24 +22,35 @@ def ssa(objfunc,
         max_iters,    # Number of generations
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   if pos == None:
     # Initialize the population/solutions
-    pos = np.random.uniform(low=lower_bound,
+    pos = random.uniform(low=lower_bound,
                                 high=upper_bound,
-                                size=(n_population, dim))
+                                size=(n_population, dim),
+                                dtype=dtype)
   else:
+    pos = np.array(pos, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     n, d = pos.shape
     if d != dim or n != n_population:
       raise Warning('Wrong dimension shape of old generation! Number of population or dims incompatible')
 
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if verbose:
     print ("SSA is optimizing \"" + objfunc.__name__ + "\"")
@@ -44,24 +60,34 @@ def ssa(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "SSA",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
-  fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  fitness = evaluate(pos)
   best = np.argmin(fitness)
   fmin = fitness[best]
   best = np.array(pos[best], ndmin=2)
 
-  C1 = 2. * np.exp(-(4 * np.arange(2, max_iters + 1) / max_iters)**2)
+  C1 = (2. * np.exp(-(4 * np.arange(2, max_iters + 1) / max_iters)**2)).astype(dtype)
   half = int(n_population * .5)
+  profile.switch('update')
   # main loop
   for t, c1 in enumerate(C1):
-    c2 = np.random.uniform(low=lower_bound,
-                           high=upper_bound,
-                           size=(half, dim))
-    c3 = np.random.uniform(low=0.,
-                           high=1.,
-                           size=(half, dim)) < .5
+    c2 = random.uniform(low=lower_bound,
+                        high=upper_bound,
+                        size=(half, dim),
+                        dtype=dtype)
+    c3 = random.uniform(low=0.,
+                        high=1.,
+                        size=(half, dim)) < .5
     idx = c3.nonzero()
     pos[idx] = (best + c1 * c2)[idx]
     idx = (~c3).nonzero()
@@ -70,14 +96,19 @@ def ssa(objfunc,
     pos[half :] = (pos[half - 1: -1] + pos[half :]) * .5
     pos = np.clip(pos, lower_bound, upper_bound)
 
-    fitness = np.apply_along_axis(objfunc.evaluate, 1, pos)
-    best     = np.argmin(fitness)
-    if fitness[best] < fmin:
-      fmin = fitness[best]
-      best = np.array(pos[best], ndmin=2)
+    fitness = evaluate(pos)
+    # the leader is replaced only by a better salp, so its index is kept
+    # apart from the best position
+    leader   = np.argmin(fitness)
+    if fitness[leader] < fmin:
+      fmin = fitness[leader]
+      best = np.array(pos[leader], ndmin=2)
 
     # Update convergence curve
     walk[t] = best
+    if recorder is not None:
+      recorder(t, pos, fitness, best)
+    profile.iteration(t, fmin, pos, fitness)
     if verbose:
       sys.stdout.write('\r')
       sys.stdout.write("It %-5d: [%-25s] %.3f %.3f sec"
@@ -85,12 +116,23 @@ def ssa(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          fmin,
                          time.time() - sol.start_time))
+
+    if stop(fmin):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = fmin
   sol.population = pos
 
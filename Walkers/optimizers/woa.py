@@ -6,6 +6,11 @@ import numpy as np
 import time
 import sys
 from ..solution import Solution
+from ..evaluator import Evaluator
+from ..rng import as_stream
+from ..termination import Termination
+from ..precision import as_dtype, cast_bounds
+from ..profiler import as_profiler
 
 def woa(objfunc,
         lower_bound,
@@ -16,20 +21,31 @@ def woa(objfunc,
         b   = 1.,     #
         seed = 0,
         pos = None,
-        verbose = True
+        verbose = True,
+        n_jobs = 1,      # parallel workers for the fitness evaluation
+        executor = None, # custom concurrent.futures executor
+        cache = None, # fitness cache (True, max size or FitnessCache)
+        termination = None, # stopping criteria (Termination)
+        dtype = float, # precision of the walkers (float64 or float32)
+        recorder = None, # trajectory recorder (TrajectoryRecorder)
+        profiler = None # per-phase timers and callbacks (Profiler)
         ):
 
-  np.random.seed(int(seed))
+  random = as_stream(seed)
+  dtype = as_dtype(dtype)
+  lower_bound, upper_bound = cast_bounds(lower_bound, upper_bound, dtype)
 
   # Initializing arrays
-  walk = np.empty(shape=(max_iters, dim), dtype=float)
+  walk = np.empty(shape=(max_iters, dim), dtype=dtype)
 
   if pos == None:
-    pos = np.random.uniform(low=lower_bound,
-                            high=upper_bound,
-                            size=(dim, n_population))
+    pos = random.uniform(low=lower_bound,
+                         high=upper_bound,
+                         size=(dim, n_population),
+                         dtype=dtype)
   else:
-    pos = pos.T
+    # copy, since the population is updated in place
+    pos = np.array(pos.T, dtype=dtype)
     if pos.shape != 2:
       raise Warning('Wrong dimension shape of old generation! Probably you should transpose')
     d, n = pos.shape
@@ -41,7 +57,7 @@ def woa(objfunc,
   # a2 linearly decreases from -1 to -2 to calculate t in Eq. (3.12)
   a2t = np.linspace(-1, -2, num=max_iters)
   leader_score = np.inf
-  leader_pos = np.zeros(shape=(1, dim), dtype=float)
+  leader_pos = np.zeros(shape=(1, dim), dtype=dtype)
 
   if verbose:
     print ("WOA is optimizing \"" + objfunc.__name__ + "\"")
@@ -51,48 +67,72 @@ def woa(objfunc,
                  max_iters    = max_iters,
                  optimizer    = "WOA",
                  objfname     = objfunc.__name__,
-                 start_time   = time.time()
+                 start_time   = time.time(),
+                 dtype        = dtype.name
                  )
 
+  if recorder is not None:
+    recorder.start(sol.optimizer, dim, n_population, dtype)
+
+  profile = as_profiler(profiler).start(random)
+  evaluate = Evaluator(objfunc, n_jobs=n_jobs, executor=executor, cache=cache, profiler=profile)
+  stop = (termination or Termination()).start(evaluate)
+
+  # workspace of the in-place updates, allocated once per run
+  tmp = np.empty(shape=(dim, n_population), dtype=dtype)
+
+  profile.switch('update')
   # main loop
   for (t, a), a2 in zip(enumerate(at), a2t):
     # Return back the search agents that go beyond the boundaries of the search space
-    pos = np.clip(pos, lower_bound, upper_bound)
+    np.clip(pos, lower_bound, upper_bound, out=pos)
     # Calculate objective function for each search agent
-    fitness = np.apply_along_axis(objfunc.evaluate, 0, pos)
+    fitness = evaluate(pos, axis=0)
 
     # Update the leader
     idx = np.argmin(fitness)
     if fitness[idx] < leader_score:
       leader_score = fitness[idx]
       leader_pos   = np.array(pos[:, idx], ndmin=2).T
+    if recorder is not None:
+      recorder(t, pos.T, fitness, leader_pos)
+    profile.iteration(t, leader_score, pos.T, fitness)
 
-    r1 = np.random.uniform(low=0., high=1., size=(n_population,))
-    r2 = np.random.uniform(low=0., high=1., size=(n_population,))
+    r1 = random.uniform(low=0., high=1., size=(n_population,))
+    r2 = random.uniform(low=0., high=1., size=(n_population,))
 
     A = 2. * a * r1 - a
     C = 2. * r2
-    p = np.random.uniform(low=0., high=1., size=(n_population,)) < .5
+    p = random.uniform(low=0., high=1., size=(n_population,)) < .5
 
     A_condition = abs(A) >= 1.
 
     idx = np.logical_and(p, A_condition)
     if sum(idx):
       l_idx = np.floor(n_population *
-                       np.random.uniform(low=0.,
-                                         high=1.,
-                                         size=(n_population, ))
+                       random.uniform(low=0.,
+                                      high=1.,
+                                      size=(n_population, ))
                        ).astype(int)
       pos[:, l_idx] = pos[:, l_idx] - A[l_idx] * abs(C * pos[:, l_idx] - pos[:, l_idx])
 
-    idx = np.logical_and(p, ~A_condition)
-    pos[:, idx] = leader_pos - A[idx] * abs((C * leader_pos)[:, idx] - pos[:, idx])
-
-    p = ~p
-    l = (a2 - 1.) * np.random.uniform(low=0., high=1., size=(n_population,)) + 1.
-    l = l[p]
-    dist2leader = abs(leader_pos - pos[:, p])
-    pos[:, p] = dist2leader * np.exp(b * l) * np.cos(2. * l * np.pi) + leader_pos
+    # encircling (p and not A_condition) and spiral (not p) moves in a single
+    # in-place pass over the workspace, copied only on the moved columns:
+    # pos = leader_pos + s1 * s2 * abs(u * leader_pos - pos) with
+    #   encircling : u = C,  s1 = -A,            s2 = 1
+    #   spiral     : u = 1,  s1 = exp(b * l),    s2 = cos(2 * l * pi)
+    l = (a2 - 1.) * random.uniform(low=0., high=1., size=(n_population,)) + 1.
+    u  = np.where(p, C, 1.).astype(dtype, copy=False)
+    s1 = np.where(p, -A, np.exp(b * l)).astype(dtype, copy=False)
+    s2 = np.where(p, 1., np.cos(2. * l * np.pi)).astype(dtype, copy=False)
+
+    np.multiply(u, leader_pos, out=tmp)
+    tmp -= pos
+    np.abs(tmp, out=tmp)
+    tmp *= s1
+    tmp *= s2
+    tmp += leader_pos
+    np.copyto(pos, tmp, where=~idx)
 
 
     # Update convergence curve
@@ -104,12 +144,23 @@ def woa(objfunc,
                          '█' * int(t / (max_iters/26)) + '-' * (25 - int(t / (max_iters/26))),
                          leader_score,
                          time.time() - sol.start_time))
+
+    if stop(leader_score):
+      break
   if verbose:
     sys.stdout.write('\n')
 
+  evaluate.close()
+  if recorder is not None:
+    recorder.close()
+
+  sol.profile = profile.stop(evaluate)
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
-  sol.walk       = walk
+  sol.execution_time = sol.end_time - sol.start_time
+  sol.n_iters    = stop.n_iters
+  sol.n_evals    = evaluate.n_evals
+  sol.stop_reason = stop.reason
+  sol.walk       = walk[:stop.n_iters]
   sol.best       = leader_score
   sol.population = pos.T
 
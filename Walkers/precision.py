@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+def as_dtype(dtype):
+  # floating point precision of the walker positions: float64 (default) or
+  # float32, which halves the memory traffic of the population updates
+  dtype = np.dtype(dtype)
+  if dtype not in (np.float32, np.float64):
+    raise ValueError('Wrong dtype! Available precisions are float32 and float64')
+  return dtype
+
+def cast_bounds(lower_bound, upper_bound, dtype):
+  # bounds rounded inward to the closest representable values, so a position
+  # clipped in reduced precision never falls outside the original domain
+  dtype = as_dtype(dtype)
+  lower = np.asarray(lower_bound, dtype=float)
+  upper = np.asarray(upper_bound, dtype=float)
+
+  low, up = lower.astype(dtype), upper.astype(dtype)
+  low = np.where(low < lower, np.nextafter(low, dtype.type(np.inf)), low).astype(dtype)
+  up  = np.where(up > upper, np.nextafter(up, dtype.type(-np.inf)), up).astype(dtype)
+
+  if low.ndim == 0:
+    return low[()], up[()]
+  return low, up
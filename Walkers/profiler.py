@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+
+from time import perf_counter
+
+class _Phase(object):
+
+  # context manager of a nested phase (see Profiler.phase)
+
+  __slots__ = ('profiler', 'name')
+
+  def __init__(self, profiler, name):
+    self.profiler = profiler
+    self.name     = name
+
+  def __enter__(self):
+    self.profiler.push(self.name)
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.profiler.pop()
+
+
+class Profiler(object):
+
+  # Time spent by an optimizer in each phase of a run. The phases are
+  # exclusive (entering a nested phase pauses the enclosing one), so the
+  # timers add up to the run time:
+  #  - init     : setup before the main loop
+  #  - update   : main loop (position updates and everything not listed below)
+  #  - evaluate : objective function (Evaluator)
+  #  - random   : generation of the random numbers (RandomStream refills)
+  #  - distance : pairwise distances and interactions (ffa, gsa)
+  #  - sort     : ranking of the population (bbo, gao)
+  #  - callback : the callbacks
+  # callbacks are called at the end of every iteration as
+  # callback(t, score, pos, fitness), with the best score, the population
+  # (n_population, dim) and its fitness (None if not available).
+  # The timers are reset by start, so the same profiler can be passed to
+  # many runs; the summary of each run is stored in Solution.profile.
+
+  enabled = True
+
+  def __init__(self, callbacks = None):
+    self.callbacks = list(callbacks) if callbacks is not None else []
+    self.timers    = dict()
+    self.calls     = dict()
+    self.n_iters   = 0
+    self._stack    = []
+    self._tic      = 0.
+
+  def start(self, random = None):
+    # called by the optimizers before the first evaluation: the random
+    # stream reports its refills to the profiler
+    self.timers, self.calls, self.n_iters = dict(), dict(), 0
+    if random is not None:
+      random.profiler = self
+    self._stack = []
+    self.push('init')
+    return self
+
+  def push(self, name):
+    now = perf_counter()
+    if self._stack:
+      top = self._stack[-1]
+      self.timers[top] = self.timers.get(top, 0.) + now - self._tic
+    self._stack.append(name)
+    self.calls[name] = self.calls.get(name, 0) + 1
+    self._tic = now
+
+  def pop(self):
+    now = perf_counter()
+    name = self._stack.pop()
+    self.timers[name] = self.timers.get(name, 0.) + now - self._tic
+    self._tic = now
+
+  def phase(self, name):
+    return _Phase(self, name)
+
+  def switch(self, name):
+    # replace the outermost phase (e.g. init -> update)
+    self.pop()
+    self.push(name)
+
+  def iteration(self, t, score, pos = None, fitness = None):
+    self.n_iters += 1
+    if self.callbacks:
+      with self.phase('callback'):
+        for callback in self.callbacks:
+          callback(t, score, pos, fitness)
+
+  def stop(self, evaluator = None):
+    # close the run and return its summary
+    while self._stack:
+      self.pop()
+    return self.summary(evaluator)
+
+  def summary(self, evaluator = None):
+    summary = {'timers'  : dict(self.timers),
+               'calls'   : dict(self.calls),
+               'total'   : sum(self.timers.values()),
+               'n_iters' : self.n_iters
+               }
+    if evaluator is not None:
+      summary['n_evals'] = evaluator.n_evals
+      if evaluator.cache is not None:
+        summary['cache'] = evaluator.cache.info()
+    return summary
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
+
+  def __str__(self):
+    total = sum(self.timers.values())
+    fmt_str = 'Profile of %d iterations (%.3f sec)\n'%(self.n_iters, total)
+    for name, value in sorted(self.timers.items(), key=lambda x : -x[1]):
+      fmt_str += '  %-10s %10.6f sec (%5.1f%%, %d calls)\n'%(name, value, 100. * value / total if total else 0., self.calls.get(name, 0))
+    return fmt_str
+
+
+class _NullPhase(object):
+
+  __slots__ = ()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    pass
+
+
+class NullProfiler(Profiler):
+
+  # disabled profiler: all the hooks are no-ops
+
+  enabled = False
+
+  _phase = _NullPhase()
+
+  def start(self, random = None):
+    if random is not None:
+      random.profiler = None
+    return self
+
+  def push(self, name):
+    pass
+
+  def pop(self):
+    pass
+
+  def phase(self, name):
+    return self._phase
+
+  def switch(self, name):
+    pass
+
+  def iteration(self, t, score, pos = None, fitness = None):
+    pass
+
+  def stop(self, evaluator = None):
+    return dict()
+
+
+def as_profiler(profiler):
+  # the profiler argument of the optimizers can be None/False (disabled),
+  # True (default Profiler), a list of callbacks or a Profiler
+  if profiler is None or profiler is False:
+    return NullProfiler()
+  if profiler is True:
+    return Profiler()
+  if isinstance(profiler, Profiler):
+    return profiler
+  return Profiler(callbacks=profiler)
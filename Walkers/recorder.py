@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+import os
+import json
+import numpy as np
+
+class TrajectoryRecorder(object):
+
+  # Trajectory of a run written to disk while the optimizer is running: every
+  # stride iterations the optimizer passes the population (n_population, dim),
+  # its fitness and the best walker, which are buffered in chunks of
+  # chunk_size snapshots and written to the directory path as
+  #  - <field>_<chunk>.npy files (memory-mappable), or
+  #  - chunk_<chunk>.npz files if compress is True
+  # plus a meta.json file with the layout, so the memory stays flat however
+  # long the run is. The trajectory is read back by chunks or load.
+
+  fields = ('iters', 'population', 'fitness', 'best')
+
+  def __init__(self, path, stride = 1,
+                           chunk_size = 128,
+                           compress = False,
+                           population = True,
+                           fitness = True
+               ):
+
+    if stride <= 0:
+      raise ValueError('Wrong stride! It must be positive')
+    if chunk_size <= 0:
+      raise ValueError('Wrong chunk size! It must be positive')
+
+    self.path       = path
+    self.stride     = int(stride)
+    self.chunk_size = int(chunk_size)
+    self.compress   = compress
+    self.record     = [f for f, keep in zip(self.fields, (True, population, fitness, True)) if keep]
+    self.meta       = None
+
+  def start(self, optimizer, dim, n_population, dtype = float):
+    # called by the optimizers at the beginning of the run
+    os.makedirs(self.path, exist_ok=True)
+    dtype = np.dtype(dtype)
+    shapes = {'iters'      : (),
+              'population' : (n_population, dim),
+              'fitness'    : (n_population, ),
+              'best'       : (dim, )
+              }
+    types  = {'iters' : np.int64, 'population' : dtype, 'fitness' : float, 'best' : dtype}
+    self._buffer = {f : np.empty(shape=(self.chunk_size, ) + shapes[f], dtype=types[f]) for f in self.record}
+    self._size = 0
+
+    self.meta = {'optimizer'    : optimizer,
+                 'dim'          : int(dim),
+                 'n_population' : int(n_population),
+                 'dtype'        : dtype.name,
+                 'stride'       : self.stride,
+                 'chunk_size'   : self.chunk_size,
+                 'compress'     : bool(self.compress),
+                 'fields'       : self.record,
+                 'n_chunks'     : 0,
+                 'n_snapshots'  : 0
+                 }
+    self._dump_meta()
+    return self
+
+  def __call__(self, t, pos, fitness = None, best = None):
+    # snapshot of the iteration t: the arrays are copied in the buffer, so
+    # the optimizers can keep updating them in place
+    if t % self.stride:
+      return
+    i = self._size
+    buffer = self._buffer
+    buffer['iters'][i] = t
+    if 'population' in buffer:
+      buffer['population'][i] = pos
+    if 'fitness' in buffer:
+      buffer['fitness'][i] = np.nan if fitness is None else fitness
+    buffer['best'][i] = np.nan if best is None else np.ravel(best)
+    self._size += 1
+
+    if self._size == self.chunk_size:
+      self.flush()
+
+  def flush(self):
+    if not self._size:
+      return
+    n = self.meta['n_chunks']
+    data = {f : self._buffer[f][:self._size] for f in self.record}
+    if self.compress:
+      np.savez_compressed(os.path.join(self.path, 'chunk_%05d.npz'%(n)), **data)
+    else:
+      for f, arr in data.items():
+        np.save(os.path.join(self.path, '%s_%05d.npy'%(f, n)), arr)
+
+    self.meta['n_chunks']    += 1
+    self.meta['n_snapshots'] += self._size
+    self._size = 0
+    self._dump_meta()
+
+  def close(self):
+    # called by the optimizers at the end of the run
+    self.flush()
+    self._buffer = None
+
+  def _dump_meta(self):
+    with open(os.path.join(self.path, 'meta.json'), 'w') as fp:
+      json.dump(self.meta, fp, indent=2)
+
+  @staticmethod
+  def info(path):
+    with open(os.path.join(path, 'meta.json'), 'r') as fp:
+      return json.load(fp)
+
+  @classmethod
+  def chunks(cls, path, fields = None, mmap_mode = 'r'):
+    # iterate over the chunks of a recorded trajectory as dictionaries of
+    # arrays; the uncompressed chunks are memory-mapped
+    meta = cls.info(path)
+    fields = meta['fields'] if fields is None else fields
+    missing = set(fields) - set(meta['fields'])
+    if missing:
+      raise ValueError('Wrong fields! {} not recorded'.format(', '.join(sorted(missing))))
+
+    for n in range(meta['n_chunks']):
+      if meta['compress']:
+        with np.load(os.path.join(path, 'chunk_%05d.npz'%(n))) as data:
+          yield {f : data[f] for f in fields}
+      else:
+        yield {f : np.load(os.path.join(path, '%s_%05d.npy'%(f, n)), mmap_mode=mmap_mode) for f in fields}
+
+  @classmethod
+  def load(cls, path, fields = None):
+    # the whole trajectory in memory, e.g. the population history
+    # (n_snapshots, n_population, dim) for the measures
+    chunks = list(cls.chunks(path, fields=fields, mmap_mode=None))
+    if not chunks:
+      return {}
+    return {f : np.concatenate([c[f] for c in chunks]) for f in chunks[0]}
+
+  @classmethod
+  def walkers(cls, path, n_walkers = 64):
+    # the population history by blocks of walkers (n_walkers, n_snapshots, dim),
+    # e.g. for the out-of-core Measures; only the block is read from the
+    # memory-mapped chunks
+    meta = cls.info(path)
+    if n_walkers <= 0:
+      raise ValueError('Wrong number of walkers! It must be positive')
+    for lo in range(0, meta['n_population'], n_walkers):
+      block = [c['population'][:, lo : lo + n_walkers] for c in cls.chunks(path, fields=('population', ))]
+      yield np.concatenate(block).transpose(1, 0, 2)
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
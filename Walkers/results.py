@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+class Results(object):
+
+  # Column-wise table of many runs: every column is a numpy array with one
+  # entry for each run, so the filters, the group-by and the summary
+  # statistics of large benchmark sweeps are vectorized. The table is built
+  # from Solution objects or from the metadata of Solution.load_metadata.
+
+  columns = ('optimizer', 'objfname', 'dtype', 'stop_reason',
+             'dim', 'n_population', 'max_iters', 'n_iters', 'n_evals',
+             'best', 'execution_time')
+
+  stats = ('count', 'mean', 'std', 'min', 'median', 'max')
+
+  def __init__(self, data = None):
+    data = dict() if data is None else data
+    self.data = {k : np.asarray(v) for k, v in data.items()}
+    sizes = {len(v) for v in self.data.values()}
+    if len(sizes) > 1:
+      raise ValueError('Wrong columns! All the columns must have the same length')
+
+  @classmethod
+  def from_solutions(cls, solutions):
+    return cls.from_records([{k : sol[k] for k in cls.columns} for sol in solutions])
+
+  @classmethod
+  def from_metadata(cls, metadata):
+    # e.g. Results.from_metadata(Solution.load_metadata(paths)), without
+    # loading the trajectories
+    return cls.from_records(metadata)
+
+  @classmethod
+  def from_records(cls, records):
+    records = list(records)
+    data = dict()
+    for key in cls.columns:
+      values = [r.get(key) for r in records]
+      if key == 'best':
+        # some optimizers return the best position instead of the score
+        values = [float(v) if v is not None and np.ndim(v) == 0 else np.nan for v in values]
+        data[key] = np.asarray(values, dtype=float)
+      elif key in ('optimizer', 'objfname', 'dtype', 'stop_reason'):
+        data[key] = np.asarray(['' if v is None else str(v) for v in values], dtype=str)
+      elif key == 'execution_time':
+        data[key] = np.asarray([np.nan if v is None else v for v in values], dtype=float)
+      else:
+        data[key] = np.asarray([-1 if v is None else v for v in values], dtype=int)
+    return cls(data)
+
+  def __len__(self):
+    return len(next(iter(self.data.values()))) if self.data else 0
+
+  def __getitem__(self, key):
+    # a column by name, or the rows selected by a mask/indices
+    if isinstance(key, str):
+      return self.data[key]
+    return Results({k : v[key] for k, v in self.data.items()})
+
+  def select(self, **conditions):
+    # rows matching all the conditions column=value (or column=[values])
+    mask = np.ones(shape=(len(self), ), dtype=bool)
+    for key, value in conditions.items():
+      mask &= np.isin(self.data[key], np.atleast_1d(value))
+    return self[mask]
+
+  def groupby(self, by):
+    # group labels of the rows: the unique keys (as a table) and the index
+    # of the group of every row
+    by = (by, ) if isinstance(by, str) else tuple(by)
+    if not len(self):
+      return Results({k : self.data[k] for k in by}), np.empty(shape=(0, ), dtype=int)
+
+    codes = []
+    for key in by:
+      _, code = np.unique(self.data[key], return_inverse=True)
+      codes.append(code.ravel())
+    _, first, group = np.unique(np.stack(codes, axis=1), axis=0, return_index=True, return_inverse=True)
+    return Results({k : self.data[k][first] for k in by}), group.ravel()
+
+  def summary(self, by = ('optimizer', 'objfname'), value = 'best', stats = ('count', 'mean', 'std', 'min', 'median', 'max')):
+    # summary statistics of the column value for every group; the NaN values
+    # (e.g. unknown scores) are ignored
+    for stat in stats:
+      if stat not in self.stats:
+        raise ValueError('Wrong statistic {}! Available statistics are {}'.format(stat, ', '.join(self.stats)))
+
+    keys, group = self.groupby(by)
+    n_groups = len(keys)
+    x = self.data[value].astype(float)
+    valid = ~np.isnan(x)
+    group, x = group[valid], x[valid]
+
+    count = np.bincount(group, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+      mean = np.bincount(group, weights=x, minlength=n_groups) / count
+      var  = np.bincount(group, weights=(x - mean[group])**2, minlength=n_groups) / count
+
+    table = dict(keys.data)
+    for stat in stats:
+      name = '{}_{}'.format(value, stat)
+      if stat == 'count':
+        table[name] = count
+      elif stat == 'mean':
+        table[name] = mean
+      elif stat == 'std':
+        table[name] = np.sqrt(var)
+      elif stat == 'median':
+        # values sorted within the groups: the median is in the middle of
+        # every block
+        order = np.lexsort((x, group))
+        xs = x[order]
+        start = np.concatenate(([0], np.cumsum(count)[:-1]))
+        lo = start + np.maximum(count - 1, 0) // 2
+        hi = start + count // 2
+        median = np.full(shape=(n_groups, ), fill_value=np.nan, dtype=float)
+        some = count > 0
+        median[some] = .5 * (xs[lo[some]] + xs[hi[some]])
+        table[name] = median
+      else:
+        ufunc = np.minimum if stat == 'min' else np.maximum
+        result = np.full(shape=(n_groups, ), fill_value=np.inf if stat == 'min' else -np.inf, dtype=float)
+        ufunc.at(result, group, x)
+        result[count == 0] = np.nan
+        table[name] = result
+    return Results(table)
+
+  def to_records(self):
+    return [{k : v[i].item() for k, v in self.data.items()} for i in range(len(self))]
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
+
+  def __str__(self):
+    keys = list(self.data)
+    rows = [keys] + [['%.6g'%(v) if isinstance(v, float) else str(v) for v in r.values()] for r in self.to_records()]
+    width = [max(len(r[j]) for r in rows) for j in range(len(keys))]
+    return '\n'.join('  '.join(c.ljust(w) for c, w in zip(r, width)).rstrip() for r in rows) + '\n'
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+class RandomStream(object):
+
+  # Random numbers of a run, without global state: the uniform and normal
+  # deviates are generated in chunks of buffer_size numbers and served from
+  # the buffer, so many small draws cost a slice each. Uniform, normal and
+  # discrete draws come from three independent numpy Generators (children of
+  # the same SeedSequence), hence the sequence of numbers does not depend on
+  # the buffer size. spawn gives independent streams for parallel runs.
+
+  def __init__(self, seed = 0, buffer_size = 2**16):
+    if buffer_size <= 0:
+      raise ValueError('Wrong buffer size! It must be positive')
+
+    if isinstance(seed, np.random.SeedSequence):
+      self.seed_sequence = seed
+    else:
+      self.seed_sequence = np.random.SeedSequence(None if seed is None else int(seed))
+
+    self.buffer_size = int(buffer_size)
+    uniform, normal, discrete = [np.random.Generator(np.random.PCG64(s)) for s in self.seed_sequence.spawn(3)]
+
+    self.generator = discrete
+    self._draw = {'uniform' : uniform.random,
+                  'normal'  : normal.standard_normal
+                  }
+    self._buffer = {kind : np.empty(shape=(0,), dtype=float) for kind in self._draw}
+    self._offset = {kind : 0 for kind in self._draw}
+    # optional Profiler of the refills (set by Profiler.start)
+    self.profiler = None
+
+  def _take(self, kind, size, out = None):
+    result = None
+    if out is not None:
+      # fill a preallocated (contiguous) array
+      if not out.flags.c_contiguous:
+        raise ValueError('Wrong output array! It must be C-contiguous')
+      size, result, out = out.shape, out, out.reshape(-1)
+
+    shape = () if size is None else size
+    n = int(np.prod(shape))
+    if result is None:
+      out = np.empty(shape=(n,), dtype=float)
+
+    filled = 0
+    while filled < n:
+      buffer, offset = self._buffer[kind], self._offset[kind]
+      if offset == len(buffer):
+        if n - filled >= self.buffer_size:
+          # large draws skip the buffer
+          out[filled:] = self._generate(kind, n - filled)
+          break
+        buffer, offset = self._generate(kind, self.buffer_size), 0
+        self._buffer[kind] = buffer
+
+      m = min(n - filled, len(buffer) - offset)
+      out[filled : filled + m] = buffer[offset : offset + m]
+      self._offset[kind] = offset + m
+      filled += m
+
+    if result is not None:
+      return result
+    return out[0] if size is None else out.reshape(shape)
+
+  def _generate(self, kind, n):
+    if self.profiler is None:
+      return self._draw[kind](n)
+    with self.profiler.phase('random'):
+      return self._draw[kind](n)
+
+  def random(self, size = None, out = None, dtype = float):
+    # the numbers are always drawn in double precision and rounded to dtype,
+    # so float32 runs follow the same sequence as the float64 ones
+    if out is not None and out.dtype != np.float64:
+      out[...] = self._take('uniform', out.shape)
+      return out
+    return self._cast(self._take('uniform', size, out), dtype)
+
+  def uniform(self, low = 0., high = 1., size = None, out = None, dtype = float):
+    if out is None:
+      return self._cast(low + (high - low) * self._take('uniform', size), dtype)
+    if out.dtype != np.float64:
+      out[...] = low + (high - low) * self._take('uniform', out.shape)
+      return out
+    self._take('uniform', size, out)
+    np.multiply(out, high - low, out=out)
+    np.add(out, low, out=out)
+    return out
+
+  def standard_normal(self, size = None, dtype = float):
+    return self._cast(self._take('normal', size), dtype)
+
+  def randn(self, *shape, dtype = float):
+    return self._cast(self._take('normal', shape if shape else None), dtype)
+
+  @staticmethod
+  def _cast(x, dtype):
+    if dtype is float or np.dtype(dtype) == np.float64:
+      return x
+    return np.dtype(dtype).type(x) if np.ndim(x) == 0 else x.astype(dtype)
+
+  def randint(self, low, high = None, size = None):
+    return self.generator.integers(low, high, size=size)
+
+  def choice(self, a, size = None, replace = True, p = None):
+    return self.generator.choice(a, size=size, replace=replace, p=p)
+
+  def permutation(self, x):
+    return self.generator.permutation(x)
+
+  def spawn(self, n):
+    # independent streams, e.g. one for each run or worker
+    return [RandomStream(seed, buffer_size=self.buffer_size) for seed in self.seed_sequence.spawn(n)]
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
+
+
+def as_stream(seed):
+  # the seed argument of the optimizers can be an integer, a SeedSequence or
+  # an already created RandomStream (e.g. one of the spawned streams)
+  if isinstance(seed, RandomStream):
+    return seed
+  return RandomStream(seed)
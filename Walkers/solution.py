@@ -1,15 +1,24 @@
 #!/usr/bin/env python
+import json
 import pickle
+import numpy as np
 
 class Solution:
 
+  # compact record: the attributes are fixed, so the instances have no
+  # __dict__ and the attribute access is direct
+  __slots__ = ('dim', 'n_population', 'max_iters', 'start_time', 'optimizer', 'objfname',
+               'best', 'end_time', 'execution_time', 'n_iters', 'n_evals',
+               'stop_reason', 'dtype', 'profile', 'walk', 'population')
+
   def __init__( self,
                 dim = -1,
                 n_population = -1,
                 max_iters = -1,
                 optimizer = "",
                 objfname  = "",
-                start_time = 0.
+                start_time = 0.,
+                dtype = "float64"
               ):
     self.dim            = dim
     self.n_population   = n_population
@@ -20,22 +29,132 @@ class Solution:
     self.best           = 0.
     self.end_time       = 0.
     self.execution_time = 0.
+    self.n_iters        = 0
+    self.n_evals        = 0
+    self.stop_reason    = ""
+    self.dtype          = dtype # precision of walk and population
+    self.profile        = dict() # per-phase timers of the run (Profiler)
 
     self.walk           = []
     self.population     = []
 
+  # Binary format (version 1): the magic string, the version and the length
+  # of a json header with the scalar attributes and the layout of the array
+  # attributes (dtype, shape, offset), followed by the raw array payloads
+  # aligned to 64 bytes, which can be memory-mapped on loading
+  magic   = b'WALKSOL\x00'
+  version = 1
+  align   = 64
+
   def dump(self, path):
+    attrs, arrays = dict(), dict()
+    for key, value in self.items():
+      if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+          raise ValueError('Wrong attribute {}! Object arrays can not be dumped'.format(key))
+        arrays[key] = np.ascontiguousarray(value)
+      else:
+        attrs[key] = value.item() if isinstance(value, np.generic) else value
+
+    # the offsets are relative to the (aligned) end of the header
+    layout, offset = dict(), 0
+    for key, arr in arrays.items():
+      layout[key] = {'dtype' : arr.dtype.str, 'shape' : list(arr.shape), 'offset' : offset}
+      offset = Solution._aligned(offset + arr.nbytes)
+    header = json.dumps({'version' : self.version, 'attrs' : attrs, 'arrays' : layout}).encode()
+    start = Solution._aligned(len(self.magic) + 6 + len(header))
+
     with open(path, 'wb') as fp:
-      pickle.dump(self, fp)
+      fp.write(self.magic)
+      fp.write(np.array([self.version], dtype='<u2').tobytes())
+      fp.write(np.array([len(header)], dtype='<u4').tobytes())
+      fp.write(header)
+      for key, arr in arrays.items():
+        fp.seek(start + layout[key]['offset'])
+        arr.tofile(fp)
+      fp.truncate(start + offset)
+
+  @classmethod
+  def load(self, path, mmap_mode = None):
+    # mmap_mode ('r', 'r+', 'c') maps the arrays instead of reading them;
+    # the files written by the previous (pickle) dump are still loaded
+    header = Solution._read_header(path)
+    if header is None:
+      with open(path, 'rb') as fp:
+        return pickle.load(fp)
+
+    sol = Solution()
+    sol.__setstate__(header['attrs'])
+    for key, layout in header['arrays'].items():
+      dtype, shape, offset = np.dtype(layout['dtype']), tuple(layout['shape']), layout['offset']
+      count = int(np.prod(shape))
+      if mmap_mode is not None and count:
+        value = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape)
+      else:
+        value = np.fromfile(path, dtype=dtype, count=count, offset=offset).reshape(shape)
+      setattr(sol, key, value)
+    return sol
 
   @classmethod
-  def load(self, path):
+  def load_metadata(self, paths):
+    # scalar attributes (optimizer, objfname, dim, timings, best, ...) of
+    # many solutions, reading only the headers: the arrays are described by
+    # their shapes
+    if isinstance(paths, str):
+      paths = [paths]
+    metadata = []
+    for path in paths:
+      header = Solution._read_header(path)
+      if header is None:
+        with open(path, 'rb') as fp:
+          sol = pickle.load(fp)
+        attrs  = {k : v for k, v in sol.items() if not isinstance(v, np.ndarray)}
+        shapes = {k : v.shape for k, v in sol.items() if isinstance(v, np.ndarray)}
+      else:
+        attrs  = header['attrs']
+        shapes = {k : tuple(v['shape']) for k, v in header['arrays'].items()}
+      attrs['path'] = path
+      attrs['shapes'] = shapes
+      metadata.append(attrs)
+    return metadata
+
+  @staticmethod
+  def _aligned(offset):
+    return -(-offset // Solution.align) * Solution.align
+
+  @staticmethod
+  def _read_header(path):
+    # None for the legacy pickle files
     with open(path, 'rb') as fp:
-      return pickle.load(fp)
+      if fp.read(len(Solution.magic)) != Solution.magic:
+        return None
+      version, = np.frombuffer(fp.read(2), dtype='<u2')
+      if version > Solution.version:
+        raise ValueError('Wrong solution file! Unknown format version {}'.format(version))
+      size, = np.frombuffer(fp.read(4), dtype='<u4')
+      header = json.loads(fp.read(int(size)).decode())
+    start = Solution._aligned(len(Solution.magic) + 6 + int(size))
+    for layout in header['arrays'].values():
+      layout['offset'] += start
+    return header
+
+  def items(self):
+    return [(key, getattr(self, key)) for key in self.__slots__]
+
+  def __getstate__(self):
+    return dict(self.items())
+
+  def __setstate__(self, state):
+    # the legacy (pickled) solutions store their attributes as a dict: the
+    # missing attributes keep the default values and the ones unknown to
+    # this version are dropped
+    self.__init__()
+    for key, value in state.items():
+      if key in self.__slots__:
+        setattr(self, key, value)
 
   def __getitem__(self, stat):
-    var = eval('self.' + str(stat))
-    return var
+    return getattr(self, str(stat))
 
   def __repr__(self):
     class_name = self.__class__.__name__
@@ -49,6 +168,12 @@ class Solution:
     else:
       fmt_str += 'Best Solution found: %.3f\n'%(self.best)
     fmt_str += 'Estimated in %.3f sec (it=%d)\n'%(self.execution_time, self.max_iters)
+    if self.stop_reason:
+      fmt_str += 'Stopped by %s after %d iterations and %d evaluations\n'%(self.stop_reason, self.n_iters, self.n_evals)
+    if self.profile:
+      total = self.profile['total']
+      for name, value in sorted(self.profile['timers'].items(), key=lambda x : -x[1]):
+        fmt_str += '  %-10s %.3f sec (%.1f%%)\n'%(name, value, 100. * value / total if total else 0.)
     return fmt_str
 
 
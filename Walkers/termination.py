@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import time
+import numpy as np
+
+class Termination(object):
+
+  # Stopping criteria checked by the optimizers at the end of every
+  # iteration (the run stops in any case after max_iters iterations):
+  #  - max_evals : budget of objective function evaluations (the last
+  #                iteration is completed, so it can be exceeded by at most
+  #                one generation)
+  #  - max_time  : wall-clock deadline in seconds from the start of the run
+  #  - target    : fitness to reach, with tolerance tol
+  #  - patience  : number of iterations without an improvement of the best
+  #                score larger than min_delta
+
+  def __init__(self, max_evals = None,
+                     max_time = None,
+                     target = None,
+                     tol = 0.,
+                     patience = None,
+                     min_delta = 0.
+               ):
+
+    if max_evals is not None and max_evals <= 0:
+      raise ValueError('Wrong number of evaluations! It must be positive')
+    if max_time is not None and max_time <= 0:
+      raise ValueError('Wrong time limit! It must be positive')
+    if patience is not None and patience <= 0:
+      raise ValueError('Wrong patience! It must be positive')
+
+    self.max_evals = max_evals
+    self.max_time  = max_time
+    self.target    = target
+    self.tol       = tol
+    self.patience  = patience
+    self.min_delta = min_delta
+
+    self.start()
+
+  @classmethod
+  def from_objective(cls, objfunc, tol = 1e-8, **kwargs):
+    # target given by the global minimum of a landscape function
+    minimum = np.array(objfunc.get_minimum(), dtype=float, ndmin=2)
+
+    if minimum.shape[1] != objfunc.dim or np.isnan(minimum).any():
+      raise ValueError('Unknown global minimum of {}'.format(objfunc.__name__))
+
+    target = min(objfunc.evaluate(x) for x in minimum)
+    return cls(target=target, tol=tol, **kwargs)
+
+  def start(self, evaluator = None):
+    # reset the state at the beginning of a run
+    self.evaluator  = evaluator
+    self.start_time = time.time()
+    self.n_iters    = 0
+    self.best       = np.inf
+    self.stall      = 0
+    self.reason     = 'max_iters'
+    return self
+
+  def __call__(self, score):
+    # return True if the run must stop after the current iteration
+    self.n_iters += 1
+
+    if score < self.best - self.min_delta:
+      self.best  = score
+      self.stall = 0
+    else:
+      self.best  = min(self.best, score)
+      self.stall += 1
+
+    if self.target is not None and score <= self.target + self.tol:
+      self.reason = 'target'
+    elif self.max_evals is not None and self.evaluator is not None and self.evaluator.n_evals >= self.max_evals:
+      self.reason = 'max_evals'
+    elif self.max_time is not None and time.time() - self.start_time >= self.max_time:
+      self.reason = 'max_time'
+    elif self.patience is not None and self.stall >= self.patience:
+      self.reason = 'stagnation'
+    else:
+      return False
+
+    return True
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
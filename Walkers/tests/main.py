@@ -83,8 +83,7 @@ if __name__ == '__main__':
     x = np.linspace(lower_bound, upper_bound, Nstep)
     x, y = np.meshgrid(x, x)
     z = np.asarray([[i, j] for i, j in zip(x.ravel(), y.ravel())])
-    z = list(map(function.evaluate, z))
-    z = np.asarray(z).reshape((Nstep, Nstep))
+    z = function.evaluate_batch(z).reshape((Nstep, Nstep))
     m_z = np.min(z)
     M_z = np.max(z)
 
@@ -95,7 +94,7 @@ if __name__ == '__main__':
     surf = ax.plot_surface(x, y, z, cmap=cm.coolwarm,
                            linewidth=0, antialiased=False, alpha=.5)
 
-    fitness_walk = [function.evaluate(w) for w in walk]
+    fitness_walk = function.evaluate_batch(walk)
     walk_step = ax.plot(walk[:, 0], walk[:, 1], fitness_walk, color='k', linewidth=2, alpha=.8)
 
     minimum = function.get_minimum()
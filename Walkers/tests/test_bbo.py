@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+
+import numpy as np
+from Walkers.landscape import AckleyFunction
+from Walkers.optimizers.bbo import bbo
+
+def test_bbo_2d ():
+  # the migration picks the feature d of the walker i from the habitat
+  # rng[i, d] (regression: it raised IndexError on every 2D run)
+  objfunc = AckleyFunction(dim=2)
+  lower_bound, upper_bound = objfunc.get_boundary()
+  for seed in range(5):
+    sol = bbo(objfunc, lower_bound, upper_bound, dim=2, n_population=50, max_iters=20, seed=seed, verbose=False)
+    assert np.isfinite(sol.best)
+    assert sol.n_evals == 50 * 21
+
+def test_bbo_asynchronous_2d ():
+  objfunc = AckleyFunction(dim=2)
+  lower_bound, upper_bound = objfunc.get_boundary()
+  sol = bbo(objfunc, lower_bound, upper_bound, dim=2, n_population=20, max_iters=10, seed=0, verbose=False, asynchronous=True)
+  assert np.isfinite(sol.best)
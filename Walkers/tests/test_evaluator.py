@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+
+import numpy as np
+from Walkers import multirun
+from Walkers.evaluator import FitnessCache
+from Walkers.landscape import AckleyFunction
+
+def test_cache_exact_keys ():
+  # by default only identical positions share the same key
+  cache = FitnessCache()
+  x = np.array([[1., 2.], [1. + 1e-13, 2.], [-0., 2.], [0., 2.]])
+  keys = cache.keys(x)
+  assert keys[0] != keys[1]
+  assert keys[2] == keys[3]
+  assert FitnessCache(tol=1e-12).keys(x[:2])[0] == FitnessCache(tol=1e-12).keys(x[:2])[1]
+
+def test_cache_same_results ():
+  # the cache does not change the results of the runs
+  objfunc = AckleyFunction(dim=3)
+  cached = multirun.gwo(objfunc, -5, 5, 3, 10, 100, seeds=range(3), verbose=False, cache=True)
+  plain  = multirun.gwo(objfunc, -5, 5, 3, 10, 100, seeds=range(3), verbose=False)
+  assert [sol.best for sol in cached] == [sol.best for sol in plain]
+  assert [sol.walk.tolist() for sol in cached] == [sol.walk.tolist() for sol in plain]
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+import inspect
+import numpy as np
+import pytest
+from Walkers import landscape
+from Walkers.optimizers.fss import fss
+from Walkers.optimizers.pso import pso
+
+landscapes = [cls for _, cls in inspect.getmembers(landscape, inspect.isclass)
+              if issubclass(cls, landscape.ObjectiveFunction) and cls is not landscape.ObjectiveFunction]
+
+@pytest.mark.parametrize('cls', landscapes, ids=lambda cls : cls.__name__)
+def test_landscape_float32 (cls):
+  # the float32 walkers are evaluated in double precision
+  objfunc = cls(dim=2)
+  lower_bound, upper_bound = objfunc.get_boundary()
+  rng = np.random.default_rng(42)
+  pop = rng.uniform(low=lower_bound, high=upper_bound, size=(100, 2)).astype(np.float32)
+  pop = np.concatenate((pop, [[lower_bound, lower_bound], [upper_bound, upper_bound], [0., 0.]]), axis=0).astype(np.float32)
+  fitness = objfunc.evaluate_batch(pop)
+  assert fitness.dtype == np.float64
+  assert np.all(np.isfinite(fitness))
+  assert np.allclose(fitness, objfunc.evaluate_batch(pop.astype(float)))
+
+@pytest.mark.parametrize('optimizer', [fss, pso], ids=['fss', 'pso'])
+def test_optimizer_float32 (optimizer):
+  objfunc = landscape.CrossInTrayFunction(dim=2)
+  lower_bound, upper_bound = objfunc.get_boundary()
+  sol = optimizer(objfunc, lower_bound, upper_bound, dim=2, n_population=20, max_iters=10, seed=0, verbose=False, dtype=np.float32)
+  assert np.isfinite(sol.best)
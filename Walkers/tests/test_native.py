@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import pytest
+import numpy as np
+from Walkers import native
+from Walkers.landscape import AckleyFunction
+from Walkers.landscape import RosenbrockFunction
+
+pytestmark = pytest.mark.skipif(not native.available, reason='C++ optimizers not compiled')
+
+seeds = range(16)
+
+def _run (module, name, objfunc, dim, **kwargs):
+  lower_bound, upper_bound = objfunc.get_boundary()
+  return [getattr(module, name)(objfunc, lower_bound, upper_bound, dim, 30, 50, seed=seed, verbose=False, **kwargs)
+          for seed in seeds]
+
+@pytest.mark.parametrize('name', native.verified)
+@pytest.mark.parametrize('objfunc', [RosenbrockFunction(dim=3), AckleyFunction(dim=3)], ids=lambda f : f.__name__)
+def test_native_as_python (name, objfunc):
+  # the random numbers differ, so the runs are compared over the seeds
+  import importlib
+  python = _run(importlib.import_module('Walkers.optimizers.' + name), name, objfunc, 3)
+  cpp    = _run(native, name, objfunc, 3)
+
+  for py_sol, cpp_sol in zip(python, cpp):
+    assert cpp_sol.n_iters == py_sol.n_iters
+    assert cpp_sol.walk.shape == py_sol.walk.shape
+    assert cpp_sol.population.shape == py_sol.population.shape
+    assert np.isfinite(cpp_sol.walk).all()
+
+  py_best  = [sol.best for sol in python]
+  cpp_best = [sol.best for sol in cpp]
+  # neither version is typically worse than the worst run of the other one
+  assert np.median(cpp_best) <= max(py_best)
+  assert np.median(py_best) <= max(cpp_best)
+
+  # bat and cs evaluate a random subset of the walkers
+  py_evals  = np.mean([sol.n_evals for sol in python])
+  cpp_evals = np.mean([sol.n_evals for sol in cpp])
+  if name in ('bat', 'cs'):
+    assert cpp_evals == pytest.approx(py_evals, rel=.05)
+  else:
+    assert cpp_evals == py_evals
+
+@pytest.mark.parametrize('name', native.verified)
+def test_native_n_jobs (name):
+  # the kernels draw the random numbers serially
+  objfunc = RosenbrockFunction(dim=3)
+  serial   = _run(native, name, objfunc, 3, n_jobs=1)
+  parallel = _run(native, name, objfunc, 3, n_jobs=4)
+  assert [sol.best for sol in serial] == [sol.best for sol in parallel]
+  assert [sol.walk.tolist() for sol in serial] == [sol.walk.tolist() for sol in parallel]
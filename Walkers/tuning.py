@@ -28,7 +28,9 @@ class OptimizeOptimizer(object):
     self.optimizer = optimizer
     self.objfunc = objfunc
     flags        = inspect.getfullargspec(self.optimizer)
-    common_flags = ['objfunc', 'n_population', 'lower_bound', 'upper_bound', 'dim', 'n_population', 'max_iters', 'pos', 'verbose']#, 'seed']
+    common_flags = ['objfunc', 'n_population', 'lower_bound', 'upper_bound', 'dim', 'n_population', 'max_iters', 'pos', 'verbose',
+                    'n_jobs', 'executor', 'asynchronous', 'cache', 'termination',
+                    'synchronous', 'max_memory', 'neighbors', 'cutoff', 'dtype', 'recorder', 'profiler']#, 'seed']
     self.dim_hp = len([i for i in flags.args if i not in common_flags ])
     self.lower_bound, self.upper_bound = self.objfunc.get_boundary()
 
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+
+import numpy as np
+from abc import ABC, abstractmethod
+from scipy import fft
+from scipy.special import gamma
+from .rng import as_stream
+from .precision import as_dtype
+
+levy_flight = lambda beta : ( gamma(1. + beta)      * np.sin(np.pi * beta * .5) / \
+                             (gamma((1. + beta)*.5) * beta * 2.**( (beta - 1.) * .5)) \
+                             )**(1. / beta)
+
+def _prefix(x):
+  # positions from the increments along the time axis, starting from 0
+  out = np.zeros(shape=(x.shape[0], x.shape[1] + 1) + x.shape[2:], dtype=float)
+  np.cumsum(x, axis=1, out=out[:, 1:])
+  return out
+
+
+class RandomWalk(ABC):
+
+  # Ensemble of random walks of n_steps positions in dim dimensions, starting
+  # from the origin, as (n_walkers, n_steps, dim) arrays. The increments of
+  # all the walkers are drawn at once and summed along the time axis; large
+  # ensembles are generated by chunks of walkers of at most max_memory bytes
+  # (chunks), which can be given directly to Measures or written to a
+  # memory-mapped .npy file (to_file). The numbers are drawn in double
+  # precision and the positions are returned in dtype. The subclasses
+  # implement increments, the (n_walkers, n_steps - 1, dim) steps.
+
+  overhead = 2 # temporary arrays per position (for the chunk size)
+
+  def __init__(self, n_steps, dim = 1, seed = 0, dtype = float, max_memory = 2**27):
+    if n_steps <= 0:
+      raise ValueError('Wrong number of steps! It must be positive')
+    if dim <= 0:
+      raise ValueError('Wrong dimension! It must be positive')
+
+    self.n_steps    = int(n_steps)
+    self.dim        = int(dim)
+    self.dtype      = as_dtype(dtype)
+    self.max_memory = max_memory
+    self.random     = as_stream(seed)
+
+  @abstractmethod
+  def increments(self, n_walkers):
+    pass
+
+  def positions(self, n_walkers):
+    return _prefix(self.increments(n_walkers))
+
+  def sample(self, n_walkers):
+    return self.positions(int(n_walkers)).astype(self.dtype, copy=False)
+
+  def __call__(self, n_walkers):
+    return self.sample(n_walkers)
+
+  @property
+  def chunk_size(self):
+    return int(max(1, self.max_memory // (self.overhead * self.n_steps * self.dim * 8)))
+
+  def chunks(self, n_walkers, chunk_size = None):
+    # the ensemble by chunks of walkers, e.g. Measures(walk.chunks(10**6))
+    chunk_size = self.chunk_size if chunk_size is None else int(chunk_size)
+    if chunk_size <= 0:
+      raise ValueError('Wrong chunk size! It must be positive')
+    for lo in range(0, n_walkers, chunk_size):
+      yield self.sample(min(chunk_size, n_walkers - lo))
+
+  def to_file(self, path, n_walkers, chunk_size = None):
+    # the ensemble written chunk by chunk to a .npy file, returned as a
+    # (read-only) memory-mapped array
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype, shape=(n_walkers, self.n_steps, self.dim))
+    lo = 0
+    for chunk in self.chunks(n_walkers, chunk_size):
+      out[lo : lo + len(chunk)] = chunk
+      lo += len(chunk)
+    out.flush()
+    del out
+    return np.load(path, mmap_mode='r')
+
+  def __repr__(self):
+    class_name = self.__class__.__name__
+    return '<%s Class>'%(class_name)
+
+
+class BrownianWalk(RandomWalk):
+
+  # Gaussian increments with standard deviation sigma and mean drift
+
+  def __init__(self, n_steps, dim = 1, sigma = 1., drift = 0., seed = 0, dtype = float, max_memory = 2**27):
+    super(BrownianWalk, self).__init__(n_steps, dim=dim, seed=seed, dtype=dtype, max_memory=max_memory)
+    self.sigma = sigma
+    self.drift = drift
+
+  def increments(self, n_walkers):
+    steps = self.random.standard_normal(size=(n_walkers, self.n_steps - 1, self.dim))
+    steps *= self.sigma
+    steps += self.drift
+    return steps
+
+
+class LevyFlight(RandomWalk):
+
+  # Levy flight with stable index beta, whose steps are generated with the
+  # Mantegna algorithm (as in the cuckoo search): u / |v|^(1/beta), with
+  # u ~ N(0, sigma^2) and v ~ N(0, 1), times scale
+
+  overhead = 3
+
+  def __init__(self, n_steps, dim = 1, beta = 1.5, scale = 1., seed = 0, dtype = float, max_memory = 2**27):
+    if not (beta > 0. and beta <= 2.):
+      raise ValueError('Wrong beta! It must be in (0, 2]')
+
+    super(LevyFlight, self).__init__(n_steps, dim=dim, seed=seed, dtype=dtype, max_memory=max_memory)
+    self.beta  = beta
+    self.scale = scale
+    self.sigma = levy_flight(beta)
+
+  def increments(self, n_walkers):
+    shape = (n_walkers, self.n_steps - 1, self.dim)
+    u = self.random.standard_normal(size=shape)
+    v = self.random.standard_normal(size=shape)
+    u *= self.sigma * self.scale
+    u /= np.abs(v)**(1. / self.beta)
+    return u
+
+
+class ContinuousTimeRandomWalk(RandomWalk):
+
+  # Gaussian jumps (standard deviation sigma) separated by Pareto waiting
+  # times dt * U^(-1/alpha): with alpha < 1 the mean waiting time diverges
+  # and the walk is subdiffusive. The positions are observed every dt; every
+  # waiting time is at least dt, hence at most n_steps - 1 jumps are needed.
+
+  overhead = 5
+
+  def __init__(self, n_steps, dim = 1, alpha = .5, sigma = 1., dt = 1., seed = 0, dtype = float, max_memory = 2**27):
+    if alpha <= 0.:
+      raise ValueError('Wrong alpha! It must be positive')
+    if dt <= 0.:
+      raise ValueError('Wrong dt! It must be positive')
+
+    super(ContinuousTimeRandomWalk, self).__init__(n_steps, dim=dim, seed=seed, dtype=dtype, max_memory=max_memory)
+    self.alpha = alpha
+    self.sigma = sigma
+    self.dt    = dt
+
+  def increments(self, n_walkers):
+    return np.diff(self.positions(n_walkers), axis=1)
+
+  def positions(self, n_walkers):
+    n_jumps = self.n_steps - 1
+    jumps = self.random.standard_normal(size=(n_walkers, n_jumps, self.dim))
+    jumps *= self.sigma
+    waiting = self.random.random(size=(n_walkers, n_jumps))
+    waiting = self.dt * (1. - waiting)**(-1. / self.alpha)
+
+    # number of jumps before every observation time with a single sorted
+    # search: the jump times of the walker w are shifted by w * 2 horizon
+    horizon = self.n_steps * self.dt
+    events = np.minimum(np.cumsum(waiting, axis=1), horizon)
+    offset = 2. * horizon * np.arange(n_walkers)[:, np.newaxis]
+    times = self.dt * np.arange(self.n_steps)
+    counts = np.searchsorted((events + offset).ravel(), (times + offset).ravel(), side='right')
+    counts = counts.reshape(n_walkers, self.n_steps) - n_jumps * np.arange(n_walkers)[:, np.newaxis]
+
+    return np.take_along_axis(_prefix(jumps), counts[..., np.newaxis], axis=1)
+
+
+class FractionalBrownianMotion(RandomWalk):
+
+  # Fractional Brownian motion with Hurst exponent hurst (0.5 is the Brownian
+  # motion): the increments (fractional Gaussian noise with standard
+  # deviation sigma) are generated with the Davies-Harte method, i.e. by the
+  # FFT of the circulant embedding of their covariance. The real and the
+  # imaginary parts of each transform are two independent series.
+
+  overhead = 8
+
+  def __init__(self, n_steps, dim = 1, hurst = .5, sigma = 1., seed = 0, dtype = float, max_memory = 2**27):
+    if not (hurst > 0. and hurst < 1.):
+      raise ValueError('Wrong hurst! It must be in (0, 1)')
+
+    super(FractionalBrownianMotion, self).__init__(n_steps, dim=dim, seed=seed, dtype=dtype, max_memory=max_memory)
+    self.hurst = hurst
+    self.sigma = sigma
+    self._scale = self._embedding(self.n_steps - 1, hurst)
+
+  @staticmethod
+  def _embedding(n, hurst):
+    # square root of the eigenvalues of the circulant embedding (of size 2n)
+    # of the fractional Gaussian noise covariance, divided by the size
+    if n == 0:
+      return np.empty(shape=(0, ), dtype=float)
+    k = np.arange(n + 1, dtype=float)
+    H2 = 2. * hurst
+    cov = .5 * (np.abs(k + 1.)**H2 - 2. * k**H2 + np.abs(k - 1.)**H2)
+    row = np.concatenate((cov, cov[-2:0:-1]))
+    eigen = fft.rfft(row).real
+    if eigen.min() < -1e-8 * eigen.max():
+      raise ValueError('Wrong embedding! The circulant covariance is not positive')
+    eigen = np.concatenate((eigen, eigen[-2:0:-1]))
+    return np.sqrt(np.maximum(eigen, 0.) / len(row))
+
+  def increments(self, n_walkers):
+    n = self.n_steps - 1
+    n_series = n_walkers * self.dim
+    if n == 0 or n_series == 0:
+      return np.zeros(shape=(n_walkers, n, self.dim), dtype=float)
+
+    half = (n_series + 1) // 2
+    m = len(self._scale)
+    noise = np.empty(shape=(half, m), dtype=complex)
+    noise.real = self.random.standard_normal(size=(half, m))
+    noise.imag = self.random.standard_normal(size=(half, m))
+    noise *= self._scale
+    noise = fft.fft(noise, axis=1, overwrite_x=True)[:, :n]
+
+    series = np.concatenate((noise.real, noise.imag))[:n_series]
+    series *= self.sigma
+    return series.reshape(n_walkers, self.dim, n).transpose(0, 2, 1)
+
+
+if __name__ == '__main__':
+
+  from .measures import Measures
+
+  walk = BrownianWalk(n_steps=1000, dim=2, seed=42)
+  measures = Measures(walk.chunks(10000), stat_min=10)
+  print(measures.etamsd[:10])
@@ -84,7 +84,7 @@ def mfo(objfunc,
     sys.stdout.write('\n')
 
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
+  sol.execution_time = sol.end_time - sol.start_time
   sol.walk       = walk
   sol.best       = fmin
   sol.population = pos
@@ -82,7 +82,7 @@ def mvo(objfunc,
     sys.stdout.write('\n')
 
   sol.end_time   = time.time()
-  sol.run_time   = sol.end_time - sol.start_time
+  sol.execution_time = sol.end_time - sol.start_time
   sol.walk       = walk
   sol.best       = leader_score
   sol.population = pos
@@ -1,24 +1,31 @@
 #ifndef SOLUTION_H
 #define SOLUTION_H
 #include <memory>
+#include <limits>
+#include <string>
 
 struct Solution
 {
   int dim;
   int popsize;
   int maxiters;
+  int n_iters; // completed iterations (the filled entries of walk)
   float best;
   float execution_time;
   std::shared_ptr<std::shared_ptr<float[]>[]> walk;
+  std::shared_ptr<std::shared_ptr<float[]>[]> population; // final population (if available)
   std::string optimizer;
 
-  Solution() : dim(0), popsize(0), maxiters(0), best(0.f), execution_time(0.f), walk(nullptr), optimizer("")
+  Solution() : dim(0), popsize(0), maxiters(0), n_iters(0), best(0.f), execution_time(0.f), walk(nullptr), population(nullptr), optimizer("")
   {};
   Solution(const int &popsize, const int &dim, const int &iters, const std::string &opt)
   {
     this->dim       = dim;
     this->popsize   = popsize;
     this->maxiters  = iters;
+    this->n_iters   = 0;
+    this->best      = std::numeric_limits<float>::infinity();
+    this->execution_time = 0.f;
     this->optimizer = opt;
     this->walk.reset( new std::shared_ptr<float[]>[iters] );
   };
@@ -11,6 +11,11 @@
 #include <utility>
 #include <functional>
 #include <string>
+#include <cmath>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
 
 #include <solution.h>
 
@@ -37,6 +42,81 @@ auto printProgress = [](const int &now, const int &total, const std::chrono::hig
                         std::cout << std::flush;
                       };
 
+namespace walker
+{
+  typedef std::shared_ptr<std::shared_ptr<float[]>[]> population_t;
+
+  // population of n walkers with dim coordinates
+  inline population_t make_population (const int &n, const int &dim)
+  {
+    population_t pop(new std::shared_ptr<float[]>[n]);
+    for (int i = 0; i < n; ++i) pop[i].reset(new float[dim]);
+    return pop;
+  }
+
+  // copy of the walker x (the walk stores the best walker of each iteration)
+  inline std::shared_ptr<float[]> copy_walker (const float *x, const int &dim)
+  {
+    std::shared_ptr<float[]> w(new float[dim]);
+    std::copy_n(x, dim, w.get());
+    return w;
+  }
+
+  inline float clip (const float &x, const float &lower_bound, const float &upper_bound)
+  {
+    return (x < lower_bound) ? lower_bound : (x > upper_bound) ? upper_bound : x;
+  }
+
+  inline int argmin (const float *x, const int &n)
+  {
+    return static_cast<int>(std::min_element(x, x + n) - x);
+  }
+
+  // fitness of the walkers (only the ones flagged in mask, if any). The
+  // evaluations run in parallel with OpenMP, while the random numbers are
+  // drawn by a single engine, so the results depend only on the seed.
+  template<typename Func>
+  void evaluate (Func &objfunc, const population_t &pop, float *fitness, const int &n, const int &dim, const int &nth, const bool *mask = nullptr)
+  {
+#ifdef _OPENMP
+#pragma omp parallel for num_threads(nth) schedule(dynamic)
+#else
+    (void)nth;
+#endif
+    for (int i = 0; i < n; ++i)
+      if (mask == nullptr || mask[i])
+        fitness[i] = objfunc(pop[i].get(), dim);
+  }
+
+  inline void report (const int &verbose, const int &iteration, const int &max_iters, const float &best,
+                      const std::chrono::high_resolution_clock::time_point &start_time)
+  {
+    switch(verbose)
+    {
+      case 1: printProgress(iteration, max_iters, start_time);
+      break;
+      case 2:
+      {
+        std::cout << "iter: "
+                  << std::setw(5) << iteration             << " : "
+                  << std::setw(5) << std::setprecision(3)  << best
+                  << std::endl;
+      } break;
+      default: break;
+    }
+  }
+
+  inline void finalize (Solution &s, const population_t &pop, const float &best, const int &n_iters,
+                        const std::chrono::high_resolution_clock::time_point &start_time)
+  {
+    auto end_time = std::chrono::high_resolution_clock::now();
+    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
+    s.population = pop;
+    s.best       = best;
+    s.n_iters    = n_iters;
+  }
+}
+
 #include <bat.hpp>
 #include <bbo.hpp>
 #include <cfa.hpp>
@@ -0,0 +1,45 @@
+#ifndef WALKERS_CAPI_H
+#define WALKERS_CAPI_H
+
+#include <cstddef>
+
+#ifdef _MSC_VER
+  #define WALKERS_API __declspec(dllexport)
+#else
+  #define WALKERS_API __attribute__((visibility("default")))
+#endif
+
+extern "C"
+{
+  // objective function provided by the caller (e.g. a Python callback)
+  typedef float (*objective_t)(const float * x, int dim);
+
+  // Run the optimizer (bat, bbo, cfa, cs, gwo, pso, ssa, woa) on the
+  // built-in landscape function with the given name or, if callback is
+  // not null, on the custom objective function.
+  // params are the optimizer hyperparameters in the order of the walker::
+  // function signature; walk must be a (max_iters x dim) buffer and
+  // population a (n_population x dim) one; n_evals is the number of
+  // objective function calls and n_iters the number of completed iterations
+  // (the rows of walk after them are NaN).
+  // Return values: 0 on success, -1 unknown optimizer, -2 unknown landscape.
+  WALKERS_API int walkers_optimize (const char * optimizer,
+                                    const char * landscape,
+                                    objective_t callback,
+                                    float lower_bound,
+                                    float upper_bound,
+                                    int dim,
+                                    int n_population,
+                                    int max_iters,
+                                    const float * params,
+                                    std::size_t seed,
+                                    int verbose,
+                                    int nth,
+                                    float * walk,
+                                    float * best,
+                                    float * population,
+                                    long long * n_evals,
+                                    int * n_iters);
+}
+
+#endif // WALKERS_CAPI_H
@@ -22,19 +22,15 @@ namespace walker
                int nth = 4
                )
   {
-    //using res_t = typename std::result_of<Func(const float *)>::type; // since c++17
-    //static_assert(std::is_floating_point<res_t>::value, "Invalid type function");
+    float fmin;
 
-    typedef std::pair<int, float> best_idx;
-    int iteration = 0;
-    best_idx best;
-
-    std::unique_ptr<std::unique_ptr<float[]>[]> S  (new std::unique_ptr<float[]>[n_population]),
-                                                v  (new std::unique_ptr<float[]>[n_population]);
-    std::shared_ptr<std::shared_ptr<float[]>[]> Sol(new std::shared_ptr<float[]>[n_population]);
-    std::unique_ptr<float[]> rngt   (new float[n_population]),
-                             fitness(new float[n_population]),
-                             new_fit(new float[n_population]);
+    population_t Sol = make_population(n_population, dim),
+                 S   = make_population(n_population, dim),
+                 v   = make_population(n_population, dim);
+    std::unique_ptr<float[]> fitness(new float[n_population]),
+                             new_fit(new float[n_population]),
+                             best   (new float[dim]);
+    std::unique_ptr<bool[]>  loud(new bool[n_population]);
 
     Solution s(n_population, dim, max_iters, "BAT");
 
@@ -45,36 +41,13 @@ namespace walker
     std::cout << "BAT is optimizing..." << std::endl;
 #endif
 
-#ifdef _OPENMP
-#pragma omp declare reduction (minPair : best_idx : omp_out = omp_in.second < omp_out.second ? omp_in : omp_out) initializer(omp_priv = omp_orig)
-#pragma omp parallel num_threads(nth)
-  {
-#endif
-#ifdef _OPENMP
-    std::mt19937 engine(seed + omp_get_thread_num());
-#else
     std::mt19937 engine(seed);
-#endif
-
     std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
     std::uniform_real_distribution<float> Qbox(Qmin, Qmax);
     std::uniform_real_distribution<float> rng(0.f, 1.f);
     std::normal_distribution<float> normal(0.f, 1.f);
 
-#ifdef _OPENMP
-#pragma omp for
-#endif
-    for (int i = 0; i < n_population; ++i)
-    {
-      S[i]   = std::make_unique<float[]>(dim);
-      Sol[i] = std::make_unique<float[]>(dim);
-      v[i]   = std::make_unique<float[]>(dim);
-    }
-
     // initialize
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
     for (int i = 0; i < n_population; ++i)
       for (int j = 0; j < dim; ++j)
       {
@@ -82,125 +55,56 @@ namespace walker
         Sol[i][j] = bound_rng(engine);
       }
 
-    best.second = inf;
-    best.first  = 0;
-
-#ifdef _OPENMP
-#pragma omp for reduction(minPair : best)
-#endif
-    for (int i = 0; i < n_population; ++i)
-    {
-      fitness[i] = objfunc(Sol[i].get(), dim);
-      // find the initial best solution
-      best.first  = fitness[i] < best.second ? i          : best.first;
-      best.second = fitness[i] < best.second ? fitness[i] : best.second;
-    }
-
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
-    for (int i = 0; i < n_population; ++i)
-      for (int j = 0; j < dim; ++j)
-      {
-        v[i][j] += Qbox(engine) * (Sol[i][j] - Sol[best.first][j]);
-        S[i][j]  = Sol[i][j] + v[i][j];
-        // pulse rate
-        S[i][j]  = (rngt[i] > r) ? Sol[best.first][j] + step * normal(engine) : S[i][j];
-      }
+    evaluate(objfunc, Sol, fitness.get(), n_population, dim, nth);
+    int idx = argmin(fitness.get(), n_population);
+    fmin = fitness[idx];
+    std::copy_n(Sol[idx].get(), dim, best.get());
 
-    while (true)
+    // main loop
+    for (int iteration = 0; iteration < max_iters; ++iteration)
     {
-      // Evaluate new solutions
-#ifdef _OPENMP
-#pragma omp for
-#endif
+      // Loop over all bats (solutions)
       for (int i = 0; i < n_population; ++i)
       {
-        new_fit[i] = objfunc(S[i].get(), dim);
-        rngt[i]    = rng(engine);
-      }
+        const float Q     = Qbox(engine);
+        const bool  pulse = rng(engine) > r;
+        loud[i]    = rng(engine) < A;
+        new_fit[i] = inf;
 
-      // Update if the solution improves
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
-      for (int i = 0; i < n_population; ++i)
         for (int j = 0; j < dim; ++j)
         {
-          // troubles with random (same also in next loop!)
-          Sol[i][j]  = (new_fit[i] <= fitness[i] && rngt[i] < A) ? S[i][j]     :  Sol[i][j];
-          Sol[i][j]  = (Sol[i][j]  < lower_bound)                ? lower_bound : (Sol[i][j] > upper_bound) ? upper_bound : Sol[i][j];
+          v[i][j] += Q * (Sol[i][j] - best[j]);
+          // pulse rate: local solution around the best one
+          S[i][j]  = pulse ? best[j] + step * normal(engine) : Sol[i][j] + v[i][j];
         }
-
-    // Update the current best solution
-    best.second = inf;
-    best.first  = 0;
-#ifdef _OPENMP
-#pragma omp for reduction(minPair : best)
-#endif
-    for (int i = 0; i < n_population; ++i)
-    {
-      fitness[i] = (new_fit[i] <= fitness[i] && rngt[i] < A) ? new_fit[i] : fitness[i];
-      // find the new best solution
-      best.first  = fitness[i] < best.second ? i          : best.first;
-      best.second = fitness[i] < best.second ? fitness[i] : best.second;
-
-      rngt[i]    = rng(engine);
-    }
-
-    s.walk[iteration] = Sol[best.first];
-
-#ifdef _OPENMP
-#pragma omp single nowait
-    {
-#endif
-      switch(verbose)
-      {
-        case 1: printProgress(iteration, max_iters, start_time);
-        break;
-        case 2:
-        {
-          std::cout << "iter: "
-                    << std::setw(5) << iteration             << " : "
-                    << std::setw(5) << std::setprecision(3)  << best.second
-                    << std::endl;
-        } break;
-        default: break;
       }
-#ifdef _OPENMP
-    } // close single section
-#endif
 
-#ifdef _OPENMP
-#pragma omp single
-#endif
-    ++iteration;
-
-    if (iteration >= max_iters) break;
+      // only the solutions which can be accepted (loudness) are evaluated
+      evaluate(objfunc, S, new_fit.get(), n_population, dim, nth, loud.get());
 
-    // Loop over all bats(solutions)
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
-    for (int i = 0; i < n_population; ++i)
-      for (int j = 0; j < dim; ++j)
+      // Update if the solution improves
+      for (int i = 0; i < n_population; ++i)
       {
-        v[i][j] += Qbox(engine) * (Sol[i][j] - S[best.first][j]);
-        S[i][j]  = Sol[i][j] + v[i][j];
-        // pulse rate
-        S[i][j]  = (rngt[i] > r) ? S[best.first][j] + step * normal(engine) : S[i][j];
+        if (loud[i] && new_fit[i] <= fitness[i])
+        {
+          std::copy_n(S[i].get(), dim, Sol[i].get());
+          fitness[i] = new_fit[i];
+        }
+        for (int j = 0; j < dim; ++j)
+          Sol[i][j] = clip(Sol[i][j], lower_bound, upper_bound);
       }
 
-    }
+      // Update the current best solution
+      idx = argmin(fitness.get(), n_population);
+      fmin = fitness[idx];
+      std::copy_n(Sol[idx].get(), dim, best.get());
 
+      s.walk[iteration] = copy_walker(best.get(), dim);
 
-#ifdef _OPENMP
-  } // end parallel section
-#endif
+      report(verbose, iteration, max_iters, fmin, start_time);
+    } // end for
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
-    s.best = best.second;
+    finalize(s, Sol, fmin, max_iters, start_time);
 
     return s;
   }
@@ -18,24 +18,20 @@ namespace walker
                int verbose = 1,
                int nth = 4)
   {
-#ifdef _OPENMP
-    nth -= nth % 2;
-    const int diff_size = n_population % nth,
-              size      = diff_size ? n_population - diff_size : n_population;
-#endif
-    int iteration = 0;
-
-    std::shared_ptr<std::shared_ptr<float[]>[]> positions(new std::shared_ptr<float[]>[n_population]);
-
-    std::unique_ptr<float[]> fitness(new float[n_population]);
-    std::unique_ptr<int[]> rank(new int[n_population]);
+    const int n_elite = std::max(1, std::min(static_cast<int>(elite), n_population - 1));
+
+    population_t positions = make_population(n_population, dim),
+                 new_pos   = make_population(n_population, dim),
+                 elite_pos = make_population(n_elite, dim);
+    std::unique_ptr<float[]> fitness  (new float[n_population]),
+                             new_fit  (new float[n_population]),
+                             elite_cos(new float[n_elite]),
+                             lambda1  (new float[n_population]),
+                             cmu      (new float[n_population]);
+    std::unique_ptr<int[]>   order(new int[n_population]);
 
     Solution s(n_population, dim, max_iters, "BBO");
 
-    std::mt19937 engine(seed);
-    std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
-    std::uniform_real_distribution<float> rng(0.f, 1.f);
-
     // Initialize timer for the experiment
     auto start_time = std::chrono::high_resolution_clock::now();
 
@@ -43,102 +39,97 @@ namespace walker
     std::cout << "BBO is optimizing..." << std::endl;
 #endif
 
-#ifdef _OPENMP
-#pragma omp parallel num_threads(nth)
-  {
-#endif
-
-#ifdef _OPENMP
-#pragma omp for
+    // emigration rates decreasing linearly with the rank of the habitat
+    float smu = 0.f;
     for (int i = 0; i < n_population; ++i)
     {
-      positions[i] = std::make_unique<float[]>(dim);
-      rank[i] = i;
+      const float mu = static_cast<float>(n_population - i) / (n_population + 1);
+      lambda1[i] = 1.f - mu;
+      smu += mu;
+      cmu[i] = smu;
     }
-#else
-    std::generate_n(positions.get(), n_population, [&](){return std::make_unique<float[]>(dim);});
-    std::iota(rank.get(), rank.get() + n_population, 0);
-#endif
 
-    // initialize the positions/solutions
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
+    std::mt19937 engine(seed);
+    std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
+    std::uniform_real_distribution<float> rng(0.f, 1.f);
+    std::uniform_real_distribution<float> wheel(0.f, smu);
+
+    // sort the population by fitness (new_pos/new_fit hold the unsorted one)
+    auto rank = [&]()
+                {
+                  std::iota(order.get(), order.get() + n_population, 0);
+                  std::stable_sort(order.get(), order.get() + n_population, [&](const int &a, const int &b){ return new_fit[a] < new_fit[b]; });
+                };
+
+    // initialize the habitats
     for (int i = 0; i < n_population; ++i)
       for (int j = 0; j < dim; ++j)
-        positions[i].get()[j] = bound_rng(engine);
-
-#ifdef _OPENMP
-#pragma omp for
-    for (int i = 0; i < n_population; ++i) fitness[i] = objfunc(positions[i].get(), dim);
-#else
-    std::transform(positions.get(), positions.get() + n_population,
-                   fitness.get(),
-                   [&](const auto &pop)
-                   {
-                    return objfunc(pop.get(), dim);
-                  });
-#endif
+        new_pos[i][j] = bound_rng(engine);
 
-#ifdef _OPENMP
-#pragma omp single
+    evaluate(objfunc, new_pos, new_fit.get(), n_population, dim, nth);
+    rank();
+    for (int i = 0; i < n_population; ++i)
     {
-      mergeargsort_parallel_omp(rank.get(), fitness.get(), 0, size, nth, [&](const int &a1, const int &a2){return fitness[a1] < fitness[a2];});
-      if (diff_size)
-      {
-        std::sort(rank.get() + size, rank.get() + n_population, [&](const int &a1, const int &a2){return fitness[a1] < fitness[a2];});
-        std::inplace_merge(rank.get(), rank.get() + size, rank.get() + n_population, [&](const int &a1, const int &a2){return fitness[a1] < fitness[a2];});
-      }
+      std::copy_n(new_pos[order[i]].get(), dim, positions[i].get());
+      fitness[i] = new_fit[order[i]];
     }
-#else
-    std::sort(rank.get(), rank.get() + n_population, [&](const int &a1, const int &a2){return fitness[a1] < fitness[a2];});
-#endif
 
     // main loop
-    while(iteration < max_iters)
+    for (int iteration = 0; iteration < max_iters; ++iteration)
     {
+      for (int e = 0; e < n_elite; ++e)
+      {
+        std::copy_n(positions[e].get(), dim, elite_pos[e].get());
+        elite_cos[e] = fitness[e];
+      }
 
+      // migration: the feature j of the habitat i immigrates from a habitat
+      // chosen with a roulette wheel over the emigration rates
+      for (int i = 0; i < n_population; ++i)
+        for (int j = 0; j < dim; ++j)
+        {
+          const bool migrate = rng(engine) < lambda1[i];
+          const int  k = std::max(static_cast<int>(std::lower_bound(cmu.get(), cmu.get() + n_population, wheel(engine)) - cmu.get()) - 1, 0);
+          new_pos[i][j] = migrate ? positions[k][j] : positions[i][j];
+        }
+
+      // mutation
+      for (int i = 0; i < n_population; ++i)
+        for (int j = 0; j < dim; ++j)
+        {
+          const bool mut = pmutate > rng(engine);
+          const float x  = bound_rng(engine);
+          new_pos[i][j]  = mut ? x : new_pos[i][j];
+        }
 
-      s.walk[iteration] = positions[rank[0]];
-
+      evaluate(objfunc, new_pos, new_fit.get(), n_population, dim, nth);
 
-#ifdef _OPENMP
-#pragma omp single nowait
-    {
-#endif
-      switch(verbose)
+      // the elites replace the worst habitats: merge of the best new habitats
+      // with the (sorted) elites, which go before the equal fitness values
+      rank();
+      for (int i = 0, k = 0, e = 0; i < n_population; ++i)
       {
-        case 1: printProgress(iteration, max_iters, start_time);
-        break;
-        case 2:
+        if (e < n_elite && (k >= n_population - n_elite || elite_cos[e] <= new_fit[order[k]]))
         {
-          std::cout << "iter: "
-                    << std::setw(5) << iteration             << " : "
-                    << std::setw(5) << std::setprecision(3)  << fitness[rank[0]]
-                    << std::endl;
-        } break;
-        default: break;
+          std::copy_n(elite_pos[e].get(), dim, positions[i].get());
+          fitness[i] = elite_cos[e++];
+        }
+        else
+        {
+          std::copy_n(new_pos[order[k]].get(), dim, positions[i].get());
+          fitness[i] = new_fit[order[k++]];
+        }
       }
-#ifdef _OPENMP
-    } // close single section
-#endif
 
-#ifdef _OPENMP
-#pragma omp single
-#endif
-      ++iteration;
-    } // end while
+      s.walk[iteration] = copy_walker(positions[0].get(), dim);
 
-#ifdef _OPENMP
-  } // end parallel section
-#endif
+      report(verbose, iteration, max_iters, fitness[0], start_time);
+    } // end for
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
-    s.best = fitness[0];
+    finalize(s, positions, fitness[0], max_iters, start_time);
 
     return s;
   }
 }
 
-#endif //BBO_H
+#endif // BBO_H
@@ -16,16 +16,22 @@ namespace walker
                int verbose = 1,
                int nth = 4)
   {
-    typedef std::pair<int, float> best_idx;
-    int iteration = 0,
-        m   = n_population / 4;
-
-    best_idx best;
-    best.second = inf;
-    best.first  = 0;
-    float fitness, avg_best, R, V, W;
-
-    std::shared_ptr<std::shared_ptr<float[]>[]> positions(new std::shared_ptr<float[]>[n_population]);
+    // the four groups of the population (the walkers m, g22 and g32 between
+    // them keep their position, as in the Python version)
+    const int m   = n_population / 4,
+              g21 = m + 1,
+              g22 = 2 * m,
+              g31 = g22 + 1,
+              g32 = 3 * m,
+              g41 = g32 + 1;
+    float fmin;
+
+    population_t positions = make_population(n_population, dim);
+    std::unique_ptr<float[]> fitness(new float[n_population]),
+                             best   (new float[dim]),
+                             Rt     (new float[max_iters]),
+                             Vt     (new float[max_iters]),
+                             Wt     (new float[max_iters]);
 
     Solution s(n_population, dim, max_iters, "CFA");
 
@@ -36,129 +42,61 @@ namespace walker
     std::cout << "CFA is optimizing..." << std::endl;
 #endif
 
-#ifdef _OPENMP
-#pragma omp declare reduction (minPair : best_idx : omp_out = omp_in.second < omp_out.second ? omp_in : omp_out) initializer(omp_priv = omp_orig)
-#pragma omp parallel num_threads(nth) private(fitness, R, V, W)
-  {
-#endif
-
-#ifdef _OPENMP
-    std::mt19937 engine(seed + omp_get_thread_num());
-#else
     std::mt19937 engine(seed);
-#endif
+    std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
 
-    std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound),
-                                          rngR(-1.f, 2.f),
-                                          rngV(-1.5f, 1.5f),
-                                          rngW(-1.f, 1.f);
-
-#ifdef _OPENMP
-#pragma omp for
-    for (int i = 0; i < n_population; ++i)
-      positions[i] = std::make_unique<float[]>(dim);
-#else
-    std::generate_n(positions.get(), n_population, [&](){return std::make_unique<float[]>(dim);});
-#endif
-
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
+    // initialize the positions/solutions
     for (int i = 0; i < n_population; ++i)
       for (int j = 0; j < dim; ++j)
         positions[i][j] = bound_rng(engine);
 
-#ifdef _OPENMP
-#pragma omp for reduction(minPair : best)
-#endif
-    for (int i = 0; i < n_population; ++i)
-    {
-      fitness = objfunc(positions[i].get(), dim);
-      // find the initial best solution
-      best.first   = fitness < best.second  ? i       : best.first;
-      best.second  = fitness < best.second  ? fitness : best.second;
-    }
+    auto update_best = [&]()
+                       {
+                         evaluate(objfunc, positions, fitness.get(), n_population, dim, nth);
+                         const int idx = argmin(fitness.get(), n_population);
+                         fmin = fitness[idx];
+                         std::copy_n(positions[idx].get(), dim, best.get());
+                       };
+    update_best();
+
+    std::uniform_real_distribution<float> R_rng(-1.f, 2.f), V_rng(-1.5f, 1.5f), W_rng(-1.f, 1.f);
+    std::generate_n(Rt.get(), max_iters, [&](){ return R_rng(engine); });
+    std::generate_n(Vt.get(), max_iters, [&](){ return V_rng(engine); });
+    std::generate_n(Wt.get(), max_iters, [&](){ return W_rng(engine); });
 
     // main loop
-    while(iteration < max_iters)
+    for (int iteration = 0; iteration < max_iters; ++iteration)
     {
-      best.second = inf;
-      best.first  = 0;
-
-      R = rngR(engine); // [-1, 2]
-      V = rngV(engine); // [-1.5, 1.5]
-      W = rngW(engine); // [-1, 1]
-
-#ifdef _OPENMP
-      avg_best = 0.f;
-#pragma omp for reduction(+ : avg_best)
-      for (int i = 0; i < dim; ++i)
-        avg_best += positions[best.first][i];
-#else
-      avg_best = std::accumulate(positions[best.first].get(),
-                                 positions[best.first].get() + dim,
-                                 0.f) / dim;
-#endif
+      const float R = Rt[iteration],
+                  V = Vt[iteration],
+                  W = Wt[iteration];
+      const float avg_best = std::accumulate(best.get(), best.get() + dim, 0.f) / dim;
 
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
       for (int i = 0; i < m; ++i)
         for (int j = 0; j < dim; ++j)
-        {
-          positions[i      ][j] = R *  positions[i][j] + (positions[best.first][j] - positions[i][j]);
-          positions[i +   m][j] = V * (positions[best.first][j] - positions[i + m][j]) + positions[best.first][j];
-          positions[i + 2*m][j] = W * (positions[best.first][j] - avg_best) + positions[best.first][j];
-          positions[i + 3*m][j] = bound_rng(engine);
-        }
-
-#ifdef _OPENMP
-#pragma omp for reduction(minPair : best)
-#endif
-      for (int i = 0; i < n_population; ++i)
-      {
-        fitness = objfunc(positions[i].get(), dim);
-        // find the initial best solution
-        best.first   = fitness < best.second  ? i       : best.first;
-        best.second  = fitness < best.second  ? fitness : best.second;
-      }
-
-      s.walk[iteration] = positions[best.first];
-
-#ifdef _OPENMP
-#pragma omp single nowait
-    {
-#endif
-      switch(verbose)
-      {
-        case 1: printProgress(iteration, max_iters, start_time);
-        break;
-        case 2:
-        {
-          std::cout << "iter: "
-                    << std::setw(5) << iteration             << " : "
-                    << std::setw(5) << std::setprecision(3)  << best.second
-                    << std::endl;
-        } break;
-        default: break;
-      }
-#ifdef _OPENMP
-    } // close single section
-#endif
+          positions[i][j] = R * positions[i][j] + (best[j] - positions[i][j]);
 
-#ifdef _OPENMP
-#pragma omp single
-#endif
-      ++iteration;
-    } // end while
+      for (int i = g21; i < g22; ++i)
+        for (int j = 0; j < dim; ++j)
+          positions[i][j] = V * (best[j] - positions[i][j]) + best[j];
 
-#ifdef _OPENMP
-  } // end parallel section
-#endif
+      for (int i = g31; i < g32; ++i)
+        for (int j = 0; j < dim; ++j)
+          positions[i][j] = W * (best[j] - avg_best) + best[j];
+
+      for (int i = g41; i < n_population; ++i)
+        for (int j = 0; j < dim; ++j)
+          positions[i][j] = bound_rng(engine);
+
+      // the best walker of the current population (not elitist)
+      update_best();
+
+      s.walk[iteration] = copy_walker(best.get(), dim);
+
+      report(verbose, iteration, max_iters, fmin, start_time);
+    } // end for
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
-    s.best = best.second;
+    finalize(s, positions, fmin, max_iters, start_time);
 
     return s;
   }
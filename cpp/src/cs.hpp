@@ -13,14 +13,26 @@ namespace walker
               const int &n_population,
               const int &max_iters,
               float pa = .25f, // discovery rate of alien eggs/solution
+              float beta = 1.5f,
               std::size_t seed = 0,
               int verbose = 1,
               int nth = 4
               )
   {
-    typedef std::pair<int, float> best_idx;
-    int iteration = 0;
-    best_idx best;
+    // scale of the Levy flights (Mantegna algorithm)
+    const float sigma = std::pow(std::tgamma(1.f + beta) * std::sin(static_cast<float>(M_PI) * beta * .5f) /
+                                (std::tgamma((1.f + beta) * .5f) * beta * std::pow(2.f, (beta - 1.f) * .5f)), 1.f / beta);
+    float fmin;
+
+    population_t positions = make_population(n_population, dim),
+                 new_pos   = make_population(n_population, dim),
+                 nests     = make_population(n_population, dim);
+    std::unique_ptr<float[]> fitness(new float[n_population]),
+                             fit_new(new float[n_population]),
+                             best   (new float[dim]);
+    std::unique_ptr<int[]>   perm1(new int[n_population]),
+                             perm2(new int[n_population]);
+    std::unique_ptr<bool[]>  dirty(new bool[n_population]);
 
     Solution s(n_population, dim, max_iters, "CS");
 
@@ -31,62 +43,89 @@ namespace walker
     std::cout << "CS is optimizing..." << std::endl;
 #endif
 
-#ifdef _OPENMP
-#pragma omp parallel num_threads(nth)
-  {
-#endif
-
-#ifdef _OPENMP
-    std::mt19937 engine(seed + omp_get_thread_num());
-#else
     std::mt19937 engine(seed);
-#endif
-
-    std::uniform_real_distribution<float> rng(lower_bound, upper_bound);
+    std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
+    std::uniform_real_distribution<float> rng(0.f, 1.f);
+    std::normal_distribution<float> normal(0.f, 1.f);
+
+    // initialize the nests
+    for (int i = 0; i < n_population; ++i)
+      for (int j = 0; j < dim; ++j)
+        positions[i][j] = bound_rng(engine);
+
+    evaluate(objfunc, positions, fitness.get(), n_population, dim, nth);
+    int idx = argmin(fitness.get(), n_population);
+    fmin = fitness[idx];
+    std::copy_n(positions[idx].get(), dim, best.get());
+
+    // replace the nests whose new fitness is not worse
+    auto replace = [&]()
+                   {
+                     for (int i = 0; i < n_population; ++i)
+                       if (fit_new[i] <= fitness[i])
+                       {
+                         fitness[i] = fit_new[i];
+                         std::copy_n(new_pos[i].get(), dim, positions[i].get());
+                       }
+                   };
 
     // main loop
-    while(iteration < max_iters)
+    for (int iteration = 0; iteration < max_iters; ++iteration)
     {
+      // Levy flights around the best nest
+      for (int i = 0; i < n_population; ++i)
+        for (int j = 0; j < dim; ++j)
+        {
+          const float u = normal(engine) * sigma;
+          const float v = normal(engine);
+          const float step = u / std::pow(std::fabs(v), 1.f / beta);
+          const float stepsize = 1e-2f * (step * (positions[i][j] - best[j]));
+          new_pos[i][j] = clip(positions[i][j] + stepsize * normal(engine), lower_bound, upper_bound);
+        }
+
+      evaluate(objfunc, new_pos, fit_new.get(), n_population, dim, nth);
+      replace();
+
+      // discovery of the alien eggs: only the nests it changes are re-evaluated
+      std::iota(perm1.get(), perm1.get() + n_population, 0);
+      std::iota(perm2.get(), perm2.get() + n_population, 0);
+      std::shuffle(perm1.get(), perm1.get() + n_population, engine);
+      std::shuffle(perm2.get(), perm2.get() + n_population, engine);
+
+      for (int i = 0; i < n_population; ++i)
+        std::copy_n(new_pos[i].get(), dim, nests[i].get());
+
+      for (int i = 0; i < n_population; ++i)
+      {
+        dirty[i] = false;
+        for (int j = 0; j < dim; ++j)
+        {
+          const bool discovered = rng(engine) > pa;
+          const float alien = rng(engine);
+          if (discovered)
+          {
+            new_pos[i][j] += alien * (nests[perm1[i]][j] - nests[perm2[i]][j]);
+            dirty[i] = true;
+          }
+        }
+      }
 
+      evaluate(objfunc, new_pos, fit_new.get(), n_population, dim, nth, dirty.get());
+      replace();
 
-
-
-      //s.walk[iteration] = ;
-
-#ifdef _OPENMP
-#pragma omp single nowait
-    {
-#endif
-      switch(verbose)
+      idx = argmin(fit_new.get(), n_population);
+      if (fit_new[idx] < fmin)
       {
-        case 1: printProgress(iteration, max_iters, start_time);
-        break;
-        case 2:
-        {
-          std::cout << "iter: "
-                    << std::setw(5) << iteration             << " : "
-                    //<< std::setw(5) << std::setprecision(3)  << best.second
-                    << std::endl;
-        } break;
-        default: break;
+        fmin = fit_new[idx];
+        std::copy_n(new_pos[idx].get(), dim, best.get());
       }
-#ifdef _OPENMP
-    } // close single section
-#endif
 
-#ifdef _OPENMP
-#pragma omp single
-#endif
-      ++iteration;
-    } // end while
+      s.walk[iteration] = copy_walker(best.get(), dim);
 
-#ifdef _OPENMP
-  } // end parallel section
-#endif
+      report(verbose, iteration, max_iters, fmin, start_time);
+    } // end for
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
-    s.best = best.second;
+    finalize(s, positions, fmin, max_iters, start_time);
 
     return s;
   }
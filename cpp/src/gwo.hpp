@@ -16,17 +16,15 @@ namespace walker
                int verbose = 1,
                int nth = 4)
   {
-    typedef std::pair<int, float> best_idx;
-    int iteration = 0,
-        alpha_pos = 0, beta_pos = 0, delta_pos = 0;
     float alpha_score = inf,
           beta_score  = inf,
-          delta_score = inf,
-          a, fitness;
-    best_idx best;
+          delta_score = inf;
 
-    std::shared_ptr<std::shared_ptr<float[]>[]> positions(new std::shared_ptr<float[]>[n_population]);
-    std::array<float, 3> r1, r2;
+    population_t positions = make_population(n_population, dim);
+    std::unique_ptr<float[]> fitness  (new float[n_population]),
+                             alpha_pos(new float[dim]),
+                             beta_pos (new float[dim]),
+                             delta_pos(new float[dim]);
 
     Solution s(n_population, dim, max_iters, "GWO");
 
@@ -37,125 +35,75 @@ namespace walker
     std::cout << "GWO is optimizing..." << std::endl;
 #endif
 
-#ifdef _OPENMP
-#pragma omp declare reduction (minPair : best_idx : omp_out = omp_in.second < omp_out.second ? omp_in : omp_out) initializer(omp_priv = omp_orig)
-#pragma omp parallel num_threads(nth) private(fitness, a, alpha_pos, alpha_score, beta_pos, beta_score, delta_pos, delta_score)
-  {
-#endif
-
-#ifdef _OPENMP
-    std::mt19937 engine(seed + omp_get_thread_num());
-#else
     std::mt19937 engine(seed);
-#endif
-
     std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
     std::uniform_real_distribution<float> rng(0.f, 1.f);
 
-#ifdef _OPENMP
-#pragma omp for
-    for (int i = 0; i < n_population; ++i) positions[i] = std::make_unique<float[]>(dim);
-#else
-    std::generate_n(positions.get(), n_population, [&](){return std::make_unique<float[]>(dim);});
-#endif
-
     // initialize the positions/solutions
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
     for (int i = 0; i < n_population; ++i)
       for (int j = 0; j < dim; ++j)
         positions[i][j] = bound_rng(engine);
 
+    std::fill_n(alpha_pos.get(), dim, 0.f);
+    std::fill_n(beta_pos.get(),  dim, 0.f);
+    std::fill_n(delta_pos.get(), dim, 0.f);
+
+    // leader - |C * leader - x| * A with A = 2 a r1 - a and C = 2 r2
+    auto hunt = [&](const float &leader, const float &x, const float &a)
+                {
+                  const float A = 2.f * a * rng(engine) - a;
+                  const float C = 2.f * rng(engine);
+                  return leader - std::fabs(C * leader - x) * A;
+                };
+
     // main loop
-    while(iteration < max_iters)
+    for (int iteration = 0; iteration < max_iters; ++iteration)
     {
-      best.second = inf;
-      best.first  = 0;
+      // a decreases linearly from 2 to 0
+      const float a = max_iters > 1 ? 2.f - iteration * 2.f / (max_iters - 1) : 2.f;
 
-#ifdef _OPENMP
-#pragma omp for reduction(minPair : best)
-#endif
       for (int i = 0; i < n_population; ++i)
-      {
-        fitness = objfunc(positions[i].get(), dim);
-        // find the initial best solution
-        best.first   = fitness < best.second  ? i       : best.first;
-        best.second  = fitness < best.second  ? fitness : best.second;
-      }
-
-      alpha_pos   = best.second < alpha_score ? best.first  : alpha_pos;
-      alpha_score = best.second < alpha_score ? best.second : alpha_score;
+        for (int j = 0; j < dim; ++j)
+          positions[i][j] = clip(positions[i][j], lower_bound, upper_bound);
 
-      beta_pos    = (best.second > alpha_score && best.second < beta_score) ? best.first  : beta_pos;
-      beta_score  = (best.second > alpha_score && best.second < beta_score) ? best.second : beta_score;
+      evaluate(objfunc, positions, fitness.get(), n_population, dim, nth);
 
-      delta_pos   = (best.second > alpha_score && best.second > beta_score && best.second < delta_score) ? best.first  : delta_pos;
-      delta_score = (best.second > alpha_score && best.second > beta_score && best.second < delta_score) ? best.second : delta_score;
+      // update alpha, beta and delta with the best wolf of the pack
+      const int minpos = argmin(fitness.get(), n_population);
+      const float fmin = fitness[minpos];
 
-      a = 2.f - iteration * 2.f / max_iters; // a decreases linearly from 2 to 0
+      if (fmin < alpha_score)
+      {
+        alpha_score = fmin;
+        std::copy_n(positions[minpos].get(), dim, alpha_pos.get());
+      }
+      if (fmin > alpha_score && fmin < beta_score)
+      {
+        beta_score = fmin;
+        std::copy_n(positions[minpos].get(), dim, beta_pos.get());
+      }
+      if (fmin > alpha_score && fmin > beta_score && fmin < delta_score)
+      {
+        delta_score = fmin;
+        std::copy_n(positions[minpos].get(), dim, delta_pos.get());
+      }
 
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
       for (int i = 0; i < n_population; ++i)
         for (int j = 0; j < dim; ++j)
         {
-          r1[0] = rng(engine);
-          r1[1] = rng(engine);
-          r1[2] = rng(engine);
-          r2[0] = rng(engine);
-          r2[1] = rng(engine);
-          r2[2] = rng(engine);
-          (positions.get())[i][j] = (
-                              (positions[alpha_pos][j] - std::fabs(2.f * r2[i*3]     * positions[alpha_pos][j] - positions[i][j]) * 2.f * a * r1[i*3] - a)
-                              +
-                              (positions[beta_pos][j]  - std::fabs(2.f * r2[i*3 + 1] * positions[beta_pos][j]  - positions[i][j]) * 2.f * a * r1[i*3 + 1] - a)
-                              +
-                              (positions[delta_pos][j] - std::fabs(2.f * r2[i*3 + 2] * positions[delta_pos][j] - positions[i][j]) * 2.f * a * r1[i*3 + 2] - a)
-                            ) * .333333333f;
-          // clip
-          (positions.get())[i][j] = (positions[i][j] < lower_bound) ? lower_bound :
-                                    (positions[i][j] > upper_bound) ? upper_bound :
-                                     positions[i][j];
+          const float x = positions[i][j];
+          const float D_alpha = hunt(alpha_pos[j], x, a);
+          const float D_beta  = hunt(beta_pos[j],  x, a);
+          const float D_delta = hunt(delta_pos[j], x, a);
+          positions[i][j] = (D_alpha + D_beta + D_delta) / 3.f;
         }
 
-      s.walk[iteration] = positions[alpha_pos];
+      s.walk[iteration] = copy_walker(alpha_pos.get(), dim);
 
-#ifdef _OPENMP
-#pragma omp single nowait
-      {
-#endif
-        switch(verbose)
-        {
-          case 1: printProgress(iteration, max_iters, start_time);
-          break;
-          case 2:
-          {
-            std::cout << "iter: "
-                      << std::setw(5) << iteration             << " : "
-                      << std::setw(5) << std::setprecision(3)  << alpha_score
-                      << std::endl;
-          } break;
-          default: break;
-        }
-#ifdef _OPENMP
-      } // close single section
-#endif
-
-#ifdef _OPENMP
-#pragma omp single
-#endif
-      ++iteration;
-    } // end while
-
-#ifdef _OPENMP
-  } // end parallel section
-#endif
+      report(verbose, iteration, max_iters, alpha_score, start_time);
+    } // end for
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
-    s.best = alpha_score;
+    finalize(s, positions, alpha_score, max_iters, start_time);
 
     return s;
   }
@@ -21,17 +21,16 @@ namespace walker
                int verbose = 1,
                int nth = 4)
   {
-    typedef std::pair<int, float> best_idx;
-    int iteration = 0;
-    best_idx best;
-
-    std::shared_ptr<std::shared_ptr<float[]>[]> positions(new std::shared_ptr<float[]>[n_population]);
-    std::unique_ptr<std::unique_ptr<float[]>[]> velocity (new std::unique_ptr<float[]>[n_population]);
-    std::unique_ptr<float[]> fitness(new float[n_population]);
+    population_t positions = make_population(n_population, dim),
+                 velocity  = make_population(n_population, dim),
+                 p_best    = make_population(n_population, dim);
+    std::unique_ptr<float[]> fitness(new float[n_population]),
+                             p_score(new float[n_population]),
+                             g_best (new float[dim]);
+    float g_score = inf;
 
     Solution s(n_population, dim, max_iters, "PSO");
 
-
     // Initialize timer for the experiment
     auto start_time = std::chrono::high_resolution_clock::now();
 
@@ -39,101 +38,65 @@ namespace walker
     std::cout << "PSO is optimizing..." << std::endl;
 #endif
 
-#ifdef _OPENMP
-#pragma omp declare reduction (minPair : best_idx : omp_out = omp_in.second < omp_out.second ? omp_in : omp_out) initializer(omp_priv = omp_orig)
-#pragma omp parallel num_threads(nth)
-  {
-#endif
-
-#ifdef _OPENMP
-    std::mt19937 engine(seed + omp_get_thread_num());
-#else
     std::mt19937 engine(seed);
-#endif
-
     std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
     std::uniform_real_distribution<float> rng(0.f, 1.f);
 
-#ifdef _OPENMP
-#pragma omp for
-    for (int i = 0; i < n_population; ++i)
-    {
-      positions[i] = std::make_unique<float[]>(dim);
-      velocity[i]  = std::make_unique<float[]>(dim);
-      fitness[i]   = inf;
-    }
-#else
-    std::generate_n(positions.get(), n_population, [&](){return std::make_unique<float[]>(dim);});
-    std::generate_n(velocity.get(),  n_population, [&](){return std::make_unique<float[]>(dim);});
-    std::fill_n(fitness.get(), n_population, inf);
-#endif
-
     // initialize the positions/solutions
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
     for (int i = 0; i < n_population; ++i)
+    {
       for (int j = 0; j < dim; ++j)
       {
         positions[i][j] = bound_rng(engine);
         velocity[i][j]  = 0.f;
+        p_best[i][j]    = 0.f;
       }
+      p_score[i] = inf;
+    }
+    std::fill_n(g_best.get(), dim, 0.f);
 
     // main loop
-    while(iteration < max_iters)
+    for (int iteration = 0; iteration < max_iters; ++iteration)
     {
-      best.second = inf;
-      best.first  = 0;
+      // inertia weight decreasing linearly from wmax to wmin
+      const float w = max_iters > 1 ? wmax + (wmin - wmax) * iteration / (max_iters - 1) : wmax;
 
-#ifdef _OPENMP
-#pragma omp for reduction(minPair : best)
-#endif
       for (int i = 0; i < n_population; ++i)
-      {
-        float f = objfunc(positions[i].get(), dim);
-        // find the initial best solution
-        best.first   = f < best.second  ? i : best.first;
-        best.second  = f < best.second  ? f : best.second;
+        for (int j = 0; j < dim; ++j)
+          positions[i][j] = clip(positions[i][j], lower_bound, upper_bound);
 
-        fitness[i]   = f < fitness[i]   ? f : fitness[i];
-      }
+      evaluate(objfunc, positions, fitness.get(), n_population, dim, nth);
 
-      s.walk[iteration] = positions[best.first];
+      // update the personal and the global best
+      for (int i = 0; i < n_population; ++i)
+        if (fitness[i] < p_score[i])
+        {
+          p_score[i] = fitness[i];
+          std::copy_n(positions[i].get(), dim, p_best[i].get());
+        }
 
-#ifdef _OPENMP
-#pragma omp single nowait
+      const int idx = argmin(fitness.get(), n_population);
+      if (fitness[idx] < g_score)
       {
-#endif
-        switch(verbose)
+        g_score = fitness[idx];
+        std::copy_n(positions[idx].get(), dim, g_best.get());
+      }
+
+      for (int i = 0; i < n_population; ++i)
+        for (int j = 0; j < dim; ++j)
         {
-          case 1: printProgress(iteration, max_iters, start_time);
-          break;
-          case 2:
-          {
-            std::cout << "iter: "
-                      << std::setw(5) << iteration             << " : "
-                      << std::setw(5) << std::setprecision(3)  << best.second
-                      << std::endl;
-          } break;
-          default: break;
+          const float r1 = rng(engine);
+          const float r2 = rng(engine);
+          velocity[i][j] = clip(w * velocity[i][j] + c1 * r1 * (p_best[i][j] - positions[i][j]) + c2 * r2 * (g_best[j] - positions[i][j]), -Vmax, Vmax);
+          positions[i][j] += velocity[i][j];
         }
-#ifdef _OPENMP
-      } // close single section
-#endif
 
-#ifdef _OPENMP
-#pragma omp single
-#endif
-      ++iteration;
-    } // end while
+      s.walk[iteration] = copy_walker(g_best.get(), dim);
 
-#ifdef _OPENMP
-  } // end parallel section
-#endif
+      report(verbose, iteration, max_iters, g_score, start_time);
+    } // end for
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
-    s.best = best.second;
+    finalize(s, positions, g_score, max_iters, start_time);
 
     return s;
   }
@@ -0,0 +1,128 @@
+#ifdef WALKERS_PYTHON_MODULE
+// setup.py builds the library as an (empty) extension module
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#endif
+
+#include <walkers_capi.h>
+#include <walkers.h>
+#include <landscape.h>
+
+#include <atomic>
+#include <limits>
+#include <string>
+
+namespace
+{
+  // Call visit with the built-in landscape function of the given name
+  template<typename Visitor>
+  int with_landscape (const std::string & name, Visitor visit)
+  {
+    if      (name == "Ackley")         return visit([](const float * x, const int & dim){ return Ackley(x, dim); });
+    else if (name == "Booth")          return visit([](const float * x, const int & dim){ return Booth(x, dim); });
+    else if (name == "BukinN6")        return visit([](const float * x, const int & dim){ return BukinN6(x, dim); });
+    else if (name == "CrossInTray")    return visit([](const float * x, const int & dim){ return CrossInTray(x, dim); });
+    else if (name == "DixonPrice")     return visit([](const float * x, const int & dim){ return DixonPrice(x, dim); });
+    else if (name == "DropWave")       return visit([](const float * x, const int & dim){ return DropWave(x, dim); });
+    else if (name == "Eggholder")      return visit([](const float * x, const int & dim){ return Eggholder(x, dim); });
+    else if (name == "GrieWank")       return visit([](const float * x, const int & dim){ return GrieWank(x, dim); });
+    else if (name == "HolderTable")    return visit([](const float * x, const int & dim){ return HolderTable(x, dim); });
+    else if (name == "Levy")           return visit([](const float * x, const int & dim){ return Levy(x, dim); });
+    else if (name == "LevyN13")        return visit([](const float * x, const int & dim){ return LevyN13(x, dim); });
+    else if (name == "Matyas")         return visit([](const float * x, const int & dim){ return Matyas(x, dim); });
+    else if (name == "McCormick")      return visit([](const float * x, const int & dim){ return McCormick(x, dim); });
+    else if (name == "Rastring")       return visit([](const float * x, const int & dim){ return Rastring(x, dim); });
+    else if (name == "Rosenbrock")     return visit([](const float * x, const int & dim){ return Rosenbrock(x, dim); });
+    else if (name == "SchafferN2")     return visit([](const float * x, const int & dim){ return SchafferN2(x, dim); });
+    else if (name == "SchafferN4")     return visit([](const float * x, const int & dim){ return SchafferN4(x, dim); });
+    else if (name == "Schwefel")       return visit([](const float * x, const int & dim){ return Schwefel(x, dim); });
+    else if (name == "Shubert")        return visit([](const float * x, const int & dim){ return Shubert(x, dim); });
+    else if (name == "SixHumpCamel")   return visit([](const float * x, const int & dim){ return SixHumpCamel(x, dim); });
+    else if (name == "ThreeHumpCamel") return visit([](const float * x, const int & dim){ return ThreeHumpCamel(x, dim); });
+    else if (name == "Zakharov")       return visit([](const float * x, const int & dim){ return Zakharov(x, dim); });
+    return -2;
+  }
+
+  template<typename Func>
+  int run (const std::string & optimizer, Func objfunc,
+           const float & lower_bound, const float & upper_bound,
+           const int & dim, const int & n_population, const int & max_iters,
+           const float * p, const std::size_t & seed, const int & verbose, const int & nth,
+           Solution & s)
+  {
+    if      (optimizer == "bat") s = walker::bat(objfunc, lower_bound, upper_bound, dim, n_population, max_iters, p[0], p[1], p[2], p[3], p[4], seed, verbose, nth);
+    else if (optimizer == "bbo") s = walker::bbo(objfunc, lower_bound, upper_bound, dim, n_population, max_iters, p[0], p[1], seed, verbose, nth);
+    else if (optimizer == "cfa") s = walker::cfa(objfunc, lower_bound, upper_bound, dim, n_population, max_iters, seed, verbose, nth);
+    else if (optimizer == "cs" ) s = walker::cs (objfunc, lower_bound, upper_bound, dim, n_population, max_iters, p[0], p[1], seed, verbose, nth);
+    else if (optimizer == "gwo") s = walker::gwo(objfunc, lower_bound, upper_bound, dim, n_population, max_iters, seed, verbose, nth);
+    else if (optimizer == "pso") s = walker::pso(objfunc, lower_bound, upper_bound, dim, n_population, max_iters, p[0], p[1], p[2], p[3], p[4], seed, verbose, nth);
+    else if (optimizer == "ssa") s = walker::ssa(objfunc, lower_bound, upper_bound, dim, n_population, max_iters, seed, verbose, nth);
+    else if (optimizer == "woa") s = walker::woa(objfunc, lower_bound, upper_bound, dim, n_population, max_iters, p[0], seed, verbose, nth);
+    else return -1;
+    return 0;
+  }
+}
+
+int walkers_optimize (const char * optimizer,
+                      const char * landscape,
+                      objective_t callback,
+                      float lower_bound,
+                      float upper_bound,
+                      int dim,
+                      int n_population,
+                      int max_iters,
+                      const float * params,
+                      std::size_t seed,
+                      int verbose,
+                      int nth,
+                      float * walk,
+                      float * best,
+                      float * population,
+                      long long * n_evals,
+                      int * n_iters)
+{
+  Solution s;
+  int ret;
+  const std::string opt(optimizer);
+  // number of objective function calls (the kernels can evaluate in parallel)
+  std::atomic<long long> count(0);
+
+  if (callback != nullptr)
+    ret = run(opt, [&](const float * x, const int & d){ ++count; return callback(x, d); },
+              lower_bound, upper_bound, dim, n_population, max_iters, params, seed, verbose, nth, s);
+  else if (landscape == nullptr)
+    return -2;
+  else
+    ret = with_landscape(landscape, [&](auto objfunc)
+                                    {
+                                      return run(opt, [&](const float * x, const int & d){ ++count; return objfunc(x, d); },
+                                                 lower_bound, upper_bound, dim, n_population, max_iters, params, seed, verbose, nth, s);
+                                    });
+
+  if (ret) return ret;
+
+  // the kernels store a copy of the best walker of each completed iteration
+  for (int i = 0; i < max_iters; ++i)
+    for (int j = 0; j < dim; ++j)
+      walk[i * dim + j] = i < s.n_iters && s.walk[i] ? s.walk[i][j] : std::numeric_limits<float>::quiet_NaN();
+
+  // final population, NaN if the kernel does not provide it
+  for (int i = 0; i < n_population; ++i)
+    for (int j = 0; j < dim; ++j)
+      population[i * dim + j] = s.population && s.population[i] ? s.population[i][j] : std::numeric_limits<float>::quiet_NaN();
+
+  *best = s.best;
+  *n_evals = count;
+  *n_iters = s.n_iters;
+  return 0;
+}
+
+#ifdef WALKERS_PYTHON_MODULE
+// the functions are loaded with ctypes (Walkers.native): the module is empty,
+// but it can be imported as any other extension
+static struct PyModuleDef walkers_module = {PyModuleDef_HEAD_INIT, "_walkers",
+                                            "C++ optimizers loaded with ctypes by Walkers.native",
+                                            -1, nullptr, nullptr, nullptr, nullptr, nullptr};
+
+PyMODINIT_FUNC PyInit__walkers () { return PyModule_Create(&walkers_module); }
+#endif
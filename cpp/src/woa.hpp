@@ -17,16 +17,19 @@ namespace walker
                int verbose = 1,
                int nth = 4)
   {
-    typedef std::pair<int, float> best_idx;
-    int iteration = 0;
-    best_idx leader;
-    float fitness;
+    float leader_score = inf;
 
-    std::shared_ptr<std::shared_ptr<float[]>[]> positions(new std::shared_ptr<float[]>[n_population]);
+    population_t positions = make_population(n_population, dim),
+                 previous  = make_population(n_population, dim);
+    std::unique_ptr<float[]> fitness   (new float[n_population]),
+                             A         (new float[n_population]),
+                             C         (new float[n_population]),
+                             leader_pos(new float[dim]);
+    std::unique_ptr<bool[]>  p   (new bool[n_population]),
+                             prey(new bool[n_population]);
 
     Solution s(n_population, dim, max_iters, "WOA");
 
-
     // Initialize timer for the experiment
     auto start_time = std::chrono::high_resolution_clock::now();
 
@@ -34,119 +37,86 @@ namespace walker
     std::cout << "WOA is optimizing..." << std::endl;
 #endif
 
-#ifdef _OPENMP
-#pragma omp declare reduction (minPair : best_idx : omp_out = omp_in.second < omp_out.second ? omp_in : omp_out) initializer(omp_priv = omp_orig)
-#pragma omp parallel num_threads(nth) private(fitness)
-  {
-#endif
-
-#ifdef _OPENMP
-    std::mt19937 engine(seed + omp_get_thread_num());
-#else
     std::mt19937 engine(seed);
-#endif
-
     std::uniform_real_distribution<float> bound_rng(lower_bound, upper_bound);
     std::uniform_real_distribution<float> rng(0.f, 1.f);
 
-#ifdef _OPENMP
-#pragma omp for
-    for (int i = 0; i < n_population; ++i)
-      positions[i] = std::make_unique<float[]>(dim);
-#else
-    std::generate_n(positions.get(), n_population, [&](){return std::make_unique<float[]>(dim);});
-#endif
-
     // initialize the positions/solutions
-#ifdef _OPENMP
-#pragma omp for collapse(2)
-#endif
     for (int i = 0; i < n_population; ++i)
       for (int j = 0; j < dim; ++j)
         positions[i][j] = bound_rng(engine);
 
+    std::fill_n(leader_pos.get(), dim, 0.f);
+
     // main loop
-    while(iteration < max_iters)
+    for (int iteration = 0; iteration < max_iters; ++iteration)
     {
-      leader.second = inf;
-      leader.first  = 0;
-#ifdef _OPENMP
-#pragma omp for reduction(minPair : leader)
-#endif
+      const float frac = max_iters > 1 ? static_cast<float>(iteration) / (max_iters - 1) : 0.f;
+      const float a    = 2.f - 2.f * frac; // a decreases linearly from 2 to 0 in Eq. (2.3)
+      const float a2   = -1.f - frac;      // a2 linearly decreases from -1 to -2 to calculate t in Eq. (3.12)
+
       for (int i = 0; i < n_population; ++i)
+        for (int j = 0; j < dim; ++j)
+          positions[i][j] = clip(positions[i][j], lower_bound, upper_bound);
+
+      evaluate(objfunc, positions, fitness.get(), n_population, dim, nth);
+
+      // update the leader
+      const int idx = argmin(fitness.get(), n_population);
+      if (fitness[idx] < leader_score)
       {
-        // compute objective function for each search agent
-        fitness = objfunc(positions[i].get(), dim);
-        // update the leader
-        leader.first  = fitness < leader.second ? i       : leader.first; // update alpha
-        leader.second = fitness < leader.second ? fitness : leader.second;
+        leader_score = fitness[idx];
+        std::copy_n(positions[idx].get(), dim, leader_pos.get());
       }
 
-      float a  = 2.f - iteration * (2.f / max_iters); // a decreases linearly from 2 to 0 in Eq. (2.3)
-      float a2 = 1.f + iteration * (-1.f / max_iters);// a2 linearly decreases from -1 to -2 to calculate t in Eq. (3.12)
-
-      // update the position of search agents
-#ifdef _OPENMP
-#pragma omp for
-#endif
+      bool any_prey = false;
       for (int i = 0; i < n_population; ++i)
       {
-        float r1 = rng(engine);
-        float r2 = rng(engine);
+        A[i]    = 2.f * a * rng(engine) - a; // Eq. (2.3) in the paper
+        C[i]    = 2.f * rng(engine);         // Eq. (2.4) in the paper
+        p[i]    = rng(engine) < .5f;         // Eq. (2.6)
+        prey[i] = p[i] && std::fabs(A[i]) >= 1.f;
+        any_prey |= prey[i];
+      }
 
-        float A    = 2.f * a * r1 - a; // Eq. (2.3) in the paper
-        float C    = 2.f * r2;         // Eq. (2.4) in the paper
-        float l    = (a2 - 1.f) * rng(engine) + 1.f; // parameters in Eq. (2.5)
-        bool p     = static_cast<bool>(rng(engine) > .5f);      // Eq. (2.6)
-        bool a_abs = static_cast<bool>(std::fabs(A) >= 1.f);
+      // search for prey: the whales l_idx[k] move with respect to their old
+      // position (as in the Python version)
+      if (any_prey)
+      {
+        for (int i = 0; i < n_population; ++i)
+          std::copy_n(positions[i].get(), dim, previous[i].get());
 
-        for (int j = 0; j < dim; ++j)
+        for (int k = 0; k < n_population; ++k)
         {
-          //positions[i][j] = (p && a_abs)  ? positions[/*MISS*/][j] - A * std::fabs(C * positions[/*MISS*/][j] - positions[i][j])                         :
-          //                  (p && !a_abs) ? positions[leader.first][j] - A * std::fabs(C * positions[leader.first][j] - positions[i][j]) :
-          //                  std::fabs(positions[leader.first][j] - positions[i][j]) * std::exp(b * l) * std::cos(l * 2.f * M_PI) + positions[leader.first][j];
-          positions[i][j] = (positions[i][j] < lower_bound) ? lower_bound :
-                            (positions[i][j] > upper_bound) ? upper_bound :
-                             positions[i][j];
+          const int l_idx = std::min(static_cast<int>(n_population * rng(engine)), n_population - 1);
+          for (int j = 0; j < dim; ++j)
+          {
+            const float x = previous[l_idx][j];
+            positions[l_idx][j] = x - A[l_idx] * std::fabs(C[k] * x - x);
+          }
         }
       }
 
-      s.walk[iteration] = positions[leader.first];
-
-#ifdef _OPENMP
-#pragma omp single nowait
+      // encircling prey (p and |A| < 1) and spiral updating (not p)
+      for (int i = 0; i < n_population; ++i)
       {
-#endif
-        switch(verbose)
-        {
-          case 1: printProgress(iteration, max_iters, start_time);
-          break;
-          case 2:
-          {
-            std::cout << "iter: "
-                      << std::setw(5) << iteration             << " : "
-                      << std::setw(5) << std::setprecision(3)  << leader.second
-                      << std::endl;
-          } break;
-          default: break;
-        }
-#ifdef _OPENMP
-      } // close single section
-#endif
+        const float l = (a2 - 1.f) * rng(engine) + 1.f; // parameters in Eq. (2.5)
+        if (prey[i]) continue;
 
-#ifdef _OPENMP
-#pragma omp single
-#endif
-      ++iteration;
-    } // end while
+        const float u  = p[i] ? C[i]  : 1.f;
+        const float s1 = p[i] ? -A[i] : std::exp(b * l);
+        const float s2 = p[i] ? 1.f   : std::cos(2.f * l * static_cast<float>(M_PI));
 
-#ifdef _OPENMP
-  } // end parallel section
-#endif
+        for (int j = 0; j < dim; ++j)
+          positions[i][j] = leader_pos[j] + s1 * s2 * std::fabs(u * leader_pos[j] - positions[i][j]);
+      }
+
+      s.walk[iteration] = copy_walker(leader_pos.get(), dim);
+
+      report(verbose, iteration, max_iters, leader_score, start_time);
+    } // end for
 
-    auto end_time = std::chrono::high_resolution_clock::now();
-    s.execution_time = std::chrono::duration_cast<std::chrono::seconds>(end_time - start_time).count();
-    s.best = leader.second;
+    finalize(s, positions, leader_score, max_iters, start_time);
 
     return s;
   }
@@ -72,9 +72,9 @@ void display()
   z = ( std::isnan(z) || std::isinf(z) ) ? 0.f : z;
   sphere.draw( x, y, z, 1, 1, 1);
 
-  x = ((sol.walk[max_iters - 1][0] - min_x) / (max_x - min_x))*MAX_W - MIN_W;
-  y = ((sol.walk[max_iters - 1][1] - min_y) / (max_y - min_y))*MAX_W - MIN_W;
-  z = ((sol.walk[max_iters - 1][2] - min_z) / (max_z - min_z))*MAX_W - MIN_W;
+  x = ((sol.walk[sol.n_iters - 1][0] - min_x) / (max_x - min_x))*MAX_W - MIN_W;
+  y = ((sol.walk[sol.n_iters - 1][1] - min_y) / (max_y - min_y))*MAX_W - MIN_W;
+  z = ((sol.walk[sol.n_iters - 1][2] - min_z) / (max_z - min_z))*MAX_W - MIN_W;
   x = ( std::isnan(x) || std::isinf(x) ) ? 0.f : x;
   y = ( std::isnan(y) || std::isinf(y) ) ? 0.f : y;
   z = ( std::isnan(z) || std::isinf(z) ) ? 0.f : z;
@@ -91,7 +91,7 @@ void display()
   glNormal3f(1.f, 1.f, 1.f);
   glColor3f(1.f, 1.f, 1.f);
 
-  for (int i = 0; i < max_iters; ++i)
+  for (int i = 0; i < sol.n_iters; ++i)
   {
     x = ((sol.walk[i][0] - min_x) / (max_x - min_x))*MAX_W - MIN_W;
     y = ((sol.walk[i][1] - min_y) / (max_y - min_y))*MAX_W - MIN_W;
@@ -612,7 +612,7 @@ int main(int argc, char **argv)
   min_y = +inf;
   min_z = +inf;
 
-  for (int i = 0; i < max_iters; ++i)
+  for (int i = 0; i < sol.n_iters; ++i)
   {
     max_x = (sol.walk[i][0] > max_x) ? sol.walk[i][0] : max_x;
     max_y = (sol.walk[i][1] > max_y) ? sol.walk[i][1] : max_y;
@@ -7,7 +7,7 @@ import os
 import sys
 from shutil import rmtree
 
-from setuptools import find_packages, setup, Command
+from setuptools import find_packages, setup, Command, Extension
 
 # Package meta-data.
 NAME = 'Walkers'
@@ -30,6 +30,27 @@ EXTRAS = {
   'tests': ['matplotlib'],
 }
 
+# Optional C++ optimizers (loaded with ctypes by Walkers.native).
+# The build is optional: if it fails the package falls back to the pure
+# Python optimizers. Set WALKERS_OMP=1 to compile the OpenMP kernels.
+extra_compile_args = ['/std:c++17'] if sys.platform == 'win32' else ['-std=c++17', '-O3']
+extra_link_args = []
+if os.environ.get('WALKERS_OMP', '0') == '1':
+  extra_compile_args += ['/openmp'] if sys.platform == 'win32' else ['-fopenmp']
+  extra_link_args    += [] if sys.platform == 'win32' else ['-fopenmp']
+
+EXT_MODULES = [
+  Extension('Walkers._walkers',
+            sources=[os.path.join('cpp', 'src', 'walkers_capi.cpp')],
+            include_dirs=[os.path.join('cpp', 'include'), os.path.join('cpp', 'src')],
+            define_macros=[('WALKERS_PYTHON_MODULE', None)],
+            extra_compile_args=extra_compile_args,
+            extra_link_args=extra_link_args,
+            language='c++',
+            optional=True
+            )
+]
+
 # The rest you shouldn't have to touch too much :)
 # ------------------------------------------------
 # Except, perhaps the License and Trove Classifiers!
@@ -75,6 +96,7 @@ setup(
   # entry_points={
   #     'console_scripts': ['mycli=mymodule:cli'],
   # },
+  ext_modules=EXT_MODULES,
   install_requires=get_requires(),
   extras_require=EXTRAS,
   include_package_data=True,